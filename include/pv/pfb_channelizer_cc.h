@@ -0,0 +1,83 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2018 Per Vices Corporation.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+
+#ifndef INCLUDED_PV_PFB_CHANNELIZER_CC_H
+#define INCLUDED_PV_PFB_CHANNELIZER_CC_H
+
+#include <pv/api.h>
+#include <gnuradio/sync_decimator.h>
+#include <vector>
+
+namespace gr {
+  namespace pv {
+
+    /*!
+     * \brief Multi-channel polyphase filterbank channelizer for
+     * crimson_source_c output.
+     * \ingroup block
+     *
+     * \details
+     * Splits every input into \p num_bands critically sampled sub-bands.
+     * Band k is centred on k * fs / num_bands, so the upper half of the
+     * bands holds the negative frequencies, and comes out at
+     * fs / num_bands.
+     *
+     * Only the bands listed in \p bands are produced, one output per
+     * input and band in input major order: with two inputs and bands
+     * {1, 3} the outputs are in0 band 1, in0 band 3, in1 band 1 and
+     * in1 band 3. The filterbank is shared, but a small subset is
+     * formed with one dot product per band instead of an FFT, so bands
+     * that are not asked for are not computed.
+     *
+     * The work is split by input and time over \p nthreads threads.
+     *
+     * Without taps the filter of poly_decim_cc for a decimation of
+     * \p num_bands is used, which puts adjacent bands 6 dB down where
+     * they meet.
+     */
+    class PV_API pfb_channelizer_cc : virtual public gr::sync_decimator
+    {
+     public:
+      typedef boost::shared_ptr<pfb_channelizer_cc> sptr;
+
+      /*!
+       * \param num_channels number of inputs
+       * \param num_bands number of sub-bands each input is split into
+       * \param bands sub-bands to output, all of them if empty
+       * \param nthreads worker threads, one per core if 0
+       * \param taps prototype filter taps, designed if empty
+       */
+      static sptr make(int num_channels, int num_bands,
+                       const std::vector<int> &bands = std::vector<int>(),
+                       int nthreads = 0,
+                       const std::vector<float> &taps = std::vector<float>());
+
+      //! Sub-bands produced, in output order
+      virtual std::vector<int> bands() const = 0;
+
+      //! Prototype filter taps in use
+      virtual std::vector<float> taps() const = 0;
+    };
+
+  } // namespace pv
+} // namespace gr
+
+#endif /* INCLUDED_PV_PFB_CHANNELIZER_CC_H */
@@ -0,0 +1,66 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2018 Per Vices Corporation.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifndef INCLUDED_PV_POLY_DECIM_CC_H
+#define INCLUDED_PV_POLY_DECIM_CC_H
+
+#include <pv/api.h>
+#include <gnuradio/sync_decimator.h>
+#include <vector>
+
+namespace gr {
+  namespace pv {
+
+    /*!
+     * \brief Multi-channel polyphase decimator for crimson_source_c output.
+     * \ingroup block
+     *
+     * \details
+     * Low pass filters and decimates every input by the same ratio in one
+     * block, so a 4 channel crimson_source_c needs one block and one
+     * thread instead of four. Only the outputs that survive decimation
+     * are computed, one VOLK dot product each, which is the polyphase
+     * form of the filter.
+     *
+     * Without taps a low pass filter is designed for the decimation. Its
+     * passband is the inner 80% of the output band. Designs are cached
+     * per decimation and shared between blocks.
+     */
+    class PV_API poly_decim_cc : virtual public gr::sync_decimator
+    {
+     public:
+      typedef boost::shared_ptr<poly_decim_cc> sptr;
+
+      /*!
+       * \param num_channels number of inputs and outputs
+       * \param decimation decimation ratio
+       * \param taps filter taps, designed for the decimation if empty
+       */
+      static sptr make(int num_channels, int decimation,
+                       const std::vector<float> &taps = std::vector<float>());
+
+      //! Filter taps in use
+      virtual std::vector<float> taps() const = 0;
+    };
+
+  } // namespace pv
+} // namespace gr
+
+#endif /* INCLUDED_PV_POLY_DECIM_CC_H */
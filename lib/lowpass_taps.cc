@@ -0,0 +1,90 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2018 Per Vices Corporation.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifdef HAVE_CONFIG_H
+#include "config.h"
+#endif
+
+#include "lowpass_taps.h"
+#include <boost/thread/mutex.hpp>
+#include <cmath>
+#include <map>
+#include <stdexcept>
+#include <utility>
+
+namespace gr {
+  namespace pv {
+
+    static std::vector<float>
+    design(unsigned int decimation, unsigned int taps_per_phase)
+    {
+      const unsigned int ntaps = decimation * taps_per_phase;
+      const double mid = (ntaps - 1) / 2.0;
+
+      // Cut off at the output Nyquist frequency. The Hamming transition
+      // band then covers the outer 20% of the output band.
+      const double cutoff = 0.5 / decimation;
+
+      std::vector<float> taps(ntaps);
+      double sum = 0.0;
+
+      for(unsigned int n = 0; n < ntaps; n++) {
+        const double x = n - mid;
+        const double sinc = (x == 0.0) ? 1.0 : std::sin(2.0 * M_PI * cutoff * x) / (2.0 * M_PI * cutoff * x);
+        const double window = (ntaps == 1) ? 1.0 : 0.54 - 0.46 * std::cos(2.0 * M_PI * n / (ntaps - 1));
+
+        taps[n] = sinc * window;
+        sum += taps[n];
+      }
+
+      for(unsigned int n = 0; n < ntaps; n++) {
+        taps[n] /= sum;
+      }
+
+      return taps;
+    }
+
+    const std::vector<float> &
+    lowpass_taps(unsigned int decimation, unsigned int taps_per_phase)
+    {
+      typedef std::pair<unsigned int, unsigned int> key_t;
+
+      static boost::mutex mutex;
+      static std::map<key_t, std::vector<float> > cache;
+
+      if(decimation < 1 || taps_per_phase < 1) {
+        throw std::invalid_argument("lowpass_taps: decimation and taps per phase must be positive");
+      }
+
+      boost::mutex::scoped_lock lock(mutex);
+
+      const key_t key(decimation, taps_per_phase);
+      std::map<key_t, std::vector<float> >::iterator it = cache.find(key);
+
+      if(it == cache.end()) {
+        it = cache.insert(std::make_pair(key, design(decimation, taps_per_phase))).first;
+      }
+
+      // Entries are never removed, so the reference stays valid.
+      return it->second;
+    }
+
+  } // namespace pv
+} // namespace gr
@@ -0,0 +1,40 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2018 Per Vices Corporation.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifndef INCLUDED_PV_LOWPASS_TAPS_H
+#define INCLUDED_PV_LOWPASS_TAPS_H
+
+#include <vector>
+
+namespace gr {
+  namespace pv {
+
+    /*!
+     * Windowed sinc low pass filter for decimating by \p decimation, with
+     * \p taps_per_phase taps per polyphase branch and unit DC gain.
+     * Designs are cached, so repeated calls for a ratio are free.
+     */
+    const std::vector<float> &lowpass_taps(unsigned int decimation,
+                                           unsigned int taps_per_phase = 16);
+
+  } // namespace pv
+} // namespace gr
+
+#endif /* INCLUDED_PV_LOWPASS_TAPS_H */
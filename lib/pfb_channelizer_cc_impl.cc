@@ -0,0 +1,236 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2018 Per Vices Corporation.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+
+#ifdef HAVE_CONFIG_H
+#include "config.h"
+#endif
+
+#include "pfb_channelizer_cc_impl.h"
+#include "lowpass_taps.h"
+#include <gnuradio/io_signature.h>
+#include <boost/bind.hpp>
+#include <volk/volk.h>
+#include <algorithm>
+#include <cmath>
+#include <stdexcept>
+
+namespace gr {
+  namespace pv {
+
+    // Fewest outputs a task is given, so small calls are not split up.
+    static const int MIN_CHUNK = 64;
+
+    static int
+    num_outputs(int num_channels, int num_bands, const std::vector<int> &bands)
+    {
+      return num_channels * (bands.empty() ? num_bands : bands.size());
+    }
+
+    pfb_channelizer_cc::sptr
+    pfb_channelizer_cc::make(int num_channels, int num_bands,
+                             const std::vector<int> &bands, int nthreads,
+                             const std::vector<float> &taps)
+    {
+      // Checked before the base class, the output signature and the
+      // default taps use them.
+      if(num_channels < 1 || num_bands < 1) {
+        throw std::invalid_argument("pfb_channelizer_cc: need at least one channel and band");
+      }
+
+      return gnuradio::get_initial_sptr
+        (new pfb_channelizer_cc_impl(num_channels, num_bands, bands, nthreads, taps));
+    }
+
+    pfb_channelizer_cc_impl::pfb_channelizer_cc_impl(int num_channels, int num_bands,
+                                                     const std::vector<int> &bands,
+                                                     int nthreads,
+                                                     const std::vector<float> &taps)
+      : gr::sync_decimator("pfb_channelizer_cc",
+              gr::io_signature::make(num_channels, num_channels, sizeof(gr_complex)),
+              gr::io_signature::make(num_outputs(num_channels, num_bands, bands),
+                                     num_outputs(num_channels, num_bands, bands),
+                                     sizeof(gr_complex)),
+              num_bands),
+        d_num_channels(num_channels),
+        d_num_bands(num_bands),
+        d_bands(bands),
+        d_taps(taps.empty() ? lowpass_taps(num_bands) : taps),
+        d_twiddles(NULL),
+        d_pool(nthreads > 0 ? nthreads : std::max(1u, boost::thread::hardware_concurrency())),
+        d_scratch(d_pool.size()),
+        d_chunk(0)
+    {
+      if(d_bands.empty()) {
+        for(int band = 0; band < num_bands; band++) {
+          d_bands.push_back(band);
+        }
+      }
+
+      for(size_t i = 0; i < d_bands.size(); i++) {
+        if(d_bands[i] < 0 || d_bands[i] >= num_bands) {
+          throw std::invalid_argument("pfb_channelizer_cc: band out of range");
+        }
+      }
+
+      // Branch p holds taps p, p + M, p + 2M, ... of the prototype,
+      // zero padded to a whole number per branch and reversed.
+      d_taps_per_branch = (d_taps.size() + d_num_bands - 1) / d_num_bands;
+      d_branch_taps = (float *)volk_malloc(d_num_bands * d_taps_per_branch * sizeof(float),
+                                           volk_get_alignment());
+
+      for(unsigned int p = 0; p < d_num_bands; p++) {
+        for(unsigned int l = 0; l < d_taps_per_branch; l++) {
+          const unsigned int n = (d_taps_per_branch - 1 - l) * d_num_bands + p;
+          d_branch_taps[p * d_taps_per_branch + l] = n < d_taps.size() ? d_taps[n] : 0.0f;
+        }
+      }
+
+      // An FFT forms every band in about M log2(M) operations, a dot
+      // product forms one in M, so it only pays for larger subsets.
+      const bool use_fft = d_bands.size() > std::log(double(d_num_bands)) / std::log(2.0);
+
+      if(!use_fft) {
+        d_twiddles = (gr_complex *)volk_malloc(d_bands.size() * d_num_bands * sizeof(gr_complex),
+                                               volk_get_alignment());
+
+        for(size_t i = 0; i < d_bands.size(); i++) {
+          for(unsigned int p = 0; p < d_num_bands; p++) {
+            const double phase = 2.0 * M_PI * ((d_bands[i] * p) % d_num_bands) / d_num_bands;
+            d_twiddles[i * d_num_bands + p] = gr_complex(std::cos(phase), std::sin(phase));
+          }
+        }
+      }
+
+      for(size_t worker = 0; worker < d_scratch.size(); worker++) {
+        scratch &s = d_scratch[worker];
+
+        if(use_fft) {
+          s.fft.reset(new gr::fft::fft_complex(d_num_bands, false, 1));
+          s.filtered = s.fft->get_inbuf();
+        }
+        else {
+          s.filtered = (gr_complex *)volk_malloc(d_num_bands * sizeof(gr_complex),
+                                                 volk_get_alignment());
+        }
+      }
+
+      set_history(d_taps_per_branch * d_num_bands);
+    }
+
+    pfb_channelizer_cc_impl::~pfb_channelizer_cc_impl()
+    {
+      for(size_t worker = 0; worker < d_scratch.size(); worker++) {
+        if(!d_scratch[worker].fft) {
+          volk_free(d_scratch[worker].filtered);
+        }
+      }
+
+      volk_free(d_twiddles);
+      volk_free(d_branch_taps);
+    }
+
+    std::vector<int>
+    pfb_channelizer_cc_impl::bands() const
+    {
+      return d_bands;
+    }
+
+    std::vector<float>
+    pfb_channelizer_cc_impl::taps() const
+    {
+      return d_taps;
+    }
+
+    void
+    pfb_channelizer_cc_impl::channelize(unsigned int task, unsigned int worker)
+    {
+      const unsigned int nchunks = (d_noutput_items + d_chunk - 1) / d_chunk;
+      const unsigned int channel = task / nchunks;
+      const unsigned int start = (task % nchunks) * d_chunk;
+      const unsigned int count = std::min<unsigned int>(d_chunk, d_noutput_items - start);
+
+      const unsigned int M = d_num_bands;
+      const unsigned int L = d_taps_per_branch;
+      const size_t nbands = d_bands.size();
+
+      const gr_complex *in = (const gr_complex *)(*d_input_items)[channel] + start * M;
+      gr_complex **out = (gr_complex **)&(*d_output_items)[channel * nbands];
+
+      scratch &s = d_scratch[worker];
+
+      // Deal the input out to the branches so every branch filter runs
+      // over contiguous samples: branch p gets samples M - 1 - p, 2M - 1 - p, ...
+      const unsigned int length = count + L - 1;
+      s.branches.resize(M * length);
+
+      for(unsigned int p = 0; p < M; p++) {
+        gr_complex *branch = &s.branches[p * length];
+        for(unsigned int m = 0; m < length; m++) {
+          branch[m] = in[m * M + (M - 1 - p)];
+        }
+      }
+
+      for(unsigned int n = 0; n < count; n++) {
+        for(unsigned int p = 0; p < M; p++) {
+          volk_32fc_32f_dot_prod_32fc(&s.filtered[p], &s.branches[p * length + n],
+                                      &d_branch_taps[p * L], L);
+        }
+
+        if(s.fft) {
+          s.fft->execute();
+
+          const gr_complex *spectrum = s.fft->get_outbuf();
+          for(size_t i = 0; i < nbands; i++) {
+            out[i][start + n] = spectrum[d_bands[i]];
+          }
+        }
+        else {
+          for(size_t i = 0; i < nbands; i++) {
+            volk_32fc_x2_dot_prod_32fc(&out[i][start + n], s.filtered,
+                                       &d_twiddles[i * M], M);
+          }
+        }
+      }
+    }
+
+    int
+    pfb_channelizer_cc_impl::work(int noutput_items,
+                                  gr_vector_const_void_star &input_items,
+                                  gr_vector_void_star &output_items)
+    {
+      // Split every input in time until each worker has a task.
+      const unsigned int per_channel = (d_pool.size() + d_num_channels - 1) / d_num_channels;
+      const unsigned int nchunks = std::max(1, std::min<int>(per_channel,
+                                                             noutput_items / MIN_CHUNK));
+
+      d_chunk = (noutput_items + nchunks - 1) / nchunks;
+      d_noutput_items = noutput_items;
+      d_input_items = &input_items;
+      d_output_items = &output_items;
+
+      const unsigned int ntasks = d_num_channels * ((noutput_items + d_chunk - 1) / d_chunk);
+      d_pool.run(ntasks, boost::bind(&pfb_channelizer_cc_impl::channelize, this, _1, _2));
+
+      return noutput_items;
+    }
+
+  } // namespace pv
+} // namespace gr
@@ -0,0 +1,88 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2018 Per Vices Corporation.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+
+#ifndef INCLUDED_PV_PFB_CHANNELIZER_CC_IMPL_H
+#define INCLUDED_PV_PFB_CHANNELIZER_CC_IMPL_H
+
+#include <pv/pfb_channelizer_cc.h>
+#include <gnuradio/fft/fft.h>
+#include <boost/shared_ptr.hpp>
+#include "task_pool.h"
+
+namespace gr {
+  namespace pv {
+
+    class pfb_channelizer_cc_impl : public pfb_channelizer_cc
+    {
+     private:
+      // Buffers owned by one worker of the pool.
+      struct scratch
+      {
+        // Input split over the branches, one row per branch.
+        std::vector<gr_complex> branches;
+
+        // Branch outputs for one output sample, the FFT input when the
+        // FFT is used.
+        gr_complex *filtered;
+        boost::shared_ptr<gr::fft::fft_complex> fft;
+      };
+
+      unsigned int d_num_channels;
+      unsigned int d_num_bands;
+      unsigned int d_taps_per_branch;
+      std::vector<int> d_bands;
+      std::vector<float> d_taps;
+
+      // Branch taps, reversed, one row of d_taps_per_branch per branch.
+      float *d_branch_taps;
+
+      // Inverse DFT row of every band in d_bands when no FFT is used.
+      gr_complex *d_twiddles;
+
+      task_pool d_pool;
+      std::vector<scratch> d_scratch;
+
+      // Outputs per task, and the buffers of the call being worked on.
+      unsigned int d_chunk;
+      int d_noutput_items;
+      const gr_vector_const_void_star *d_input_items;
+      gr_vector_void_star *d_output_items;
+
+      void channelize(unsigned int task, unsigned int worker);
+
+     public:
+      pfb_channelizer_cc_impl(int num_channels, int num_bands,
+                              const std::vector<int> &bands, int nthreads,
+                              const std::vector<float> &taps);
+      ~pfb_channelizer_cc_impl();
+
+      std::vector<int> bands() const;
+      std::vector<float> taps() const;
+
+      int work(int noutput_items,
+               gr_vector_const_void_star &input_items,
+               gr_vector_void_star &output_items);
+    };
+
+  } // namespace pv
+} // namespace gr
+
+#endif /* INCLUDED_PV_PFB_CHANNELIZER_CC_IMPL_H */
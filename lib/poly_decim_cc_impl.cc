@@ -0,0 +1,99 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2018 Per Vices Corporation.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifdef HAVE_CONFIG_H
+#include "config.h"
+#endif
+
+#include "poly_decim_cc_impl.h"
+#include "lowpass_taps.h"
+#include <gnuradio/io_signature.h>
+#include <volk/volk.h>
+#include <stdexcept>
+
+namespace gr {
+  namespace pv {
+
+    poly_decim_cc::sptr
+    poly_decim_cc::make(int num_channels, int decimation,
+                        const std::vector<float> &taps)
+    {
+      // Checked before the base class and the default taps use them.
+      if(num_channels < 1) {
+        throw std::invalid_argument("poly_decim_cc: need at least one channel");
+      }
+      if(decimation < 1) {
+        throw std::invalid_argument("poly_decim_cc: decimation must be at least 1");
+      }
+
+      return gnuradio::get_initial_sptr
+        (new poly_decim_cc_impl(num_channels, decimation, taps));
+    }
+
+    poly_decim_cc_impl::poly_decim_cc_impl(int num_channels, int decimation,
+                                           const std::vector<float> &taps)
+      : gr::sync_decimator("poly_decim_cc",
+              gr::io_signature::make(num_channels, num_channels, sizeof(gr_complex)),
+              gr::io_signature::make(num_channels, num_channels, sizeof(gr_complex)),
+              decimation),
+        d_decimation(decimation),
+        d_taps(taps.empty() ? lowpass_taps(decimation) : taps)
+    {
+      d_reversed = (float *)volk_malloc(d_taps.size() * sizeof(float), volk_get_alignment());
+      for(size_t n = 0; n < d_taps.size(); n++) {
+        d_reversed[n] = d_taps[d_taps.size() - 1 - n];
+      }
+
+      set_history(d_taps.size());
+    }
+
+    poly_decim_cc_impl::~poly_decim_cc_impl()
+    {
+      volk_free(d_reversed);
+    }
+
+    std::vector<float>
+    poly_decim_cc_impl::taps() const
+    {
+      return d_taps;
+    }
+
+    int
+    poly_decim_cc_impl::work(int noutput_items,
+                             gr_vector_const_void_star &input_items,
+                             gr_vector_void_star &output_items)
+    {
+      const unsigned int ntaps = d_taps.size();
+
+      for(size_t channel = 0; channel < input_items.size(); channel++) {
+        const gr_complex *in = (const gr_complex *)input_items[channel];
+        gr_complex *out = (gr_complex *)output_items[channel];
+
+        // Only the outputs that are kept are computed.
+        for(int i = 0; i < noutput_items; i++) {
+          volk_32fc_32f_dot_prod_32fc(&out[i], &in[i * d_decimation], d_reversed, ntaps);
+        }
+      }
+
+      return noutput_items;
+    }
+
+  } // namespace pv
+} // namespace gr
@@ -0,0 +1,53 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2018 Per Vices Corporation.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifndef INCLUDED_PV_POLY_DECIM_CC_IMPL_H
+#define INCLUDED_PV_POLY_DECIM_CC_IMPL_H
+
+#include <pv/poly_decim_cc.h>
+
+namespace gr {
+  namespace pv {
+
+    class poly_decim_cc_impl : public poly_decim_cc
+    {
+     private:
+      unsigned int d_decimation;
+      std::vector<float> d_taps;
+
+      // Taps in reverse order in VOLK aligned memory.
+      float *d_reversed;
+
+     public:
+      poly_decim_cc_impl(int num_channels, int decimation,
+                         const std::vector<float> &taps);
+      ~poly_decim_cc_impl();
+
+      std::vector<float> taps() const;
+
+      int work(int noutput_items,
+               gr_vector_const_void_star &input_items,
+               gr_vector_void_star &output_items);
+    };
+
+  } // namespace pv
+} // namespace gr
+
+#endif /* INCLUDED_PV_POLY_DECIM_CC_IMPL_H */
@@ -0,0 +1,125 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2018 Per Vices Corporation.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifdef HAVE_CONFIG_H
+#include "config.h"
+#endif
+
+#include "task_pool.h"
+#include <boost/bind.hpp>
+
+namespace gr {
+  namespace pv {
+
+    task_pool::task_pool(unsigned int nthreads)
+      : d_size(nthreads < 1 ? 1 : nthreads),
+        d_ntasks(0), d_next(0), d_pending(0), d_batch(0), d_stop(false)
+    {
+      for(unsigned int i = 1; i < d_size; i++) {
+        d_threads.create_thread(boost::bind(&task_pool::worker, this, i));
+      }
+    }
+
+    task_pool::~task_pool()
+    {
+      {
+        boost::mutex::scoped_lock lock(d_mutex);
+        d_stop = true;
+        d_wake.notify_all();
+      }
+
+      d_threads.join_all();
+    }
+
+    void
+    task_pool::run(unsigned int ntasks, const task_t &task)
+    {
+      boost::mutex::scoped_lock lock(d_mutex);
+
+      d_task = task;
+      d_ntasks = ntasks;
+      d_next = 0;
+      d_pending = ntasks;
+      d_batch++;
+      d_wake.notify_all();
+
+      lock.unlock();
+      drain(0);
+      lock.lock();
+
+      while(d_pending > 0) {
+        d_done.wait(lock);
+      }
+
+      d_task = task_t();
+    }
+
+    void
+    task_pool::worker(unsigned int index)
+    {
+      unsigned long batch = 0;
+
+      for(;;) {
+        {
+          boost::mutex::scoped_lock lock(d_mutex);
+
+          while(!d_stop && d_batch == batch) {
+            d_wake.wait(lock);
+          }
+
+          if(d_stop) {
+            return;
+          }
+
+          batch = d_batch;
+        }
+
+        drain(index);
+      }
+    }
+
+    void
+    task_pool::drain(unsigned int index)
+    {
+      for(;;) {
+        unsigned int task;
+
+        {
+          boost::mutex::scoped_lock lock(d_mutex);
+
+          if(d_next >= d_ntasks) {
+            return;
+          }
+
+          task = d_next++;
+        }
+
+        // d_task only changes once every task of the batch is done.
+        d_task(task, index);
+
+        boost::mutex::scoped_lock lock(d_mutex);
+        if(--d_pending == 0) {
+          d_done.notify_all();
+        }
+      }
+    }
+
+  } // namespace pv
+} // namespace gr
@@ -0,0 +1,75 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2018 Per Vices Corporation.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifndef INCLUDED_PV_TASK_POOL_H
+#define INCLUDED_PV_TASK_POOL_H
+
+#include <boost/function.hpp>
+#include <boost/noncopyable.hpp>
+#include <boost/thread/condition_variable.hpp>
+#include <boost/thread/mutex.hpp>
+#include <boost/thread/thread.hpp>
+
+namespace gr {
+  namespace pv {
+
+    /*!
+     * Fixed set of threads that splits a batch of independent tasks
+     * between them. The calling thread works on the batch too, so a pool
+     * of size 1 starts no threads at all.
+     */
+    class task_pool : boost::noncopyable
+    {
+     public:
+      //! task(index, worker), worker is in [0, size())
+      typedef boost::function<void(unsigned int, unsigned int)> task_t;
+
+      explicit task_pool(unsigned int nthreads);
+      ~task_pool();
+
+      //! Number of workers, including the caller of run()
+      unsigned int size() const { return d_size; }
+
+      //! Runs task for every index in [0, ntasks) and waits for all of them
+      void run(unsigned int ntasks, const task_t &task);
+
+     private:
+      void worker(unsigned int index);
+      void drain(unsigned int index);
+
+      unsigned int d_size;
+
+      boost::mutex d_mutex;
+      boost::condition_variable d_wake;
+      boost::condition_variable d_done;
+      boost::thread_group d_threads;
+
+      task_t d_task;
+      unsigned int d_ntasks;
+      unsigned int d_next;
+      unsigned int d_pending;
+      unsigned long d_batch;
+      bool d_stop;
+    };
+
+  } // namespace pv
+} // namespace gr
+
+#endif /* INCLUDED_PV_TASK_POOL_H */
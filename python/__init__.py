@@ -31,6 +31,27 @@ except ImportError:
 	pass
 
 # import any pure python here
+from adaptive_sweep import FixedSweep, AdaptiveSweep
+from bench_history import BenchHistory, Regression, fingerprint
+from burst_source_s import burst_source_s, timed_capture
+from capture_cache import CaptureCache, firmware_id
+from crimson_bring_up import bring_up, BringUp
 from crimson_sink_s import crimson_sink_s
 from crimson_source_c import crimson_source_c
+from crimson_capture import CrimsonCapture
+from crimson_events import crimson_event_monitor, CrimsonEvent
+from crimson_multi import crimson_multi_source_c, crimson_multi_sink_s
+from jsonl import load_jsonl
+from latency_bench import LatencyBench, marker_source_s, marker_detector_c, pn_marker, chirp_marker
+from playback_source_s import playback_source_s
+from recording_sink import recording_sink
+from results_store import ResultsStore, ResultRow
+from ring_buffer_sink_c import ring_buffer_sink_c
+from sc16_source_s import sc16_source_s, to_sc16
+from settings_cache import SettingsCache
+from starve_source_s import starve_source_s
+from sweep_engine import SweepEngine, SweepSegment
+from sweep_journal import SweepJournal
+from sweep_scheduler import SweepScheduler, SweepPoint, SweepResult, crimson_devices
+from throughput_bench import ThroughputBench, BenchPoint, bench_matrix, max_rate_table
 #
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+import numpy as np
+
+class FixedSweep(object):
+    """
+    Every point of np.arange(start, stop, step), behind the same
+    interface as AdaptiveSweep so a test loop can use either.
+
+    Usage:
+        sweep = FixedSweep(15e6, 4e9, 25e6)
+        for centre_freq in sweep:
+            ...
+            sweep.report(centre_freq, metric)
+    """
+
+    def __init__(self, start, stop, step):
+        self.grid = np.arange(start, stop, step)
+        self.values = {}
+        self._next = 0
+
+    def next_batch(self, size):
+        """Up to size points to measure next, none once the sweep is over."""
+        batch = self.grid[self._next:self._next + size].tolist()
+        self._next += len(batch)
+        return batch
+
+    def report(self, freq, value):
+        """Hands in the metric measured at freq."""
+        self.values[freq] = value
+
+    def __iter__(self):
+        while True:
+            batch = self.next_batch(1)
+            if not batch:
+                return
+            yield batch[0]
+
+class AdaptiveSweep(FixedSweep):
+    """
+    Sweeps the same grid as FixedSweep, measuring only the points that
+    matter.
+
+    Every coarse-th grid point is measured first. Then the gaps between
+    measured neighbours are halved, one point at a time, where the
+    metric moves the most, or comes within margin of threshold or
+    crosses it. Gaps where the metric is flat (changes by less than flat
+    times its spread) and is far from the threshold are left alone. It
+    stops when budget points are measured, or when no gap is worth
+    splitting. Refined points are still grid points, so the resolution is
+    at most step.
+
+    The metric is one number per point, higher or lower as suits the
+    test, e.g. the worst channel's phase error.
+    """
+
+    def __init__(self, start, stop, step, coarse=4, budget=None,
+            threshold=None, margin=0.1, flat=0.05):
+        FixedSweep.__init__(self, start, stop, step)
+
+        self.coarse = coarse
+        self.threshold = threshold
+        self.margin = margin
+        self.flat = flat
+
+        if budget is None:
+            budget = len(self.grid) // 2
+        self.budget = budget
+
+        # Grid indices handed out, in order.
+        last = len(self.grid) - 1
+        self._coarse = range(0, last, coarse) + [last] if last >= 0 else []
+        self._indices = []
+
+    def _priority(self, low, high, spread):
+        a = self.values.get(self.grid[low])
+        b = self.values.get(self.grid[high])
+
+        if a is None or b is None:
+            return 0.0
+
+        change = abs(b - a) / spread
+
+        near = 0.0
+        if self.threshold is not None:
+            scale = self.margin * (abs(self.threshold) or 1.0)
+            if min(a, b) <= self.threshold <= max(a, b):
+                near = 1.0
+            else:
+                near = max(0.0, 1.0 - min(abs(a - self.threshold), abs(b - self.threshold)) / scale)
+
+        if change < self.flat and near == 0.0:
+            return 0.0
+
+        # Wide gaps first among equally interesting ones.
+        return max(change, near) * (high - low)
+
+    def next_batch(self, size):
+        batch = []
+
+        while len(batch) < size and len(self._indices) < self.budget:
+            if len(self._indices) < len(self._coarse):
+                index = self._coarse[len(self._indices)]
+            else:
+                index = self._refine(batch)
+                if index is None:
+                    break
+
+            self._indices.append(index)
+            batch.append(self.grid[index])
+
+        return [float(freq) for freq in batch]
+
+    def _refine(self, pending):
+        measured = sorted(set(self._indices))
+
+        values = [self.values[self.grid[index]] for index in measured
+            if self.grid[index] in self.values]
+        spread = (max(values) - min(values)) if values else 0.0
+        spread = spread or 1.0
+
+        best, best_priority = None, 0.0
+
+        for low, high in zip(measured[:-1], measured[1:]):
+            if high - low < 2:
+                continue
+
+            # Gaps split in this batch wait for its results.
+            if any(low < self._indices_of(freq) < high for freq in pending):
+                continue
+
+            priority = self._priority(low, high, spread)
+            if priority > best_priority:
+                best, best_priority = (low + high) // 2, priority
+
+        return best
+
+    def _indices_of(self, freq):
+        return int(np.argmin(np.abs(self.grid - freq)))
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+"""
+History of benchmark results, to catch performance regressions between
+firmware and host builds. Run it as a script to add a throughput_bench or
+latency_bench report to a history, exiting with 1 on a regression:
+
+    python bench_history.py history.jsonl bench.json --tolerance 0.05
+"""
+
+from throughput_bench import host_info, throughput_metrics
+from latency_bench import latency_metrics
+from jsonl import load_jsonl
+
+from collections import namedtuple
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+# A metric that got worse than its baseline allows. change is relative.
+Regression = namedtuple("Regression", ["metric", "baseline", "value", "change"])
+
+def fingerprint(device=None):
+    """
+    The environment a run was made in: the host, its software builds and
+    the firmware ID of the crimson.
+    """
+
+    environment = host_info()
+    environment["device"] = device
+    return environment
+
+class BenchHistory(object):
+    """
+    Append only record of benchmark runs, one JSON line each holding the
+    benchmark name, the time, the environment fingerprint and a dict of
+    metrics, e.g. "max_rate/4ch/sc16". Every run is written through to
+    disk, and a last line cut short by a crash is dropped.
+
+    A run is compared with the baseline of its benchmark on the same
+    machine, the runs whose fingerprints agree on the match keys. The
+    baseline is the last run recorded with pin=True, or else the first
+    run, rather than the previous one, so a slow drift that stays within
+    tolerance from run to run is still caught. A metric regresses when it
+    is worse than the baseline by more than tolerance, relative to the
+    baseline. Higher is better, except for metrics starting with one of
+    the lower_is_better prefixes. Metrics the baseline lacks are skipped.
+    """
+
+    def __init__(self, path, tolerance=0.05, lower_is_better=("latency",),
+            match=("host", "cpus")):
+        self.path = path
+        self.tolerance = tolerance
+        self.lower_is_better = tuple(lower_is_better)
+        self.match = tuple(match)
+
+        self._lock = threading.Lock()
+        self._runs = load_jsonl(path)
+
+    def __len__(self):
+        return len(self._runs)
+
+    def runs(self, name, environment=None):
+        """
+        The runs of a benchmark, oldest first, on the machine of
+        environment if given.
+        """
+
+        return [run for run in self._runs
+            if run["name"] == name and (environment is None or
+                all(run["fingerprint"].get(key) == environment.get(key) for key in self.match))]
+
+    def baseline(self, name, environment):
+        """The run new runs of name in environment are held to, or None."""
+
+        runs = self.runs(name, environment)
+        pinned = [run for run in runs if run["pinned"]]
+
+        if pinned:
+            return pinned[-1]
+        return runs[0] if runs else None
+
+    def record(self, name, metrics, environment, pin=False):
+        """Appends a run and returns it."""
+
+        run = {
+            "name": name,
+            "time": time.time(),
+            "fingerprint": environment,
+            "metrics": dict((metric, float(value)) for metric, value in metrics.items()),
+            "pinned": pin,
+        }
+
+        with self._lock:
+            with open(self.path, "a") as history:
+                history.write(json.dumps(run, sort_keys=True) + "\n")
+                history.flush()
+                os.fsync(history.fileno())
+
+            self._runs.append(run)
+
+        return run
+
+    def compare(self, run, baseline):
+        """The metrics of run that regressed from baseline, worst first."""
+
+        regressions = []
+
+        for metric, value in sorted(run["metrics"].items()):
+            base = baseline["metrics"].get(metric)
+            if base is None:
+                continue
+
+            # How much worse than the baseline, negative for better.
+            worse = base - value
+            if metric.startswith(self.lower_is_better):
+                worse = -worse
+
+            if worse > self.tolerance * abs(base):
+                change = (value - base) / abs(base) if base else float("inf")
+                regressions.append(Regression(metric, base, value, change))
+
+        return sorted(regressions, key=lambda regression: -abs(regression.change))
+
+    def check(self, name, metrics, environment, pin=False):
+        """
+        Records a run and returns its regressions from the baseline that
+        was in place before it. The first run of a machine is its own
+        baseline, so it has none.
+        """
+
+        baseline = self.baseline(name, environment)
+        run = self.record(name, metrics, environment, pin)
+
+        if baseline is None:
+            return []
+        return self.compare(run, baseline)
+
+    @staticmethod
+    def changes(run, baseline):
+        """The fingerprint entries that differ between two runs."""
+
+        keys = set(run["fingerprint"]) | set(baseline["fingerprint"])
+        return dict((key, (baseline["fingerprint"].get(key), run["fingerprint"].get(key)))
+            for key in sorted(keys)
+            if run["fingerprint"].get(key) != baseline["fingerprint"].get(key))
+
+def bench_history_from_env():
+    """
+    The history in the CRIMSON_BENCH_DIR directory, or None if results are
+    not kept. CRIMSON_BENCH_TOLERANCE sets the tolerance.
+    """
+
+    directory = os.environ.get("CRIMSON_BENCH_DIR")
+    if not directory:
+        return None
+
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    return BenchHistory(os.path.join(directory, "history.jsonl"),
+        float(os.environ.get("CRIMSON_BENCH_TOLERANCE", 0.05)))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark regression check")
+    parser.add_argument("history")
+    parser.add_argument("report", help="JSON written by throughput_bench or latency_bench")
+    parser.add_argument("--name", help="benchmark name, the report file name by default")
+    parser.add_argument("--tolerance", type=float, default=0.05)
+    parser.add_argument("--pin", action="store_true", help="make this run the baseline")
+    options = parser.parse_args()
+
+    with open(options.report) as f:
+        report = json.load(f)
+
+    if "max_rates" in report:
+        metrics = throughput_metrics(report["results"])
+    else:
+        metrics = latency_metrics(report["results"])
+
+    environment = dict(report["host"], device=report.get("device"))
+    name = options.name or os.path.splitext(os.path.basename(options.report))[0]
+
+    history = BenchHistory(options.history, options.tolerance)
+    baseline = history.baseline(name, environment)
+    regressions = history.check(name, metrics, environment, options.pin)
+
+    for regression in regressions:
+        print("{}: {} -> {} ({:+.1%})".format(*regression))
+
+    if regressions:
+        for key, (was, now) in BenchHistory.changes(history.runs(name)[-1], baseline).items():
+            print("{} changed: {} -> {}".format(key, was, now))
+        sys.exit(1)
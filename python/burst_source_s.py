@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import uhd
+
+from sc16_source_s import sc16_source_s, to_sc16
+
+from collections import deque
+
+import numpy as np
+import pmt
+
+def timed_capture(csrc, num_samps, when):
+    """
+    Has a crimson_source_c capture num_samps starting at device time when.
+    Pairs with a burst scheduled for the same time.
+    """
+
+    sc = uhd.stream_cmd_t(uhd.stream_cmd_t.STREAM_MODE_NUM_SAMPS_AND_DONE)
+    sc.num_samps = num_samps
+    sc.stream_now = False
+    sc.time_spec = uhd.time_spec_t(when)
+    csrc.issue_stream_cmd(sc)
+
+class burst_source_s(sc16_source_s):
+    """
+    Feeds a crimson_sink_s fixed length bursts at scheduled device times.
+
+    +-------+                      +------+
+    |       |   tx_sob, tx_time    |      |
+    |   out0|--------------------->|ch0   |
+    | burst |         ...          |...   |
+    |   outn|--------------------->|chn   |
+    +-------+       tx_eob         | csnk |
+                                   +------+
+
+    waveform is one complex burst in short units, shared by all channels,
+    or one per channel. It is converted to sc16 once. Every burst
+    scheduled with schedule(), or posted as a time in seconds to the
+    "bursts" message port, is sent as one SOB/EOB delimited burst tagged
+    with its tx_time, so the crimson transmits only while the burst lasts.
+    Nothing is produced between bursts.
+
+    Pass csrc to schedule() to capture the burst on the RX side as well.
+    """
+
+    def __init__(self, num_channels, waveform):
+        sc16_source_s.__init__(self, "burst_source_s", num_channels, self._produce, self._idle)
+
+        self._burst = self._to_sc16(waveform)
+
+        # Waveform to switch to before the next burst starts.
+        self._next_burst = None
+
+        # Scheduled start times and how far into the current burst we are.
+        self._pending = deque()
+        self._position = 0
+
+        self.message_port_register_in(pmt.intern("bursts"))
+        self.set_msg_handler(pmt.intern("bursts"),
+            lambda msg: self.schedule(pmt.to_double(msg)))
+
+    def _to_sc16(self, waveform):
+        waveform = np.asarray(waveform, dtype=np.complex64)
+        if waveform.ndim == 1:
+            waveform = np.tile(waveform, (self._num_channels, 1))
+
+        if len(waveform) != self._num_channels:
+            raise ValueError("One waveform per channel needed")
+
+        return to_sc16(waveform)
+
+    def set_waveform(self, waveform):
+        """
+        Replaces the waveform from the next burst that starts on. A burst
+        already being sent is finished with the old one.
+        """
+
+        burst = self._to_sc16(waveform)
+
+        with self._ready:
+            self._next_burst = burst
+
+    @property
+    def burst_length(self):
+        """Samples per burst"""
+        return self._burst.shape[1]
+
+    def schedule(self, when, csrc=None):
+        """
+        Sends one burst at device time when, and has csrc capture it if
+        given.
+        """
+
+        if csrc is not None:
+            timed_capture(csrc, self.burst_length, when)
+
+        with self._ready:
+            self._pending.append(when)
+            self._ready.notify()
+
+    def _idle(self):
+        return not self._pending
+
+    def _tag(self, channel, offset, key, value):
+        self.add_item_tag(channel, offset, pmt.intern(key), value)
+
+    def _produce(self, output_items):
+        with self._ready:
+            when = self._pending[0]
+
+            if self._position == 0 and self._next_burst is not None:
+                self._burst, self._next_burst = self._next_burst, None
+
+        count = min(len(output_items[0]), self.burst_length - self._position)
+        offset = self.nitems_written(0)
+
+        for channel, out in enumerate(output_items):
+            out[:count] = self._burst[channel, self._position:self._position + count]
+
+            if self._position == 0:
+                secs = int(when)
+                self._tag(channel, offset, "tx_sob", pmt.PMT_T)
+                self._tag(channel, offset, "tx_time", pmt.make_tuple(
+                    pmt.from_uint64(secs), pmt.from_double(when - secs)))
+
+            if self._position + count == self.burst_length:
+                self._tag(channel, offset + count - 1, "tx_eob", pmt.PMT_T)
+
+        self._position += count
+
+        if self._position == self.burst_length:
+            self._position = 0
+            with self._ready:
+                self._pending.popleft()
+
+        return count
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+def firmware_id(usrp):
+    """
+    Identifies the hardware behind a usrp object for CaptureCache keys.
+    gr-uhd does not expose the firmware version, so this is the board
+    identity UHD reports, which changes with the FPGA and firmware IDs.
+    """
+
+    info = usrp.get_usrp_info(0)
+    return ",".join("{}={}".format(key, info[key]) for key in sorted(info.keys()))
+
+class CaptureCache(object):
+    """
+    Stores captures on disk under a hash of the configuration that made
+    them, so analysis can be rerun later without a radio.
+
+    A configuration is a dict of JSON values, e.g. the frequency, gains,
+    amplitude, rate and channels of a loopback run, plus the firmware ID
+    of the unit. Equal configurations give equal keys whatever the order
+    of the dict. Every capture is a (channels x samples) complex64 array
+    stored as root/ab/abcdef....npy, next to a .json copy of its
+    configuration. Loads memory-map the .npy, so reading a whole sweep
+    back only touches the samples the analysis looks at. With compress
+    the capture goes to a compressed .npz instead, which is smaller but
+    read in full.
+
+    A run that captures one configuration several times, e.g. to check
+    repeatability, tells the captures apart with iteration(), which
+    numbers identical configurations in the order they are asked for.
+
+    In replay mode nothing is recorded and configurations are expected to
+    name their firmware. firmware() gives the one to replay when the
+    cache holds captures of a single firmware.
+
+    Usage:
+        cache = CaptureCache("captures")
+        data = cache.load(config)
+        if data is None:
+            data = capture()
+            cache.save(config, data)
+    """
+
+    def __init__(self, root, replay=False, compress=False):
+        self.root = root
+        self.replay = replay
+        self.compress = compress
+
+        self._lock = threading.Lock()
+        self._firmwares = None
+        self._iterations = {}
+
+        if not os.path.isdir(root):
+            os.makedirs(root)
+
+    @staticmethod
+    def key(config):
+        """Hash of a configuration"""
+        text = json.dumps(config, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def iteration(self, config):
+        """
+        How many times config was asked for before, since the last
+        reset_iterations(). Store it in the configuration, so each
+        repetition of a capture gets its own entry.
+        """
+
+        key = self.key(config)
+
+        with self._lock:
+            count = self._iterations.get(key, 0)
+            self._iterations[key] = count + 1
+
+        return count
+
+    def reset_iterations(self):
+        """Numbers every configuration from 0 again, e.g. per test."""
+
+        with self._lock:
+            self._iterations = {}
+
+    def path(self, key):
+        """Path of a capture without its extension."""
+        return os.path.join(self.root, key[:2], key)
+
+    def __contains__(self, config):
+        path = self.path(self.key(config))
+        return os.path.exists(path + ".npy") or os.path.exists(path + ".npz")
+
+    def load(self, config):
+        """
+        Returns the capture made with config as an array, or None.
+        """
+
+        path = self.path(self.key(config))
+
+        if os.path.exists(path + ".npy"):
+            return np.load(path + ".npy", mmap_mode="r")
+
+        if os.path.exists(path + ".npz"):
+            with np.load(path + ".npz") as archive:
+                return archive["data"]
+
+        return None
+
+    def save(self, config, data):
+        """
+        Stores data, one row per channel, under config and returns the
+        key. Ignored in replay mode.
+        """
+
+        key = self.key(config)
+
+        if self.replay:
+            return key
+
+        data = np.asarray(data, dtype=np.complex64)
+        path = self.path(key)
+
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # Made by another worker meanwhile.
+                if not os.path.isdir(directory):
+                    raise
+
+        # Write to a temporary file and rename it into place, so a reader
+        # never sees half a capture.
+        ext = ".npz" if self.compress else ".npy"
+        handle, temp = tempfile.mkstemp(suffix=ext, dir=directory)
+        with os.fdopen(handle, "wb") as out:
+            if self.compress:
+                np.savez_compressed(out, data=data)
+            else:
+                np.save(out, data)
+        os.rename(temp, path + ext)
+
+        with open(path + ".json", "w") as out:
+            json.dump(config, out, sort_keys=True)
+
+        with self._lock:
+            if self._firmwares is not None and "firmware" in config:
+                self._firmwares.add(config["firmware"])
+
+        return key
+
+    def firmwares(self):
+        """Firmware IDs of the recorded captures."""
+
+        with self._lock:
+            if self._firmwares is None:
+                self._firmwares = set()
+
+                for directory, dirs, files in os.walk(self.root):
+                    for name in files:
+                        if name.endswith(".json"):
+                            with open(os.path.join(directory, name)) as meta:
+                                firmware = json.load(meta).get("firmware")
+                            if firmware is not None:
+                                self._firmwares.add(firmware)
+
+            return set(self._firmwares)
+
+    def firmware(self):
+        """
+        The firmware ID to replay: the CRIMSON_FIRMWARE environment
+        variable, or the only firmware the cache holds captures of.
+        """
+
+        if "CRIMSON_FIRMWARE" in os.environ:
+            return os.environ["CRIMSON_FIRMWARE"]
+
+        firmwares = self.firmwares()
+        if len(firmwares) != 1:
+            raise LookupError("{} firmwares in {}, set CRIMSON_FIRMWARE to pick one".format(
+                len(firmwares), self.root))
+
+        return firmwares.pop()
+
+def capture_cache_from_env():
+    """
+    The CaptureCache at CRIMSON_CAPTURE_CACHE, replaying if CRIMSON_REPLAY
+    is set to 1, or None if no cache is configured.
+    """
+
+    root = os.environ.get("CRIMSON_CAPTURE_CACHE")
+    if not root:
+        return None
+
+    return CaptureCache(root, replay=os.environ.get("CRIMSON_REPLAY") == "1")
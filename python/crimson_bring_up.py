@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import uhd
+
+from crimson_source_c import crimson_source_c
+from crimson_sink_s import crimson_sink_s
+from settings_cache import SettingsCache, per_channel
+
+from collections import OrderedDict, namedtuple
+
+import threading
+import time
+
+def concurrently(*calls):
+    """
+    Runs every call on its own thread and waits for all of them. The
+    first exception raised by a call is raised again once all are done.
+    """
+
+    errors = []
+
+    def run(call):
+        try:
+            call()
+        except Exception, e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(call,)) for call in calls]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+
+class BringUp(namedtuple("BringUp", ["csrc", "csnk", "rx_cache", "tx_cache", "phases"])):
+    """
+    Source and sink made by bring_up(), either None if not asked for, and
+    the SettingsCache bound to each. phases holds the seconds each startup
+    phase took, in order, and the total.
+    """
+
+    def report(self):
+        return ", ".join("{} {:.3f} s".format(phase, secs) for phase, secs in self.phases.items())
+
+def configure(caches, channels, sample_rate, center_freq, gains,
+        clock_source="internal", lo_offset=0.0, phases=None):
+    """
+    Applies the settings of SettingsCache.configure() to the usrp object
+    of every cache in caches, with its gain from gains. Frequencies, gains
+    and LO offsets can be per channel as for SettingsCache. Device wide
+    settings are written in turn, the rate before the clock source as the
+    factories do, since a clock source change resyncs the device. Then the
+    objects are tuned at once, each on its own thread writing the
+    frequency then the gain of its channels in turn, so the LO settling of
+    the source overlaps the sink's. gr-uhd does not make management calls
+    on one usrp object thread safe, so each object only ever has one call
+    in flight. Adds the time of both phases to phases if given.
+    """
+
+    if phases is None:
+        phases = OrderedDict()
+
+    center_freqs = per_channel(center_freq, channels, "center frequency")
+    lo_offsets = per_channel(lo_offset, channels, "LO offset")
+    gains = [per_channel(gain, channels, "gain") for gain in gains]
+
+    start = time.time()
+    for cache in caches:
+        cache.set_samp_rate(sample_rate)
+        cache.set_clock_source(clock_source)
+    phases["rate_clock"] = time.time() - start
+
+    def tune(cache, side_gains):
+        for index, gain in enumerate(side_gains):
+            cache.set_center_freq(center_freqs[index], index, lo_offsets[index])
+            cache.set_gain(gain, index)
+
+    start = time.time()
+    concurrently(*[
+        lambda cache=cache, side_gains=side_gains: tune(cache, side_gains)
+        for cache, side_gains in zip(caches, gains)])
+    phases["channels"] = time.time() - start
+
+    return phases
+
+def bring_up(channels, sample_rate, center_freq, rx_gain=None, tx_gain=None,
+        rx_cache=None, tx_cache=None, args="crimson", clock_source="internal", lo_offset=0.0,
+        first_sample=True):
+    """
+    Makes the crimson_source_c and crimson_sink_s of a loopback with their
+    independent startup steps overlapped. Pass rx_gain for a source,
+    tx_gain for a sink, or both. Settings can be per channel as for the
+    factories. Returns a BringUp.
+
+    The factories make every device write in turn. Here both objects
+    connect at once through the factories, then configure() writes the
+    settings of both, and both times are zeroed at once. With
+    first_sample and a source, the last phase times a one sample
+    acquisition, from the stream command to the first sample received.
+    """
+
+    if rx_cache is None:
+        rx_cache = SettingsCache()
+    if tx_cache is None:
+        tx_cache = SettingsCache()
+
+    sides = []
+    if rx_gain is not None:
+        sides.append(("rx", crimson_source_c, rx_gain, rx_cache))
+    if tx_gain is not None:
+        sides.append(("tx", crimson_sink_s, tx_gain, tx_cache))
+
+    phases = OrderedDict()
+    usrps = {}
+    total = time.time()
+
+    start = time.time()
+    concurrently(*[
+        lambda side=side, make=make, gain=gain, cache=cache: usrps.__setitem__(side,
+            make(channels, sample_rate, center_freq, gain, cache, args, clock_source, lo_offset,
+                configure=False))
+        for side, make, gain, cache in sides])
+    phases["connect"] = time.time() - start
+
+    caches = dict((side, cache) for side, make, gain, cache in sides)
+
+    configure([caches[side] for side, make, gain, cache in sides], channels, sample_rate,
+        center_freq, [gain for side, make, gain, cache in sides], clock_source, lo_offset, phases)
+
+    start = time.time()
+    concurrently(*[
+        lambda usrp=usrp: usrp.set_time_now(uhd.time_spec_t(0.0))
+        for usrp in usrps.values()])
+    phases["time"] = time.time() - start
+
+    if first_sample and "rx" in usrps:
+        start = time.time()
+        usrps["rx"].finite_acquisition_v(1)
+        phases["first_sample"] = time.time() - start
+
+    phases["total"] = time.time() - total
+
+    return BringUp(usrps.get("rx"), usrps.get("tx"), caches.get("rx"), caches.get("tx"), phases)
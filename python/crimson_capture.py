@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+import numpy as np
+
+from settings_cache import SettingsCache
+
+# UHD's own Python API. gnuradio.uhd does not expose the RX streamer.
+try:
+    import uhd as libuhd
+except ImportError:
+    libuhd = None
+
+class CrimsonCapture(object):
+    """
+    Burst captures from the crimson straight into NumPy.
+
+    Counterpart to crimson_source_c for analysis captures. Samples are
+    received by the UHD RX streamer directly into a preallocated
+    (channels x num_samps) complex64 array, without a flowgraph, vector
+    sinks or copies in between.
+
+    This opens its own connection to the crimson, so do not stream from a
+    crimson_source_c on the same channels at the same time.
+    """
+
+    def __init__(self, channels, sample_rate, center_freq, gain, cache=None):
+        if libuhd is None:
+            raise ImportError("CrimsonCapture needs the UHD Python API")
+
+        self.channels = list(channels)
+        self.usrp = libuhd.usrp.MultiUSRP("crimson")
+
+        # One RX streamer per channel selection, created on first use.
+        self._streamers = {}
+
+        if cache is None:
+            cache = SettingsCache()
+
+        cache.attach(self.usrp)
+        self.cache = cache
+
+        usrp = self.usrp
+
+        cache.apply("samp_rate", sample_rate,
+            lambda: usrp.set_rx_rate(sample_rate))
+        cache.apply("clock_source", "internal",
+            lambda: usrp.set_clock_source("internal"))
+
+        for channel in self.channels:
+            self.set_center_freq(center_freq, channel)
+            self.set_gain(gain, channel)
+
+        usrp.set_time_now(libuhd.types.TimeSpec(0.0))
+
+    def set_center_freq(self, center_freq, channel):
+        return self.cache.apply("center_freq", center_freq,
+            lambda: self.usrp.set_rx_freq(libuhd.types.TuneRequest(center_freq), channel), channel)
+
+    def set_gain(self, gain, channel):
+        return self.cache.apply("gain", gain,
+            lambda: self.usrp.set_rx_gain(gain, channel), channel)
+
+    def get_time_now(self):
+        """Device time in seconds"""
+        return self.usrp.get_time_now().get_real_secs()
+
+    def _streamer(self, channels):
+        key = tuple(channels)
+
+        if key not in self._streamers:
+            stream_args = libuhd.usrp.StreamArgs("fc32", "sc16")
+            stream_args.channels = list(channels)
+            self._streamers[key] = self.usrp.get_rx_stream(stream_args)
+
+        return self._streamers[key]
+
+    def capture(self, num_samps, channels=None, at_time=None, timeout=1.0):
+        """
+        Captures num_samps per channel, now or at device time at_time (in
+        seconds). Returns the (channels x num_samps) complex64 array and the
+        time spec of its first sample.
+        """
+
+        if channels is None:
+            channels = self.channels
+
+        channels = list(channels)
+        streamer = self._streamer(channels)
+
+        buff = np.empty((len(channels), num_samps), dtype=np.complex64)
+        metadata = libuhd.types.RXMetadata()
+
+        sc = libuhd.types.StreamCMD(libuhd.types.StreamMode.num_done)
+        sc.num_samps = num_samps
+
+        if at_time is None:
+            sc.stream_now = True
+        else:
+            sc.stream_now = False
+            sc.time_spec = libuhd.types.TimeSpec(at_time)
+
+            # Wait for the burst to start on top of the usual timeout.
+            timeout += max(at_time - self.get_time_now(), 0.0)
+
+        streamer.issue_stream_cmd(sc)
+
+        received = 0
+        time_spec = None
+
+        while received < num_samps:
+            # View of the unfilled tail. Each row is contiguous, and the
+            # streamer writes row by row through strides[0], so the samples
+            # land in buff. A list of rows would be copied to a temporary.
+            tail = buff[:, received:]
+
+            count = streamer.recv(tail, metadata, timeout)
+
+            if metadata.error_code != libuhd.types.RXMetadataErrorCode.none:
+                raise RuntimeError("Capture failed: " + metadata.strerror())
+
+            # Copied, as metadata is overwritten by the next recv.
+            if time_spec is None and count > 0:
+                time_spec = libuhd.types.TimeSpec(metadata.time_spec.get_full_secs(),
+                    metadata.time_spec.get_frac_secs())
+
+            received += count
+
+            # Samples of a burst arrive back to back.
+            timeout = 0.1
+
+        return buff, time_spec
@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr
+from gnuradio import blocks
+
+from collections import namedtuple
+
+import threading
+import Queue
+
+import numpy as np
+import pmt
+
+# One flow control event. samples is the number of samples lost, where known.
+CrimsonEvent = namedtuple("CrimsonEvent", ["kind", "channel", "time", "samples"])
+
+# Event kind of every symbol gr-uhd lists in the event_code of the
+# async messages of crimson_sink_s, one per uhd::async_metadata_t flag.
+ASYNC_EVENTS = {
+    "burst_ack": "burst_ack",
+    "underflow": "underflow",
+    "underflow_in_packet": "underflow",
+    "seq_error": "seq_error",
+    "seq_error_in_burst": "seq_error",
+    "time_error": "late",
+}
+
+class crimson_event_monitor(gr.sync_block):
+    """
+    Collects overflow, underflow and late packet events from a
+    crimson_source_c and a crimson_sink_s in-process.
+
+    +------+                                          +------+
+    |      |    +---------------+  async_msgs         |      |
+    |   ch0|--->|in0            |<--------------------|      |
+    |   ...|    |  monitor      |                     | csnk |
+    |   chn|--->|inn      events|---> message port    +------+
+    | csrc |    +---------------+---> callbacks, queue
+    +------+
+
+    TX events come from the async_msgs message port of the sink. The RX
+    side reports no events, so overflows are found from the rx_time tags
+    the source places after every discontinuity: a tag whose time is ahead
+    of the samples counted since the previous one means samples were
+    dropped. Only watch continuous streams for overflows, as every new
+    burst of a NUM_SAMPS_AND_DONE capture starts with such a jump.
+
+    At high rates, pass a decimation so watch() feeds the monitor only
+    every decimation-th sample, through a keep_one_in_n that carries the
+    tags along. Their offsets are then only known to decimation samples,
+    so drops of up to decimation samples go unreported.
+
+    Every event is published on the "events" message port as a dict, put
+    on the queue and passed to the callbacks (from the scheduler thread).
+    Per channel counters are kept for each kind of event.
+    """
+
+    def __init__(self, num_channels=0, sample_rate=1.0, decimation=1):
+        gr.sync_block.__init__(self,
+            name="crimson_event_monitor",
+            in_sig=[np.complex64] * num_channels or None,
+            out_sig=None)
+
+        self._sample_rate = float(sample_rate)
+        self._decimation = decimation
+
+        # Samples the tag offsets can be off by once decimated.
+        self._slack = decimation if decimation > 1 else 0
+
+        # Last (absolute offset, seconds) of every input's rx_time tag.
+        self._time_tags = [None] * num_channels
+
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._counts = {}
+
+        self.queue = Queue.Queue()
+
+        self.message_port_register_in(pmt.intern("async_msgs"))
+        self.set_msg_handler(pmt.intern("async_msgs"), self._handle_async_msg)
+        self.message_port_register_out(pmt.intern("events"))
+
+    def watch(self, tb, csrc=None, csnk=None):
+        """
+        Connects the monitor to a source, a sink or both in tb.
+        """
+
+        if csrc is not None:
+            for channel in xrange(len(self._time_tags)):
+                if self._decimation > 1:
+                    tb.connect((csrc, channel), blocks.keep_one_in_n(gr.sizeof_gr_complex,
+                        self._decimation), (self, channel))
+                else:
+                    tb.connect((csrc, channel), (self, channel))
+
+        if csnk is not None:
+            tb.msg_connect(csnk, "async_msgs", self, "async_msgs")
+
+    def add_callback(self, callback):
+        """callback(event) is called with every CrimsonEvent."""
+        self._callbacks.append(callback)
+
+    def count(self, kind, channel=None):
+        """
+        Number of events of a kind so far, on one channel or all of them.
+        """
+
+        with self._lock:
+            return sum(count for (event_kind, event_channel), count in self._counts.items()
+                if event_kind == kind and channel in (None, event_channel))
+
+    def counts(self):
+        """Copy of the counters keyed on (kind, channel)."""
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self):
+        """Clears the counters and the queue."""
+        with self._lock:
+            self._counts = {}
+
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+    def _emit(self, kind, channel, secs, samples=None):
+        event = CrimsonEvent(kind, channel, secs, samples)
+
+        with self._lock:
+            key = (kind, channel)
+            self._counts[key] = self._counts.get(key, 0) + 1
+            count = self._counts[key]
+
+        msg = pmt.make_dict()
+        msg = pmt.dict_add(msg, pmt.intern("event"), pmt.intern(kind))
+        msg = pmt.dict_add(msg, pmt.intern("channel"), pmt.from_long(channel))
+        msg = pmt.dict_add(msg, pmt.intern("count"), pmt.from_long(count))
+
+        if secs is not None:
+            msg = pmt.dict_add(msg, pmt.intern("time"), pmt.from_double(secs))
+        if samples is not None:
+            msg = pmt.dict_add(msg, pmt.intern("samples"), pmt.from_long(samples))
+
+        self.message_port_pub(pmt.intern("events"), msg)
+        self.queue.put(event)
+
+        for callback in self._callbacks:
+            callback(event)
+
+    def _handle_async_msg(self, msg):
+        # gr-uhd publishes a dict of event_code, a list of symbols, the
+        # channel as a uint64 and, when known, the time_spec as a pair of
+        # (uint64 full seconds . double fractional seconds).
+        codes = pmt.dict_ref(msg, pmt.intern("event_code"), pmt.PMT_NIL)
+        channel = pmt.to_uint64(pmt.dict_ref(msg, pmt.intern("channel"), pmt.from_uint64(0)))
+
+        secs = None
+        time_spec = pmt.dict_ref(msg, pmt.intern("time_spec"), pmt.PMT_NIL)
+        if pmt.is_pair(time_spec):
+            secs = pmt.to_uint64(pmt.car(time_spec)) + pmt.to_double(pmt.cdr(time_spec))
+
+        if pmt.is_symbol(codes):
+            codes = pmt.list1(codes)
+
+        # One event per kind, e.g. underflow and underflow_in_packet
+        # together are one underflow.
+        kinds = []
+        while pmt.is_pair(codes):
+            kind = ASYNC_EVENTS.get(pmt.symbol_to_string(pmt.car(codes)))
+            codes = pmt.cdr(codes)
+
+            if kind is not None and kind not in kinds:
+                kinds.append(kind)
+
+        for kind in kinds:
+            self._emit(kind, channel, secs)
+
+    def work(self, input_items, output_items):
+        count = len(input_items[0])
+
+        for channel in xrange(len(input_items)):
+            for tag in self.get_tags_in_window(channel, 0, count, pmt.intern("rx_time")):
+                secs = pmt.to_uint64(pmt.tuple_ref(tag.value, 0)) + pmt.to_double(pmt.tuple_ref(tag.value, 1))
+
+                offset = tag.offset * self._decimation
+
+                last = self._time_tags[channel]
+                self._time_tags[channel] = (offset, secs)
+
+                if last is None:
+                    continue
+
+                expected = last[1] + (offset - last[0]) / self._sample_rate
+                dropped = int(round((secs - expected) * self._sample_rate))
+
+                if dropped > self._slack:
+                    self._emit("overflow", channel, secs, dropped)
+
+        return count
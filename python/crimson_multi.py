@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr
+from gnuradio import uhd
+
+from crimson_source_c import crimson_source_c
+from crimson_sink_s import crimson_sink_s
+from settings_cache import per_channel
+
+import time
+
+def channel_map(channels):
+    """
+    Spreads a logical channel list over several crimsons. channels holds
+    one channel list per device. Returns a (device index, stream index)
+    pair per logical channel, device by device.
+    """
+
+    return [(unit, index)
+        for unit in xrange(len(channels))
+        for index in xrange(len(channels[unit]))]
+
+def sync_time_pps(usrps, timeout=2.0):
+    """
+    Zeroes the time of every unit on the same PPS edge. The units must
+    share a PPS and a 10 MHz reference.
+    """
+
+    for usrp in usrps:
+        usrp.set_time_source("external", 0)
+
+    # Wait for an edge so setting the next one cannot straddle it.
+    last = usrps[0].get_time_last_pps().get_real_secs()
+    deadline = time.time() + timeout
+
+    while usrps[0].get_time_last_pps().get_real_secs() == last:
+        if time.time() > deadline:
+            raise RuntimeError("No PPS edge seen within {:.1f} s".format(timeout))
+        time.sleep(0.01)
+
+    for usrp in usrps:
+        usrp.set_time_next_pps(uhd.time_spec_t(0.0))
+
+    # Let the edge the time was set for pass.
+    time.sleep(1.1)
+
+class _crimson_multi(object):
+    """
+    What the multi-unit source and sink have in common.
+    """
+
+    def _setup(self, devices, channels):
+        self.devices = list(devices)
+
+        # One channel list used on every device, or one per device.
+        if channels and not isinstance(channels[0], (list, tuple, xrange)):
+            channels = [channels] * len(self.devices)
+
+        if len(channels) != len(self.devices):
+            raise ValueError("One channel list per device needed")
+
+        self.channels = [list(chans) for chans in channels]
+        self.channel_map = channel_map(self.channels)
+
+    def _per_unit(self, value, name):
+        """
+        Splits a setting given per logical channel, in the forms
+        per_channel() takes, into the values of each unit.
+        """
+
+        values = per_channel(value, range(len(self.channel_map)), name)
+
+        per_unit = [[] for device in self.devices]
+        for (unit, index), value in zip(self.channel_map, values):
+            per_unit[unit].append(value)
+
+        return per_unit
+
+    def get_time_now(self):
+        return self.units[0].get_time_now()
+
+    def sync(self):
+        """Aligns the time of every unit on PPS."""
+        sync_time_pps(self.units)
+
+    def set_start_time(self, time_spec):
+        """Starts every unit streaming at the same device time."""
+        for unit in self.units:
+            unit.set_start_time(time_spec)
+
+    def unit(self, channel):
+        """Returns the usrp object and stream index behind a logical channel."""
+        unit, index = self.channel_map[channel]
+        return self.units[unit], index
+
+    def set_center_freq(self, center_freq, channel):
+        usrp, index = self.unit(channel)
+        return usrp.set_center_freq(center_freq, index)
+
+    def set_gain(self, gain, channel):
+        usrp, index = self.unit(channel)
+        return usrp.set_gain(gain, index)
+
+class crimson_multi_source_c(gr.hier_block2, _crimson_multi):
+    """
+    Several crimsons behind one source with one output per logical channel.
+
+    +--------------+
+    | +------+     |
+    | |   ch0|---->|out0
+    | |   ch1|---->|out1
+    | | csrc0|     |
+    | +------+     |
+    | +------+     |
+    | |   ch0|---->|out2
+    | |   ch1|---->|out3
+    | | csrc1|     |
+    | +------+     |
+    +--------------+
+
+    devices holds the device args of each unit. The units run off the
+    external reference and their times are aligned on PPS, so a timed
+    stream command issued through this block starts them all on the same
+    sample.
+
+    center_freq, gain and lo_offset are one value for every channel, a
+    sequence in logical channel order or a dict keyed on logical channel.
+    """
+
+    def __init__(self, devices, channels, sample_rate, center_freq, gain, sync=True,
+            lo_offset=0.0):
+        self._setup(devices, channels)
+
+        center_freqs = self._per_unit(center_freq, "center frequency")
+        gains = self._per_unit(gain, "gain")
+        lo_offsets = self._per_unit(lo_offset, "LO offset")
+
+        num_outputs = len(self.channel_map)
+        gr.hier_block2.__init__(self,
+            "crimson_multi_source_c",
+            gr.io_signature(0, 0, 0),
+            gr.io_signature(num_outputs, num_outputs, gr.sizeof_gr_complex))
+
+        self.units = [
+            crimson_source_c(self.channels[unit], sample_rate, center_freqs[unit], gains[unit],
+                args=device, clock_source="external", lo_offset=lo_offsets[unit])
+            for unit, device in enumerate(self.devices)]
+
+        for port, (unit, index) in enumerate(self.channel_map):
+            self.connect((self.units[unit], index), (self, port))
+
+        if sync:
+            self.sync()
+
+    def issue_stream_cmd(self, cmd):
+        """Issues the same stream command to every unit."""
+        for unit in self.units:
+            unit.issue_stream_cmd(cmd)
+
+class crimson_multi_sink_s(gr.hier_block2, _crimson_multi):
+    """
+    Several crimsons behind one sink with one input per logical channel.
+    The counterpart of crimson_multi_source_c, expecting interleaved shorts
+    like crimson_sink_s.
+    """
+
+    def __init__(self, devices, channels, sample_rate, center_freq, gain, sync=True,
+            lo_offset=0.0):
+        self._setup(devices, channels)
+
+        center_freqs = self._per_unit(center_freq, "center frequency")
+        gains = self._per_unit(gain, "gain")
+        lo_offsets = self._per_unit(lo_offset, "LO offset")
+
+        num_inputs = len(self.channel_map)
+        gr.hier_block2.__init__(self,
+            "crimson_multi_sink_s",
+            gr.io_signature(num_inputs, num_inputs, 2 * gr.sizeof_short),
+            gr.io_signature(0, 0, 0))
+
+        self.units = [
+            crimson_sink_s(self.channels[unit], sample_rate, center_freqs[unit], gains[unit],
+                args=device, clock_source="external", lo_offset=lo_offsets[unit])
+            for unit, device in enumerate(self.devices)]
+
+        for port, (unit, index) in enumerate(self.channel_map):
+            self.connect((self, port), (self.units[unit], index))
+
+        if sync:
+            self.sync()
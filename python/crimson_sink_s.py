@@ -21,23 +21,37 @@
 
 from gnuradio import uhd
 
-def crimson_sink_s(channels, sample_rate, center_freq, gain):
+from settings_cache import SettingsCache
+
+def crimson_sink_s(channels, sample_rate, center_freq, gain, cache=None,
+        args="crimson", clock_source="internal", lo_offset=0.0, otw_format="sc16",
+        configure=True):
     """
     Connects to the crimson and returns a sink object expecting interleaved
     shorts of complex data.
+    Pass a SettingsCache to reconfigure the returned object later on
+    without rewriting settings that did not change. args selects the
+    device when more than one crimson is on the network.
+
+    center_freq, gain and lo_offset apply to every channel, or give a
+    sequence in channel order or a dict keyed on channel number to set
+    each channel on its own, e.g. center_freq={0: 100e6, 1: 433e6}.
+    otw_format is the sample format on the wire, e.g. "sc8" to halve the
+    network load. Pass configure=False to only connect and bind the cache,
+    leaving the settings and the device time to the caller.
     """
 
     usrp_sink = uhd.usrp_sink(
-        "crimson",
-        uhd.stream_args(cpu_format="sc16", otw_format="sc16", channels=channels))   
+        args,
+        uhd.stream_args(cpu_format="sc16", otw_format=otw_format, channels=channels))   
 
-    usrp_sink.set_samp_rate(sample_rate)
-    usrp_sink.set_clock_source("internal")
+    if cache is None:
+        cache = SettingsCache()
 
-    for channel in channels:
-        usrp_sink.set_center_freq(center_freq, channel)
-        usrp_sink.set_gain(gain, channel)
+    cache.attach(usrp_sink)
 
-    usrp_sink.set_time_now(uhd.time_spec_t(0.0))
+    if configure:
+        cache.configure(channels, sample_rate, center_freq, gain, clock_source, lo_offset)
+        usrp_sink.set_time_now(uhd.time_spec_t(0.0))
 
     return usrp_sink
@@ -21,22 +21,36 @@
 
 from gnuradio import uhd
 
-def crimson_source_c(channels, sample_rate, center_freq, gain):
+from settings_cache import SettingsCache
+
+def crimson_source_c(channels, sample_rate, center_freq, gain, cache=None,
+        args="crimson", clock_source="internal", lo_offset=0.0, otw_format="sc16",
+        configure=True):
     """
     Connects to the crimson and returns a complex source object.
+    Pass a SettingsCache to reconfigure the returned object later on
+    without rewriting settings that did not change. args selects the
+    device when more than one crimson is on the network.
+
+    center_freq, gain and lo_offset apply to every channel, or give a
+    sequence in channel order or a dict keyed on channel number to set
+    each channel on its own, e.g. center_freq={0: 100e6, 1: 433e6}.
+    otw_format is the sample format on the wire, e.g. "sc8" to halve the
+    network load. Pass configure=False to only connect and bind the cache,
+    leaving the settings and the device time to the caller.
     """
 
     usrp_source = uhd.usrp_source(
-        "crimson", 
-        uhd.stream_args(cpu_format="fc32", otw_format="sc16", channels=channels), False)
+        args,
+        uhd.stream_args(cpu_format="fc32", otw_format=otw_format, channels=channels), False)
 
-    usrp_source.set_samp_rate(sample_rate)
-    usrp_source.set_clock_source("internal")
+    if cache is None:
+        cache = SettingsCache()
 
-    for channel in channels:
-        usrp_source.set_center_freq(center_freq, channel)
-        usrp_source.set_gain(gain, channel)
+    cache.attach(usrp_source)
 
-    usrp_source.set_time_now(uhd.time_spec_t(0.0))
+    if configure:
+        cache.configure(channels, sample_rate, center_freq, gain, clock_source, lo_offset)
+        usrp_source.set_time_now(uhd.time_spec_t(0.0))
 
     return usrp_source
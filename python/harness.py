@@ -0,0 +1,328 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+"""
+Shared pieces of the loopback test harness.
+"""
+
+from gnuradio import gr
+from gnuradio import blocks
+from gnuradio import analog
+from gnuradio import uhd
+
+from crimson_bring_up import bring_up
+from crimson_events import crimson_event_monitor
+from burst_source_s import burst_source_s
+from starve_source_s import starve_source_s
+from crimson_sink_s import crimson_sink_s
+
+from collections import namedtuple
+
+import threading
+import time
+
+import numpy as np
+
+def wait_for_samples(vsnks, num_samps, timeout, done=None, grace=0.1, poll=0.001,
+        start=None):
+    """
+    Waits until every vector sink has read num_samps samples and returns
+    True, or returns False once timeout seconds have passed.
+
+    The sinks' item counters are polled rather than their data, which
+    would be copied whole on every poll. start holds the counter of every
+    sink from before the capture was requested, for a flowgraph that was
+    already running. Without it the flowgraph is taken to be new, with the
+    counters from zero.
+
+    done is an optional threading.Event set when the capture is known to
+    be over, such as on the burst_ack of a TX burst. The samples still in
+    flight then get grace seconds to arrive instead of the full timeout.
+    """
+
+    if start is None:
+        start = [0] * len(vsnks)
+
+    deadline = time.time() + timeout
+
+    while True:
+        if all(vsnk.nitems_read(0) - first >= num_samps for vsnk, first in zip(vsnks, start)):
+            return True
+
+        now = time.time()
+
+        if done is not None and done.is_set():
+            deadline = min(deadline, now + grace)
+            done = None
+
+        if now >= deadline:
+            return False
+
+        time.sleep(poll)
+
+def drain(vsnks, quiet=0.05, timeout=1.0, poll=0.001):
+    """
+    Waits until no vector sink has read a sample for quiet seconds, so
+    samples still in flight have arrived, and returns True, or returns
+    False once timeout seconds have passed.
+    """
+
+    deadline = time.time() + timeout
+    counts = None
+
+    while time.time() < deadline:
+        latest = [vsnk.nitems_read(0) for vsnk in vsnks]
+
+        if latest != counts:
+            counts = latest
+            settled = time.time() + quiet
+        elif time.time() >= settled:
+            return True
+
+        time.sleep(poll)
+
+    return False
+
+# Underflows seen while fed (before) and after starving (after), and the
+# seconds from the last sample to the first underflow, None if none came.
+UnderflowCheck = namedtuple("UnderflowCheck", ["before", "after", "latency"])
+
+def check_underflow(channels, sample_rate, center_freq=15e6, lead=1.0, timeout=2.0,
+        args="crimson"):
+    """
+    Streams to the crimson for lead seconds, then starves the TX stream
+    and waits up to timeout seconds for the underflow the sink reports.
+
+    +--------+    +------+  async_msgs  +---------+
+    | starve |--->| csnk |------------->| monitor |
+    +--------+    +------+              +---------+
+
+    The latency runs from the host time the last samples left the starve
+    source to the host time the async message arrived, so it includes
+    draining the GNU Radio and UHD buffers as well as the round trip of
+    the report.
+    """
+
+    tb = gr.top_block()
+
+    ssrc = starve_source_s(len(channels))
+    csnk = crimson_sink_s(channels, sample_rate, center_freq, 0.0, args=args)
+
+    for index in xrange(len(channels)):
+        tb.connect((ssrc, index), (csnk, index))
+
+    underflows = []
+    underflow = threading.Event()
+
+    def on_event(event):
+        if event.kind == "underflow":
+            underflows.append(time.time())
+            underflow.set()
+
+    monitor = crimson_event_monitor()
+    monitor.add_callback(on_event)
+    monitor.watch(tb, csnk=csnk)
+
+    tb.start()
+
+    try:
+        time.sleep(lead)
+
+        before = len(underflows)
+        underflow.clear()
+
+        ssrc.starve()
+        underflow.wait(timeout)
+    finally:
+        tb.stop()
+        tb.wait()
+
+    latency = None
+    if len(underflows) > before:
+        latency = underflows[before] - ssrc.last_sample
+
+    return UnderflowCheck(before, len(underflows) - before, latency)
+
+class CapturedSink(object):
+    """
+    What a vector sink held at the end of a run, so it survives the sink
+    being reset for the next one, or a capture read back from a
+    CaptureCache. Reads like a vector sink.
+    """
+
+    def __init__(self, data, tags=()):
+        self._data = data
+        self._tags = tags
+
+    def data(self):
+        return self._data
+
+    def tags(self):
+        return self._tags
+
+class LoopbackFixture(object):
+    """
+    The TX and RX chains of the loopback test, built and started once and
+    reused by every run.
+
+                                +------+ +------+
+    +--------+    +--------+    |      | |      |    +---------+
+    | sig[0] |--->| c2s[0] |--->|ch0   | |   ch0|--->| vsnk[0] |
+    +--------+    +--------+    | ...  | | ...  |    +---------+
+    +--------+    +--------+    |      | |      |    +---------+
+    | sig[n] |--->| c2s[n] |--->|chn   | |   chn|--->| vsnk[n] |
+    +--------+    +--------+    | csnk | | csrc |    +---------+
+                                +------+ +------+
+
+    With tx_burst a burst_source_s feeds csnk instead, sending one burst
+    around each capture, and its burst_ack ends the run.
+
+    A run only writes the settings that changed, unless told to retune,
+    resets the vector sinks and issues a new timed stream command, so the
+    flowgraph, its blocks and its threads outlive the runs. TX streams
+    without a break, so captures start on a whole number of tone periods
+    of device time, which puts every capture at the same tone phase. A
+    capture that times out is cancelled, and its late samples drained,
+    before the run returns. stop() it when done, or to let
+    another flowgraph use the crimson; the next run starts it again.
+    args selects the crimson.
+    """
+
+    def __init__(self, channels, sample_rate, wave_freq=1e6, num_samps=64,
+            tx_burst=False, margin=1e-3, args="crimson"):
+        self.channels = list(channels)
+        self.sample_rate = sample_rate
+        self.wave_freq = wave_freq
+        self.num_samps = num_samps
+        self.tx_burst = tx_burst
+
+        # Time the TX burst starts ahead of the capture and ends after it.
+        self.margin = margin
+
+        self.tb = gr.top_block()
+        self._running = False
+
+        up = bring_up(self.channels, sample_rate, 0.0, rx_gain=0.0, tx_gain=0.0, args=args)
+        self.csnk, self.csrc = up.csnk, up.csrc
+        self.rx_cache, self.tx_cache = up.rx_cache, up.tx_cache
+
+        if tx_burst:
+            t = np.arange(num_samps + 2 * int(margin * sample_rate)) / sample_rate
+            self._wave = np.exp(2j * np.pi * wave_freq * t)
+
+            self.bsrc = burst_source_s(len(self.channels), 0.0 * self._wave)
+
+            for index in xrange(len(self.channels)):
+                self.tb.connect((self.bsrc, index), (self.csnk, index))
+
+            self._burst_done = threading.Event()
+            self.monitor = crimson_event_monitor()
+            self.monitor.add_callback(lambda event:
+                event.kind == "burst_ack" and self._burst_done.set())
+            self.monitor.watch(self.tb, csnk=self.csnk)
+        else:
+            self.sigs = [
+                analog.sig_source_c(sample_rate, analog.GR_SIN_WAVE, wave_freq, 0.0, 0.0)
+                for channel in self.channels]
+
+            c2ss = [
+                blocks.complex_to_interleaved_short(True)
+                for channel in self.channels]
+
+            for index in xrange(len(self.channels)):
+                self.tb.connect(self.sigs[index], c2ss[index], (self.csnk, index))
+
+            self._burst_done = None
+
+        self.vsnk = [blocks.vector_sink_c() for channel in self.channels]
+
+        for index in xrange(len(self.channels)):
+            self.tb.connect((self.csrc, index), self.vsnk[index])
+
+        # Reset TX and RX times to be roughly in sync.
+        self.csnk.set_time_now(uhd.time_spec_t(0.0))
+        self.csrc.set_time_now(uhd.time_spec_t(0.0))
+
+    def run(self, rx_gain, tx_amp, centre_freq, delay, timeout, retune=False):
+        """
+        Captures num_samps on every channel at the first tone period
+        boundary delay seconds from now and returns a CapturedSink per
+        channel. Gives up timeout seconds after the capture was due. With
+        retune the frequencies are written even if unchanged, as a new
+        flowgraph would.
+        """
+
+        if retune:
+            self.tx_cache.invalidate("center_freq")
+            self.rx_cache.invalidate("center_freq")
+
+        self.tx_cache.configure(self.channels, self.sample_rate, centre_freq, 0.0)
+        self.rx_cache.configure(self.channels, self.sample_rate, centre_freq, rx_gain)
+
+        if self.tx_burst:
+            self.bsrc.set_waveform(tx_amp * self._wave)
+            self._burst_done.clear()
+        else:
+            for sig in self.sigs:
+                sig.set_amplitude(tx_amp)
+
+        for vsnk in self.vsnk:
+            vsnk.reset()
+
+        if not self._running:
+            self.tb.start()
+            self._running = True
+
+        # The sinks count on from earlier runs.
+        start = [vsnk.nitems_read(0) for vsnk in self.vsnk]
+
+        when = self.csrc.get_time_now().get_real_secs() + delay
+        when = np.ceil(when * self.wave_freq) / self.wave_freq
+
+        sc = uhd.stream_cmd_t(uhd.stream_cmd_t.STREAM_MODE_NUM_SAMPS_AND_DONE)
+        sc.num_samps = self.num_samps
+        sc.stream_now = False
+        sc.time_spec = uhd.time_spec_t(when)
+        self.csrc.issue_stream_cmd(sc)
+
+        if self.tx_burst:
+            self.bsrc.schedule(when - self.margin)
+
+        done = wait_for_samples(self.vsnk, self.num_samps, delay + timeout, self._burst_done,
+            start=start)
+
+        captured = [CapturedSink(vsnk.data(), vsnk.tags()) for vsnk in self.vsnk]
+
+        if not done:
+            # Cancel what is left of the capture, so its samples cannot
+            # turn up in the next run.
+            self.csrc.issue_stream_cmd(uhd.stream_cmd_t(uhd.stream_cmd_t.STREAM_MODE_STOP_CONTINUOUS))
+            drain(self.vsnk)
+
+        return captured
+
+    def stop(self):
+        """Stops streaming."""
+        if self._running:
+            self.tb.stop()
+            self.tb.wait()
+            self._running = False
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+import json
+import os
+
+def load_jsonl(path):
+    """
+    Returns the entries of a JSON lines file, oldest first, or [] if
+    there is no file yet.
+
+    Files written one line at a time can end in a line cut short by a
+    crash. Loading stops at the first line that does not parse and
+    truncates the file to the intact part before it, so the next entry
+    appended starts on a line of its own.
+    """
+
+    entries = []
+
+    if not os.path.exists(path):
+        return entries
+
+    with open(path) as jsonl:
+        lines = jsonl.read().split("\n")
+
+    # Length of the intact part of the file.
+    valid = 0
+
+    # The last entry is unterminated if a write was cut short.
+    for line in lines[:-1]:
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            break
+
+        valid += len(line) + 1
+
+    with open(path, "a") as jsonl:
+        jsonl.truncate(valid)
+
+    return entries
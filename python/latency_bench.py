@@ -0,0 +1,384 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+"""
+TX to RX loopback latency benchmark. Markers sent through a crimson_sink_s
+are found again in the crimson_source_c stream, and the host time between
+the two is the latency a control loop sees. Run it as a script to write
+the latency distribution at every sample rate and buffer setting to JSON:
+
+    python latency_bench.py --rates 5e6 10e6 20e6 --buffers 0 4096 512 \
+        --output latency.json
+"""
+
+from gnuradio import gr
+from gnuradio import uhd
+
+from crimson_source_c import crimson_source_c
+from crimson_sink_s import crimson_sink_s
+from sc16_source_s import sc16_source_s, to_sc16
+from throughput_bench import host_info, dump_json
+
+import argparse
+import time
+import Queue
+
+import numpy as np
+
+def pn_marker(length=255, seed=1):
+    """
+    A QPSK pseudo-noise marker of unit amplitude. Its autocorrelation has
+    one sharp peak, so it is found to the sample.
+    """
+
+    bits = np.random.RandomState(seed).randint(0, 2, (2, length)) * 2 - 1
+    return ((bits[0] + 1j * bits[1]) / np.sqrt(2.0)).astype(np.complex64)
+
+def chirp_marker(length=255, bandwidth=0.5):
+    """
+    A linear chirp of unit amplitude sweeping bandwidth (as a fraction of
+    the sample rate) around DC. Less sharp than a PN marker, but it
+    survives a frequency offset better.
+    """
+
+    n = np.arange(length)
+    phase = np.pi * bandwidth * (n ** 2 / float(length) - n)
+    return np.exp(1j * phase).astype(np.complex64)
+
+def correlate(samples, marker):
+    """
+    Normalised cross-correlation of marker against every full window of
+    samples, between 0 and 1, where 1 is a scaled copy of the marker.
+    Computed with FFTs, so it is cheap enough to run on every work call.
+    """
+
+    samples = np.asarray(samples, dtype=np.complex64)
+    marker = np.asarray(marker, dtype=np.complex64)
+
+    count = len(samples) - len(marker) + 1
+    if count <= 0:
+        return np.zeros(0)
+
+    size = 1 << int(np.ceil(np.log2(len(samples) + len(marker) - 1)))
+    corr = np.fft.ifft(np.fft.fft(samples, size) * np.conj(np.fft.fft(marker, size)))[:count]
+
+    # Energy of every window, from a running sum. Windows of (near) silence
+    # are floored so rounding noise in them does not look like a marker.
+    power = np.concatenate(([0.0], np.cumsum(np.abs(samples.astype(np.complex128)) ** 2)))
+    window = power[len(marker):] - power[:count]
+    window = np.maximum(window, max(1e-6 * np.max(window), 1e-12))
+
+    return np.abs(corr) / np.sqrt(window * np.sum(np.abs(marker) ** 2))
+
+def find_markers(samples, marker, threshold=0.5):
+    """
+    Offsets of the markers in samples: the strongest window of every run
+    of windows correlating above threshold.
+    """
+
+    corr = correlate(samples, marker)
+    above = np.flatnonzero(corr >= threshold)
+
+    if not len(above):
+        return []
+
+    runs = np.split(above, np.flatnonzero(np.diff(above) >= len(marker)) + 1)
+    return [int(run[np.argmax(corr[run])]) for run in runs]
+
+def latency_stats(latencies):
+    """Summary of a latency distribution in seconds."""
+
+    if not latencies:
+        return dict.fromkeys(["min", "median", "p90", "p99", "max", "mean", "std"])
+
+    latencies = np.asarray(latencies)
+    return {
+        "min": float(np.min(latencies)),
+        "median": float(np.median(latencies)),
+        "p90": float(np.percentile(latencies, 90)),
+        "p99": float(np.percentile(latencies, 99)),
+        "max": float(np.max(latencies)),
+        "mean": float(np.mean(latencies)),
+        "std": float(np.std(latencies)),
+    }
+
+def latency_metrics(results):
+    """
+    The median and p99 latency of every point as BenchHistory metrics.
+    """
+
+    metrics = {}
+
+    for result in results:
+        point = "{:.0f}/{}".format(result["sample_rate"], result["max_noutput_items"] or "default")
+        for stat in ["median", "p99"]:
+            if result[stat] is not None:
+                metrics["latency_{}/{}".format(stat, point)] = result[stat]
+
+    return metrics
+
+class marker_source_s(sc16_source_s):
+    """
+    Feeds a crimson_sink_s zeros, and the marker every time fire() is
+    called.
+
+    +--------+    +------+
+    | marker |--->| csnk |
+    +--------+    +------+
+
+    marker is complex in short units, converted to sc16 once. The host
+    time the first sample of each marker leaves work() is put on sent.
+    """
+
+    def __init__(self, marker):
+        sc16_source_s.__init__(self, "marker_source_s", 1, self._produce)
+
+        self._marker = to_sc16(marker)
+
+        self._pending = 0
+        self._position = 0
+
+        self.sent = Queue.Queue()
+
+    def fire(self):
+        """Sends one marker as soon as the current one is out."""
+        with self._ready:
+            self._pending += 1
+
+    def _produce(self, output_items):
+        out = output_items[0]
+        out[:] = 0
+
+        written = 0
+
+        while written < len(out):
+            if self._position == 0:
+                with self._ready:
+                    if not self._pending:
+                        break
+                    self._pending -= 1
+                self.sent.put(time.time())
+
+            count = min(len(out) - written, len(self._marker) - self._position)
+            out[written:written + count] = self._marker[self._position:self._position + count]
+
+            written += count
+            self._position = (self._position + count) % len(self._marker)
+
+        return len(out)
+
+class marker_detector_c(gr.sync_block):
+    """
+    Finds the markers of a marker_source_s in a crimson_source_c stream.
+
+    +------+    +----------+
+    | csrc |--->| detector |
+    +------+    +----------+
+
+    Every work call correlates its samples, plus the tail of the previous
+    call so markers straddling two calls are found, against the marker.
+    The (host time, absolute offset) of every marker found is put on
+    found.
+    """
+
+    def __init__(self, marker, threshold=0.5):
+        gr.sync_block.__init__(self,
+            name="marker_detector_c",
+            in_sig=[np.complex64],
+            out_sig=None)
+
+        self._marker = np.asarray(marker, dtype=np.complex64)
+        self._threshold = threshold
+        self._tail = np.zeros(0, dtype=np.complex64)
+        self._last = None
+
+        self.found = Queue.Queue()
+
+    def work(self, input_items, output_items):
+        samples = np.concatenate((self._tail, input_items[0]))
+        start = self.nitems_read(0) - len(self._tail)
+
+        now = time.time()
+
+        for offset in find_markers(samples, self._marker, self._threshold):
+            offset += start
+
+            # Found again in the overlap with the previous call.
+            if self._last is not None and offset - self._last < len(self._marker):
+                continue
+
+            self._last = offset
+            self.found.put((now, offset))
+
+        self._tail = samples[-(len(self._marker) - 1):] if len(self._marker) > 1 else samples[:0]
+
+        return len(input_items[0])
+
+class LatencyBench(object):
+    """
+    Sends markers through the loopback of one channel and times their
+    return, one at a time.
+
+    +--------+    +------+ +------+    +----------+
+    | marker |--->|ch    | |    ch|--->| detector |
+    +--------+    | csnk | | csrc |    +----------+
+                  +------+ +------+
+
+    This is the TX and RX chain of the loopback test with the signal
+    source replaced by markers. RX streams from a timed start settle
+    seconds after TX starts, as in the loopback test. A point is a
+    sample rate and a max_noutput_items for the flowgraph, which bounds
+    how much data each block buffers (None for the GNU Radio default). Every result is a
+    dict of JSON values holding the point, the latency of every marker in
+    seconds, latency_stats() of them and the number of markers that did
+    not come back within timeout.
+    """
+
+    def __init__(self, marker=None, markers=50, interval=0.05, timeout=1.0, settle=1.0,
+            center_freq=15e6, rx_gain=8.0, tx_amp=3.0e4, threshold=0.5, channel=0,
+            args="crimson"):
+        self.marker = pn_marker() if marker is None else marker
+        self.markers = markers
+        self.interval = interval
+        self.timeout = timeout
+        self.settle = settle
+        self.center_freq = center_freq
+        self.rx_gain = rx_gain
+        self.tx_amp = tx_amp
+        self.threshold = threshold
+        self.channel = channel
+        self.args = args
+
+    def run_point(self, sample_rate, max_noutput_items=None):
+        tb = gr.top_block()
+
+        csnk = crimson_sink_s([self.channel], sample_rate, self.center_freq, 0.0, args=self.args)
+        csrc = crimson_source_c([self.channel], sample_rate, self.center_freq, self.rx_gain,
+            args=self.args)
+
+        msrc = marker_source_s(self.marker * self.tx_amp)
+        detector = marker_detector_c(self.marker, self.threshold)
+
+        tb.connect(msrc, csnk)
+        tb.connect(csrc, detector)
+
+        # Reset TX and RX times to be roughly in sync.
+        csnk.set_time_now(uhd.time_spec_t(0.0))
+        csrc.set_time_now(uhd.time_spec_t(0.0))
+
+        if max_noutput_items:
+            tb.start(max_noutput_items)
+        else:
+            tb.start()
+
+        when = csrc.get_time_now().get_real_secs() + self.settle
+
+        sc = uhd.stream_cmd_t(uhd.stream_cmd_t.STREAM_MODE_START_CONTINUOUS)
+        sc.stream_now = False
+        sc.time_spec = uhd.time_spec_t(when)
+        csrc.issue_stream_cmd(sc)
+
+        # Let the streams and buffers fill before timing anything.
+        time.sleep(max(when - csrc.get_time_now().get_real_secs(), 0.0) + self.interval)
+
+        latencies = []
+        missed = 0
+
+        try:
+            for marker in xrange(self.markers):
+                # Drop what is left of earlier markers, such as the late
+                # return of a missed one, so a marker pairs with its own.
+                for pending in [msrc.sent, detector.found]:
+                    while not pending.empty():
+                        pending.get_nowait()
+
+                # Samples read before the marker went out cannot hold it.
+                first = detector.nitems_read(0)
+
+                msrc.fire()
+
+                try:
+                    sent = msrc.sent.get(timeout=self.timeout)
+                    deadline = sent + self.timeout
+
+                    while True:
+                        found, offset = detector.found.get(timeout=max(deadline - time.time(), 0.0))
+                        if offset >= first and found >= sent:
+                            break
+
+                    latencies.append(found - sent)
+                except Queue.Empty:
+                    missed += 1
+
+                time.sleep(self.interval)
+        finally:
+            csrc.issue_stream_cmd(uhd.stream_cmd_t(uhd.stream_cmd_t.STREAM_MODE_STOP_CONTINUOUS))
+            tb.stop()
+            tb.wait()
+
+        result = {
+            "sample_rate": float(sample_rate),
+            "max_noutput_items": max_noutput_items,
+            "latencies": latencies,
+            "missed": missed,
+        }
+        result.update(latency_stats(latencies))
+
+        return result
+
+    def run(self, sample_rates, buffers=(None,), path=None):
+        """
+        Runs every sample rate with every buffer setting, writing the
+        results so far to path after each if given, and returns them.
+        """
+
+        results = []
+
+        for sample_rate in sample_rates:
+            for max_noutput_items in buffers:
+                results.append(self.run_point(sample_rate, max_noutput_items))
+
+                if path is not None:
+                    dump_json(path, {"host": host_info(), "results": results})
+
+        return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Crimson loopback latency benchmark")
+    parser.add_argument("--rates", type=float, nargs="+", default=[5e6, 10e6, 20e6])
+    parser.add_argument("--buffers", type=int, nargs="+", default=[0],
+        help="max_noutput_items settings, 0 for the default")
+    parser.add_argument("--markers", type=int, default=50)
+    parser.add_argument("--chirp", action="store_true", help="chirp markers instead of PN")
+    parser.add_argument("--channel", type=int, default=0)
+    parser.add_argument("--args", default="crimson")
+    parser.add_argument("--output", default="latency_bench.json")
+    options = parser.parse_args()
+
+    bench = LatencyBench(chirp_marker() if options.chirp else None, options.markers,
+        channel=options.channel, args=options.args)
+    results = bench.run(options.rates, [buffers or None for buffers in options.buffers],
+        options.output)
+
+    for result in results:
+        print("{sample_rate:.0f} S/s, buffer {max_noutput_items}: median {median}, p99 {p99}, "
+            "{missed} missed".format(**result))
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from MockCrimson import MockCrimson
+
+import multiprocessing
+import os
+import threading
+
+def mock_capture(args):
+    """
+    The samples of every channel of one MockCrimson capture. args is
+    (num_channels, test_time, num_samps, sample_rate, centre_freq), in
+    one tuple so it can be handed to a pool.
+    """
+
+    num_channels, test_time, num_samps, sample_rate, centre_freq = args
+
+    crimson = MockCrimson(num_channels, test_time, num_samps, sample_rate)
+    crimson.freq = centre_freq
+
+    return [vsnk.data() for vsnk in crimson.sample()]
+
+class MockRunner(object):
+    """
+    Computes mock captures on a pool of processes, one per core by
+    default.
+
+    prefetch() hands a sweep's captures to the pool up front, and
+    capture() returns one, waiting for it if it is still being computed.
+    A test can so keep measuring its points one at a time, in order,
+    while every core works ahead of it. Captures depend only on their
+    args, so results do not depend on which process made them or when,
+    and map() returns them in the order asked for. Captures are kept, so
+    asking again for the same one is free. Safe to use from the threads
+    of a SweepScheduler.
+    """
+
+    def __init__(self, processes=None):
+        self._pool = multiprocessing.Pool(processes)
+        self._captures = {}
+        self._lock = threading.Lock()
+
+    def prefetch(self, captures):
+        with self._lock:
+            for args in captures:
+                args = tuple(args)
+                if args not in self._captures:
+                    self._captures[args] = self._pool.apply_async(mock_capture, (args,))
+
+    def capture(self, args):
+        self.prefetch([args])
+        with self._lock:
+            result = self._captures[tuple(args)]
+        return result.get()
+
+    def map(self, captures):
+        """The captures of every args in captures, in order."""
+        captures = [tuple(args) for args in captures]
+        self.prefetch(captures)
+        return [self.capture(args) for args in captures]
+
+    def close(self):
+        self._pool.terminate()
+        self._pool.join()
+
+def mock_runner_from_env():
+    """
+    A MockRunner with CRIMSON_MOCK_PROCESSES processes, or one per core if
+    unset. Set it to 1 to compute mock captures in the test process.
+    """
+
+    processes = int(os.environ.get("CRIMSON_MOCK_PROCESSES", 0)) or None
+    if processes == 1:
+        return None
+
+    return MockRunner(processes)
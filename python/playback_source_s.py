@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr
+
+import os
+import json
+
+import numpy as np
+import pmt
+
+from recording_sink import DATATYPES
+
+class playback_source_s(gr.sync_block):
+    """
+    Plays a multi-channel recording back into a crimson_sink_s.
+
+                                +------+
+    +----------+                |      |
+    |      out0|--------------->|ch0   |
+    | playback |      ...       |...   |
+    |      outn|--------------->|chn   |
+    +----------+                | csnk |
+         ^                      +------+
+    name.sigmf-data (memory mapped)
+
+    The file holds samples interleaved by channel, as written by
+    recording_sink, in "ci16_le" or "cf32_le". Format and channel count are
+    read from the .sigmf-meta next to the file when there is one. The file
+    is memory mapped and each work call copies straight from the mapping
+    into the output buffers, in the sc16 layout crimson_sink_s expects.
+    cf32 samples are multiplied by scale on the way.
+
+    Channel k starts offsets[k] samples into the file. With repeat the file
+    loops forever, otherwise the stream ends with tx_eob when the first
+    channel runs out. With start_time the first samples are tagged tx_sob
+    and tx_time so the crimson starts transmitting at that device time.
+    """
+
+    def __init__(self, path, num_channels=None, datatype=None, scale=2**15 - 1,
+            repeat=True, start_time=None, offsets=None):
+
+        meta_path = os.path.splitext(path)[0] + ".sigmf-meta"
+        if os.path.exists(meta_path):
+            with open(meta_path) as meta:
+                meta = json.load(meta)["global"]
+
+            if datatype is None:
+                datatype = meta["core:datatype"]
+            if num_channels is None:
+                num_channels = meta.get("core:num_channels", 1)
+
+        if datatype is None or num_channels is None:
+            raise ValueError("Datatype and channel count needed without a .sigmf-meta")
+
+        dtype, shape = DATATYPES[datatype]
+
+        gr.sync_block.__init__(self,
+            name="playback_source_s",
+            in_sig=None,
+            out_sig=[(np.int16, 2)] * num_channels)
+
+        self._data = np.memmap(path, dtype=dtype, mode="r").reshape((-1, num_channels) + shape)
+        self._scale = scale
+        self._repeat = repeat
+        self._start_time = start_time
+
+        if offsets is None:
+            offsets = [0] * num_channels
+
+        if len(offsets) != num_channels:
+            raise ValueError("One offset per channel needed")
+
+        self._offsets = [offset % len(self._data) for offset in offsets]
+
+        # Samples each channel can play without looping.
+        self._length = len(self._data) - max(self._offsets)
+
+        self._produced = 0
+
+    def _copy(self, channel, first, out):
+        samples = self._data[first:first + len(out), channel]
+
+        if samples.dtype == np.int16:
+            out[:] = samples
+        else:
+            # Clipped, as full scale input would wrap around in int16.
+            out[:, 0] = np.clip(np.rint(samples.real * self._scale), -32768, 32767)
+            out[:, 1] = np.clip(np.rint(samples.imag * self._scale), -32768, 32767)
+
+    def _tag(self, channel, offset, key, value):
+        self.add_item_tag(channel, offset, pmt.intern(key), value)
+
+    def work(self, input_items, output_items):
+        count = len(output_items[0])
+
+        if not self._repeat:
+            count = min(count, self._length - self._produced)
+            if count <= 0:
+                return -1
+
+        if self._produced == 0:
+            for channel in xrange(len(output_items)):
+                self._tag(channel, 0, "tx_sob", pmt.PMT_T)
+
+                if self._start_time is not None:
+                    secs = int(self._start_time)
+                    self._tag(channel, 0, "tx_time", pmt.make_tuple(
+                        pmt.from_uint64(secs), pmt.from_double(self._start_time - secs)))
+
+        for channel, out in enumerate(output_items):
+            done = 0
+            while done < count:
+                first = (self._produced + done + self._offsets[channel]) % len(self._data)
+                chunk = min(count - done, len(self._data) - first)
+                self._copy(channel, first, out[done:done + chunk])
+                done += chunk
+
+        self._produced += count
+
+        if not self._repeat and self._produced == self._length:
+            for channel in xrange(len(output_items)):
+                self._tag(channel, self.nitems_written(channel) + count - 1, "tx_eob", pmt.PMT_T)
+
+        return count
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr_unittest
+
+from adaptive_sweep import FixedSweep, AdaptiveSweep
+
+import numpy as np
+
+class qa_adaptive_sweep(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Sweep a metric that steps past its threshold in one band.
+        2. Ensure the adaptive sweep measures fewer points than the fixed
+           one and still finds both edges of the failing band.
+        3. Ensure a flat metric stops after the coarse grid.
+    """
+
+    def setUp(self):
+        self.start, self.stop, self.step = 15e6, 4e9, 25e6
+        self.threshold = 1.0
+
+    def tearDown(self):
+        pass
+
+    def metric(self, freq):
+        return 2.0 if 1.2e9 <= freq < 1.5e9 else 0.1
+
+    def sweep(self, sweep, batch_size):
+        while True:
+            freqs = sweep.next_batch(batch_size)
+            if not freqs:
+                return
+            for freq in freqs:
+                sweep.report(freq, self.metric(freq))
+
+    def test_000_t(self):
+        fixed = FixedSweep(self.start, self.stop, self.step)
+        self.sweep(fixed, len(fixed.grid))
+
+        adaptive = AdaptiveSweep(self.start, self.stop, self.step, threshold=self.threshold)
+        self.sweep(adaptive, 1)
+
+        failing = sorted(freq for freq, value in fixed.values.items() if value > self.threshold)
+        found = sorted(freq for freq, value in adaptive.values.items() if value > self.threshold)
+
+        self.assertLess(len(adaptive.values), len(fixed.values))
+        self.assertEqual((found[0], found[-1]), (failing[0], failing[-1]))
+
+        # Batches of several points find the same.
+        batched = AdaptiveSweep(self.start, self.stop, self.step, threshold=self.threshold)
+        self.sweep(batched, 4)
+
+        found = sorted(freq for freq, value in batched.values.items() if value > self.threshold)
+        self.assertEqual((found[0], found[-1]), (failing[0], failing[-1]))
+
+    def test_001_t(self):
+        sweep = AdaptiveSweep(self.start, self.stop, self.step, coarse=8, threshold=self.threshold)
+
+        for freq in sweep:
+            sweep.report(freq, 0.1)
+
+        self.assertEqual(len(sweep.values), len(range(0, len(sweep.grid) - 1, 8)) + 1)
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_adaptive_sweep)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr_unittest
+
+from bench_history import BenchHistory
+
+import os
+import shutil
+import tempfile
+
+class qa_bench_history(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Record a baseline run, then runs on a new firmware.
+        2. Ensure a drop in rate or a rise in latency beyond tolerance is
+           reported, and changes within it are not.
+        3. Ensure a slow drift is caught against the first run.
+        4. Ensure runs of another host and a cut short line are ignored.
+    """
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, "history.jsonl")
+        self.environment = {"host": "bench", "cpus": 8, "device": "fw=1"}
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_000_t(self):
+        history = BenchHistory(self.path, tolerance=0.05)
+
+        metrics = {"max_rate/4ch/sc16": 100e6, "latency_p99/20000000/default": 0.010}
+        self.assertEqual(history.check("bench", metrics, self.environment), [])
+
+        environment = dict(self.environment, device="fw=2")
+
+        regressions = history.check("bench",
+            {"max_rate/4ch/sc16": 80e6, "latency_p99/20000000/default": 0.0104}, environment)
+        self.assertEqual([regression.metric for regression in regressions], ["max_rate/4ch/sc16"])
+        self.assertAlmostEqual(regressions[0].change, -0.2)
+
+        regressions = history.check("bench",
+            {"max_rate/4ch/sc16": 100e6, "latency_p99/20000000/default": 0.012}, environment)
+        self.assertEqual([regression.metric for regression in regressions], ["latency_p99/20000000/default"])
+
+        self.assertEqual(BenchHistory.changes(history.runs("bench")[-1], history.runs("bench")[0]),
+            {"device": ("fw=1", "fw=2")})
+
+    def test_001_t(self):
+        history = BenchHistory(self.path, tolerance=0.05)
+
+        # 2 % less every run, never 5 % from one run to the next.
+        for run in xrange(4):
+            regressions = history.check("bench", {"max_rate": 100.0 * 0.98 ** run}, self.environment)
+
+        self.assertEqual([regression.metric for regression in regressions], ["max_rate"])
+
+        # A new baseline accepts the lower rate.
+        history.check("bench", {"max_rate": 90.0}, self.environment, pin=True)
+        self.assertEqual(history.check("bench", {"max_rate": 89.0}, self.environment), [])
+
+    def test_002_t(self):
+        history = BenchHistory(self.path)
+        history.check("bench", {"max_rate": 100.0}, self.environment)
+
+        # Another host has its own baseline.
+        other = dict(self.environment, host="laptop")
+        self.assertEqual(history.check("bench", {"max_rate": 10.0}, other), [])
+
+        with open(self.path, "a") as f:
+            f.write('{"name": "ben')
+
+        history = BenchHistory(self.path)
+        self.assertEqual(len(history), 2)
+        self.assertEqual(len(history.check("bench", {"max_rate": 50.0}, self.environment)), 1)
+        self.assertEqual(len(BenchHistory(self.path)), 3)
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_bench_history)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr
+from gnuradio import gr_unittest
+from gnuradio import blocks
+
+from burst_source_s import burst_source_s
+
+import numpy as np
+import pmt
+
+class qa_burst_source_s(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Schedule two bursts.
+        2. Ensure each is sent once as sc16 between tx_sob and tx_eob,
+           with its tx_time.
+        3. Ensure a new waveform is used from the next burst on.
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_000_t(self):
+        """
+        +-------+    +------+    +------+
+        | burst |--->| head |--->| vsnk |
+        +-------+    +------+    +------+
+        """
+        tb = gr.top_block()
+
+        waveform = np.arange(10) * (1 + 2j)
+        bsrc = burst_source_s(1, waveform)
+
+        head = blocks.head(4, 2 * len(waveform))
+        vsnk = blocks.vector_sink_s(2)
+
+        tb.connect(bsrc, head, vsnk)
+
+        bsrc.schedule(1.5)
+        bsrc.schedule(2.0)
+        tb.run()
+
+        expected = np.array([waveform.real, waveform.imag]).T.ravel().tolist()
+        self.assertEqual(list(vsnk.data()), expected * 2)
+
+        tags = dict(((tag.offset, pmt.symbol_to_string(tag.key)), tag.value) for tag in vsnk.tags())
+
+        for offset, when in [(0, 1.5), (10, 2.0)]:
+            self.assertTrue((offset, "tx_sob") in tags)
+            self.assertTrue((offset + 9, "tx_eob") in tags)
+
+            tx_time = tags[(offset, "tx_time")]
+            self.assertAlmostEqual(pmt.to_uint64(pmt.tuple_ref(tx_time, 0)) +
+                pmt.to_double(pmt.tuple_ref(tx_time, 1)), when)
+
+    def test_001_t(self):
+        tb = gr.top_block()
+
+        waveform = np.arange(10) * (1 + 2j)
+        bsrc = burst_source_s(1, waveform)
+
+        head = blocks.head(4, len(waveform))
+        vsnk = blocks.vector_sink_s(2)
+
+        tb.connect(bsrc, head, vsnk)
+
+        bsrc.schedule(1.0)
+        tb.run()
+
+        bsrc.set_waveform(2 * waveform)
+        bsrc.schedule(2.0)
+
+        head.reset()
+        tb.run()
+
+        data = np.array(vsnk.data()).reshape(-1, 2)
+        self.assertEqual(data[10:, 0].tolist(), (2 * waveform.real).tolist())
+        self.assertEqual(data[10:, 1].tolist(), (2 * waveform.imag).tolist())
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_burst_source_s)
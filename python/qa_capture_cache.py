@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr_unittest
+
+from capture_cache import CaptureCache
+
+import shutil
+import tempfile
+
+import numpy as np
+
+class qa_capture_cache(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Save a capture and ensure it loads back memory-mapped under an
+           equal configuration, and not under a different one.
+        2. Ensure compressed captures load back too.
+        3. Ensure replay mode records nothing and finds the firmware.
+        4. Ensure two iterations of one configuration get distinct entries,
+           numbered from 0 again after a reset.
+    """
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.config = {"centre_freq": 15e6, "rx_gain": 8.0, "tx_amp": 3e4,
+            "channels": [0, 1], "firmware": "mboard_id=crimson"}
+        self.data = (np.arange(128) * (1 + 1j)).reshape(2, 64).astype(np.complex64)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_000_t(self):
+        cache = CaptureCache(self.root)
+        cache.save(self.config, self.data)
+
+        # Same configuration, built in another order.
+        config = dict(reversed(self.config.items()))
+
+        data = cache.load(config)
+        self.assertTrue(isinstance(data, np.memmap))
+        self.assertTrue(np.array_equal(data, self.data))
+
+        config["rx_gain"] = 10.0
+        self.assertIsNone(cache.load(config))
+        self.assertFalse(config in cache)
+
+    def test_001_t(self):
+        cache = CaptureCache(self.root, compress=True)
+        cache.save(self.config, self.data)
+
+        self.assertTrue(self.config in cache)
+        self.assertTrue(np.array_equal(cache.load(self.config), self.data))
+
+    def test_002_t(self):
+        CaptureCache(self.root).save(self.config, self.data)
+
+        replay = CaptureCache(self.root, replay=True)
+        self.assertEqual(replay.firmware(), "mboard_id=crimson")
+
+        config = dict(self.config, centre_freq=35e6)
+        replay.save(config, self.data)
+        self.assertIsNone(replay.load(config))
+
+    def test_003_t(self):
+        cache = CaptureCache(self.root)
+
+        configs = []
+        for i in xrange(2):
+            config = dict(self.config)
+            config["iteration"] = cache.iteration(self.config)
+            cache.save(config, self.data * (i + 1))
+            configs.append(config)
+
+        self.assertEqual([c["iteration"] for c in configs], [0, 1])
+        self.assertNotEqual(cache.key(configs[0]), cache.key(configs[1]))
+        self.assertTrue(np.array_equal(cache.load(configs[0]), self.data))
+        self.assertTrue(np.array_equal(cache.load(configs[1]), self.data * 2))
+
+        cache.reset_iterations()
+        self.assertEqual(cache.iteration(self.config), 0)
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_capture_cache)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr_unittest
+
+import crimson_bring_up
+from crimson_bring_up import bring_up, configure
+from settings_cache import SettingsCache
+
+import threading
+import time
+
+class SlowUsrp(object):
+    """
+    Stands in for a usrp object whose every write takes a while, like an
+    LO settling, and records the calls with the host times each started
+    and ended at.
+    """
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = []
+        self.spans = []
+        self.lock = threading.Lock()
+
+    def _write(self, *call):
+        start = time.time()
+        time.sleep(self.delay)
+        with self.lock:
+            self.calls.append(call)
+            self.spans.append((start, time.time()))
+
+    def set_time_now(self, time_spec):
+        self._write("time_now")
+
+    def finite_acquisition_v(self, nsamps):
+        self._write("acquisition", nsamps)
+        return [[0j] * nsamps]
+
+    def set_samp_rate(self, sample_rate):
+        self._write("samp_rate", sample_rate)
+
+    def set_clock_source(self, source):
+        self._write("clock_source", source)
+
+    def set_center_freq(self, center_freq, channel):
+        self._write("center_freq", center_freq, channel)
+
+    def set_gain(self, gain, channel):
+        self._write("gain", gain, channel)
+
+class qa_crimson_bring_up(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Configure a source and a sink at once.
+        2. Ensure every setting is written once, with the gain of its side.
+        3. Ensure the rate is written before the clock source, and each
+           frequency before its gain.
+        4. Ensure the writes to one usrp object never overlap, those to
+           the source and the sink do, and each phase accounts for the
+           writes made in it.
+        5. Bring up a source and a sink with stand-in factories and ensure
+           the first sample is timed after everything else.
+    """
+
+    def setUp(self):
+        self.channels = range(4)
+        self.delay = 0.05
+
+    def tearDown(self):
+        pass
+
+    def test_000_t(self):
+        usrps = [SlowUsrp(self.delay), SlowUsrp(self.delay)]
+        caches = [SettingsCache(usrp) for usrp in usrps]
+
+        phases = configure(caches, self.channels, 20e6, 15e6, [8.0, 0.0])
+
+        self.assertEqual(phases.keys(), ["rate_clock", "channels"])
+
+        for usrp, gain in zip(usrps, [8.0, 0.0]):
+            self.assertEqual(sorted(usrp.calls), sorted(
+                [("samp_rate", 20e6), ("clock_source", "internal")] +
+                [("center_freq", 15e6, index) for index in xrange(len(self.channels))] +
+                [("gain", gain, index) for index in xrange(len(self.channels))]))
+
+            self.assertEqual(usrp.calls[:2], [("samp_rate", 20e6), ("clock_source", "internal")])
+
+            for index in xrange(len(self.channels)):
+                self.assertLess(usrp.calls.index(("center_freq", 15e6, index)),
+                    usrp.calls.index(("gain", gain, index)))
+
+        # One call at a time on each object.
+        for usrp in usrps:
+            for previous, span in zip(usrp.spans, usrp.spans[1:]):
+                self.assertGreaterEqual(span[0], previous[1])
+
+        # The source and sink are tuned at once: each started before the
+        # other was done.
+        tuning = [usrp.spans[2:] for usrp in usrps]
+        self.assertLess(max(spans[0][0] for spans in tuning), min(spans[-1][1] for spans in tuning))
+
+        # Each phase lasted at least as long as its writes.
+        for phase, spans in [("rate_clock", [s for usrp in usrps for s in usrp.spans[:2]]),
+                ("channels", [s for spans in tuning for s in spans])]:
+            self.assertGreaterEqual(phases[phase],
+                max(end for start, end in spans) - min(start for start, end in spans))
+
+        self.assertEqual(sum(cache.writes for cache in caches), 20)
+
+        # Nothing changed.
+        configure(caches, self.channels, 20e6, 15e6, [8.0, 0.0])
+        self.assertEqual(sum(cache.skips for cache in caches), 20)
+
+    def test_001_t(self):
+        usrps = {}
+
+        def factory(side):
+            def make(channels, sample_rate, center_freq, gain, cache, *args, **kwargs):
+                usrps[side] = SlowUsrp(self.delay)
+                cache.attach(usrps[side])
+                return usrps[side]
+            return make
+
+        factories = crimson_bring_up.crimson_source_c, crimson_bring_up.crimson_sink_s
+        crimson_bring_up.crimson_source_c = factory("rx")
+        crimson_bring_up.crimson_sink_s = factory("tx")
+
+        try:
+            up = bring_up(self.channels, 20e6, 15e6, rx_gain=8.0, tx_gain=0.0)
+        finally:
+            crimson_bring_up.crimson_source_c, crimson_bring_up.crimson_sink_s = factories
+
+        self.assertEqual(up.phases.keys(),
+            ["connect", "rate_clock", "channels", "time", "first_sample", "total"])
+
+        # The acquisition is the last call on the source, after the time
+        # of both objects was set.
+        self.assertEqual(up.csrc.calls[-1], ("acquisition", 1))
+        acquisition = up.csrc.spans[-1]
+        time_now = [usrp.spans[usrp.calls.index(("time_now",))] for usrp in usrps.values()]
+        self.assertGreaterEqual(acquisition[0], max(end for start, end in time_now))
+
+        self.assertGreaterEqual(up.phases["first_sample"], acquisition[1] - acquisition[0])
+        self.assertGreaterEqual(up.phases["total"], sum(secs
+            for phase, secs in up.phases.items() if phase != "total"))
+
+        # Without a source there is nothing to time.
+        crimson_bring_up.crimson_sink_s = factory("tx")
+        try:
+            up = bring_up(self.channels, 20e6, 15e6, tx_gain=0.0)
+        finally:
+            crimson_bring_up.crimson_sink_s = factories[1]
+
+        self.assertFalse("first_sample" in up.phases)
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_crimson_bring_up)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr_unittest
+
+import crimson_capture
+from crimson_capture import CrimsonCapture
+
+import numpy as np
+
+class FakeTimeSpec(object):
+    def __init__(self, full_secs, frac_secs=0.0):
+        self.full_secs = int(full_secs)
+        self.frac_secs = full_secs - int(full_secs) + frac_secs
+
+    def get_full_secs(self):
+        return self.full_secs
+
+    def get_frac_secs(self):
+        return self.frac_secs
+
+    def get_real_secs(self):
+        return self.full_secs + self.frac_secs
+
+class FakeStreamer(object):
+    """
+    Stands in for a UHD RX streamer, handing out at most chunk samples
+    per recv. Like UHD, recv makes an array of what it is given and
+    writes row by row into that, so only an array view reaches the
+    caller's buffer. Channel c gets samples c * 1000 + n.
+    """
+
+    def __init__(self, chunk):
+        self.chunk = chunk
+        self.sent = 0
+
+    def issue_stream_cmd(self, sc):
+        self.sc = sc
+
+    def recv(self, buff, metadata, timeout):
+        buff = np.asarray(buff)
+        count = min(self.chunk, buff.shape[-1])
+
+        for channel in xrange(buff.shape[0]):
+            buff[channel, :count] = channel * 1000 + self.sent + np.arange(count)
+
+        metadata.time_spec = FakeTimeSpec(1, self.sent * 1e-6)
+        self.sent += count
+        return count
+
+class FakeUsrp(object):
+    def __init__(self, args):
+        self.streamer = FakeStreamer(7)
+
+    def set_rx_rate(self, sample_rate):
+        pass
+
+    def set_clock_source(self, source):
+        pass
+
+    def set_rx_freq(self, tune_request, channel):
+        pass
+
+    def set_rx_gain(self, gain, channel):
+        pass
+
+    def set_time_now(self, time_spec):
+        pass
+
+    def get_time_now(self):
+        return FakeTimeSpec(0.0)
+
+    def get_rx_stream(self, stream_args):
+        return self.streamer
+
+class fake_uhd(object):
+    """The parts of the UHD Python API CrimsonCapture uses."""
+
+    class usrp(object):
+        MultiUSRP = FakeUsrp
+
+        class StreamArgs(object):
+            def __init__(self, cpu_format, otw_format):
+                self.channels = []
+
+    class types(object):
+        TimeSpec = FakeTimeSpec
+        TuneRequest = float
+
+        class StreamCMD(object):
+            def __init__(self, mode):
+                self.mode = mode
+
+        class StreamMode(object):
+            num_done = "num_done"
+
+        class RXMetadataErrorCode(object):
+            none = 0
+
+        class RXMetadata(object):
+            error_code = 0
+            time_spec = None
+
+class qa_crimson_capture(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Capture one and several channels from a fake streamer that
+           delivers each burst over several recv calls.
+        2. Ensure every sample lands in the returned array in order, and
+           the time spec is the one of the first sample.
+    """
+
+    def setUp(self):
+        self.libuhd = crimson_capture.libuhd
+        crimson_capture.libuhd = fake_uhd
+
+    def tearDown(self):
+        crimson_capture.libuhd = self.libuhd
+
+    def test_000_t(self):
+        for channels in [[0], [0, 1, 2, 3]]:
+            capture = CrimsonCapture(channels, 20e6, 15e6, 8.0)
+            data, time_spec = capture.capture(64)
+
+            self.assertEqual(data.shape, (len(channels), 64))
+            self.assertEqual(data.tolist(), [(index * 1000 + np.arange(64)).tolist()
+                for index in xrange(len(channels))])
+
+            self.assertEqual(time_spec.get_real_secs(), 1.0)
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_crimson_capture)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr
+from gnuradio import gr_unittest
+from gnuradio import blocks
+
+from crimson_events import crimson_event_monitor
+
+import pmt
+
+def async_msg(codes, channel, secs=None):
+    """An async message as gr-uhd's usrp_sink publishes it."""
+
+    msg = pmt.make_dict()
+    msg = pmt.dict_add(msg, pmt.intern("event_code"),
+        reduce(lambda codes, code: pmt.list_add(codes, pmt.intern(code)), codes, pmt.PMT_NIL))
+
+    if secs is not None:
+        msg = pmt.dict_add(msg, pmt.intern("time_spec"),
+            pmt.cons(pmt.from_uint64(int(secs)), pmt.from_double(secs - int(secs))))
+
+    return pmt.dict_add(msg, pmt.intern("channel"), pmt.from_uint64(channel))
+
+def rx_time_tag(offset, secs):
+    tag = gr.tag_t()
+    tag.offset = offset
+    tag.key = pmt.intern("rx_time")
+    tag.value = pmt.make_tuple(pmt.from_uint64(int(secs)), pmt.from_double(secs - int(secs)))
+    return tag
+
+class qa_crimson_event_monitor(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Ensure a jump in rx_time is reported as an overflow.
+        2. Ensure sink async messages, in gr-uhd's format, are reported
+           with their channel and time, once per kind.
+        3. Ensure a decimated monitor still finds the overflow.
+    """
+
+    def setUp(self):
+        self.sample_rate = 1000.0
+
+    def tearDown(self):
+        pass
+
+    def test_000_t(self):
+        """
+        +------+    +---------+
+        | vsrc |--->| monitor |
+        +------+    +---------+
+        """
+        tb = gr.top_block()
+
+        # 50 samples missing between offsets 99 and 100.
+        tags = [rx_time_tag(0, 1.0), rx_time_tag(100, 1.15)]
+
+        vsrc = blocks.vector_source_c([0j] * 200, False, 1, tags)
+        monitor = crimson_event_monitor(1, self.sample_rate)
+
+        events = []
+        monitor.add_callback(events.append)
+
+        tb.connect(vsrc, monitor)
+        tb.run()
+
+        self.assertEqual(monitor.count("overflow"), 1)
+        self.assertEqual(events[0].channel, 0)
+        self.assertEqual(events[0].samples, 50)
+        self.assertAlmostEqual(events[0].time, 1.15)
+
+    def test_001_t(self):
+        monitor = crimson_event_monitor()
+
+        monitor._handle_async_msg(async_msg(["underflow"], 1, 2.25))
+        monitor._handle_async_msg(async_msg(["underflow", "underflow_in_packet"], 1))
+        monitor._handle_async_msg(async_msg(["time_error"], 1))
+        monitor._handle_async_msg(async_msg(["burst_ack"], 0, 3.5))
+
+        self.assertEqual(monitor.count("underflow"), 2)
+        self.assertEqual(monitor.count("underflow", 1), 2)
+        self.assertEqual(monitor.count("underflow", 0), 0)
+        self.assertEqual(monitor.count("late"), 1)
+        self.assertEqual(monitor.count("burst_ack", 0), 1)
+        self.assertEqual(monitor.queue.qsize(), 4)
+
+        events = [monitor.queue.get() for event in xrange(4)]
+        self.assertAlmostEqual(events[0].time, 2.25)
+        self.assertEqual(events[1].time, None)
+        self.assertAlmostEqual(events[3].time, 3.5)
+
+    def test_002_t(self):
+        """
+        +------+    +---------------+    +---------+
+        | vsrc |--->| keep_one_in_n |--->| monitor |
+        +------+    +---------------+    +---------+
+        """
+        tb = gr.top_block()
+
+        # 500 samples missing between offsets 999 and 1000.
+        tags = [rx_time_tag(0, 1.0), rx_time_tag(1000, 2.5)]
+
+        vsrc = blocks.vector_source_c([0j] * 2000, False, 1, tags)
+        monitor = crimson_event_monitor(1, self.sample_rate, decimation=10)
+        monitor.watch(tb, vsrc)
+
+        tb.run()
+
+        self.assertEqual(monitor.count("overflow"), 1)
+        self.assertEqual(monitor.queue.get().samples, 500)
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_crimson_event_monitor)
@@ -25,17 +25,25 @@ from gnuradio import blocks
 from gnuradio import analog
 from gnuradio import uhd
 
-from crimson_source_c import crimson_source_c
-from crimson_sink_s import crimson_sink_s
-
+from sweep_engine import SweepEngine
+from sweep_scheduler import SweepScheduler, SweepPoint, crimson_devices
+from sweep_journal import sweep_journal_from_env
+from adaptive_sweep import FixedSweep, AdaptiveSweep
+from harness import LoopbackFixture, CapturedSink, check_underflow
+from capture_cache import capture_cache_from_env, firmware_id
+from throughput_bench import ThroughputBench, bench_matrix, throughput_metrics
+from latency_bench import LatencyBench
+from bench_history import bench_history_from_env, fingerprint
+
+import os
 import time
 import sigproc
-from MockCrimson import MockCrimson
+from mock_runner import mock_capture, mock_runner_from_env
+from results_store import results_store_from_env
 import numpy as np
 
 from log import log
-from subprocess import Popen, PIPE
-from threading import Timer
+from collections import OrderedDict
 
 class qa_crimson_loopback(gr_unittest.TestCase):
     """
@@ -49,6 +57,21 @@ class qa_crimson_loopback(gr_unittest.TestCase):
         3. When developing, set the IS_DEV flag to true and change the
            name of the test being developed to run it in isolation.
 
+        4. Set CRIMSON_CAPTURE_CACHE to a directory to keep every capture,
+           then add CRIMSON_REPLAY=1 to rerun the analysis on them without
+           a radio.
+
+        5. Set CRIMSON_JOURNAL_DIR to a directory to have long sweeps
+           resume from their last completed point after a crash.
+
+        6. Set CRIMSON_RESULTS_DB to a file to keep the measurements of
+           every test as typed rows in an SQLite database, see
+           results_store.py.
+
+        7. With _TO_MOCK set, sweeps are computed ahead on every core.
+           Set CRIMSON_MOCK_PROCESSES to limit the processes, or to 1 to
+           compute them in the test process.
+
     Testing Requirements:
 
         1. Channel Independence:
@@ -63,6 +86,51 @@ class qa_crimson_loopback(gr_unittest.TestCase):
     Issue 4698.
     """
 
+    # Running flowgraphs keyed on (device, channel count, TX burst mode).
+    _fixtures = {}
+
+    # Captures saved for replay, see capture_cache_from_env(). Opened in
+    # setUpClass.
+    _captures = None
+
+    # Process pool for mock captures, started on first use.
+    _mock_runner = None
+
+    # Measurements kept for analysis, see results_store_from_env(). Opened
+    # in setUpClass.
+    _results = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls._captures = capture_cache_from_env()
+        cls._results = results_store_from_env()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._stop_fixtures()
+        cls._fixtures = {}
+
+        cls._captures = None
+
+        if cls._results is not None:
+            cls._results.close()
+            cls._results = None
+
+        if cls._mock_runner is not None:
+            cls._mock_runner.close()
+            cls._mock_runner = None
+
+    @classmethod
+    def _stop_fixtures(cls, keep=None, device=None):
+        """
+        Stops every flowgraph but keep, on one device or all of them, so
+        only one streams on a device at a time.
+        """
+
+        for key, fixture in cls._fixtures.items():
+            if fixture is not keep and device in (None, key[0]):
+                fixture.stop()
+
     def setUp(self):
         """
         Runs before every test is called.
@@ -71,6 +139,14 @@ class qa_crimson_loopback(gr_unittest.TestCase):
         # Flag to mock the vsnk or not
         self._TO_MOCK = False
 
+        # Flag to transmit only a burst around the capture instead of
+        # streaming for the whole test.
+        self._TX_BURST = False
+
+        # Flag to sweep a coarse grid and refine only where the results
+        # change or near their limit, instead of every frequency.
+        self._ADAPTIVE = False
+
         # Start with 4 channels. When central frequency cross 40 MHz
         # channels 3 and 4 must be disabled.
         self.channels = range(4)
@@ -78,6 +154,14 @@ class qa_crimson_loopback(gr_unittest.TestCase):
         # In seconds.
         self.test_time = 5.0
 
+        # Seconds for the TX stream and retuned LOs to settle before a
+        # capture.
+        self.settle_time = 0.5
+
+        # Number repeated captures from 0 in every test.
+        if self._captures is not None:
+            self._captures.reset_iterations()
+
         # Extra white space for test seperation.
         print("")
 
@@ -87,6 +171,9 @@ class qa_crimson_loopback(gr_unittest.TestCase):
 
 
     def tearDown(self):
+        if self._results is not None:
+            self._results.flush()
+
         # Log the status of the test
         if self.failures == []:
             log.info('{:25}'.format(self.shortDescription()) + " Pass")
@@ -94,7 +181,43 @@ class qa_crimson_loopback(gr_unittest.TestCase):
             # Failure message with relevant info
             log.info('{:25}'.format(self.shortDescription()) +  " Fail\n" + " "*26 + ("\n" + " "*26).join(self.failures))
 
-    def coreTest(self, rx_gain, tx_amp, centre_freq):
+    def _sweep(self, start, stop, step, threshold):
+        """
+        The centre frequencies of a test, as an AdaptiveSweep or a FixedSweep
+        depending on the _ADAPTIVE flag.
+        """
+
+        if self._ADAPTIVE:
+            return AdaptiveSweep(start, stop, step, threshold=threshold)
+
+        sweep = FixedSweep(start, stop, step)
+
+        # Every point is known up front, so mock captures can start now.
+        if self._TO_MOCK:
+            runner = self._runner()
+            if runner is not None:
+                runner.prefetch([self._mock_args(centre_freq) for centre_freq in sweep.grid])
+
+        return sweep
+
+    def _record(self, centre_freq, rx_gain, tx_amp, channel, metric, value):
+        """Keeps a measurement of this test if CRIMSON_RESULTS_DB is set."""
+        if self._results is not None:
+            self._results.record(self.id().split(".")[-1], centre_freq, rx_gain, tx_amp,
+                channel, metric, value)
+
+    @classmethod
+    def _runner(cls):
+        if cls._mock_runner is None:
+            cls._mock_runner = mock_runner_from_env()
+        return cls._mock_runner
+
+    def _mock_args(self, centre_freq):
+        """What a mock capture at centre_freq depends on, see mock_capture()."""
+        channels = range(2) if centre_freq > 40e6 else self.channels
+        return (len(channels), self.test_time, 64, 20e6, float(centre_freq))
+
+    def coreTest(self, rx_gain, tx_amp, centre_freq, device="crimson", retune=False):
         """
         |<------------ TX CHAIN ---------->| |<----- RX CHAIN ---->|
                                     +------+ +------+
@@ -111,13 +234,14 @@ class qa_crimson_loopback(gr_unittest.TestCase):
         | sig[3] |--->| c2s[3] |--->|ch3   | |   ch3|--->| vsnk[3] |
         +--------+    +--------+    | csnk | | csrc |    +---------+
                                     +------+ +------+
+
+        device selects the crimson, so SweepScheduler workers can run
+        coreTest on several at once. retune writes the frequencies even if
+        the last run used the same ones.
         """
 
         # Is above 40 MHz, disable Channels C & D
-        if centre_freq > 40e6:
-            self.channels = range(2)
-
-        tb = gr.top_block()
+        channels = range(2) if centre_freq > 40e6 else self.channels
 
         # Variables.
         sample_rate = 20e6 #260e6 is the max
@@ -126,60 +250,71 @@ class qa_crimson_loopback(gr_unittest.TestCase):
         sc = uhd.stream_cmd_t(uhd.stream_cmd_t.STREAM_MODE_NUM_SAMPS_AND_DONE)
         sc.num_samps = 64
 
-        if not self._TO_MOCK:
-
-            # Blocks and Connections (TX CHAIN).
-            sigs = [
-                analog.sig_source_c(sample_rate, analog.GR_SIN_WAVE, wave_freq, tx_amp, 0.0)
-                for channel in self.channels]
-
-            c2ss = [
-                blocks.complex_to_interleaved_short(True)
-                for channel in self.channels]
-
-            csnk = crimson_sink_s(self.channels, sample_rate, centre_freq, 0.0)
-
-            for channel in self.channels:
-                tb.connect(sigs[channel], c2ss[channel])
-                tb.connect(c2ss[channel], (csnk, channel))
-
-            # Blocks and Connections (RX CHAIN).
-            csrc = crimson_source_c(self.channels, sample_rate, centre_freq, rx_gain)
-
-            vsnk = [blocks.vector_sink_c()
-                for channel in self.channels]
-
-            for channel in self.channels:
-                tb.connect((csrc, channel), vsnk[channel])
-
-            # Reset TX and RX times to be roughly in sync.
-            csnk.set_time_now(uhd.time_spec_t(0.0))
-            csrc.set_time_now(uhd.time_spec_t(0.0))
-
-            # Issue stream command to start RX chain somewhere in the middle of the test.
-            sc.stream_now = False
-            sc.time_spec = uhd.time_spec_t(self.test_time / 2.0)
-            csrc.issue_stream_cmd(sc)
-
-            # Run the test.
-            tb.start()
-            time.sleep(self.test_time)
-            tb.stop()
-            tb.wait()
+        # Everything that shapes a capture, to look it up in the cache.
+        config = {
+            "centre_freq": float(centre_freq),
+            "rx_gain": float(rx_gain),
+            "tx_amp": float(tx_amp),
+            "sample_rate": sample_rate,
+            "wave_freq": wave_freq,
+            "channels": list(channels),
+            "num_samps": sc.num_samps,
+            "tx_burst": self._TX_BURST,
+            "retune": retune,
+        }
+
+        # Repeated runs of one configuration, e.g. in the repeatability
+        # tests, each get their own capture.
+        if not self._TO_MOCK and self._captures is not None:
+            config["iteration"] = self._captures.iteration(config)
+
+        if not self._TO_MOCK and self._captures is not None and self._captures.replay:
+            config["firmware"] = self._captures.firmware()
+            data = self._captures.load(config)
+
+            if data is None:
+                raise LookupError("No capture of {} in {}".format(config, self._captures.root))
+
+            return [CapturedSink(row) for row in data], None, None
+
+        elif not self._TO_MOCK:
+
+            # The flowgraph is built on first use for each channel count
+            # and shared by every test of the class.
+            key = (device, len(channels), self._TX_BURST)
+            fixture = self._fixtures.get(key)
+
+            self._stop_fixtures(keep=fixture, device=device)
+
+            if fixture is None:
+                fixture = LoopbackFixture(channels, sample_rate, wave_freq,
+                    sc.num_samps, self._TX_BURST, args=device)
+                fixture.firmware = firmware_id(fixture.csrc)
+                self._fixtures[key] = fixture
+
+            # Capture once settled, finishing as soon as the capture is in.
+            vsnk = fixture.run(rx_gain, tx_amp, centre_freq,
+                self.settle_time, self.test_time / 2.0, retune)
+
+            # Keep complete captures for replay.
+            if self._captures is not None and all(len(v.data()) == sc.num_samps for v in vsnk):
+                config["firmware"] = fixture.firmware
+                self._captures.save(config, [v.data() for v in vsnk])
 
             # Return a vsnk sample for further processing and verification.
             # vsnk are to be processed in individual unit tests, eg. def test_xyz_t(self):
             # Read sigproc.py for further information on signal processing and vsnks.
 
-            return vsnk, csnk, csrc
+            return vsnk, fixture.csnk, fixture.csrc
 
         else:
-            crimson = MockCrimson(len(self.channels), self.test_time, sc.num_samps, sample_rate)
-            #crimson.amp = tx_amp
-            crimson.freq = centre_freq
-            #print crimson.equation()
+            args = self._mock_args(centre_freq)
+            runner = self._runner()
 
-            vsnk = crimson.sample()
+            if runner is not None:
+                vsnk = [CapturedSink(data) for data in runner.capture(args)]
+            else:
+                vsnk = [CapturedSink(data) for data in mock_capture(args)]
 
             return vsnk, None, None # Match tuple
     #-----------------------------------------------------------------------------------#
@@ -204,14 +339,23 @@ class qa_crimson_loopback(gr_unittest.TestCase):
     def test_003_t(self):
         """Phase Coherency"""
 
-        for centre_freq in np.arange(15e6, 4e9, 25e6):
+        # The metric is the worst channel's total phase shift.
+        sweep = self._sweep(15e6, 4e9, 25e6, threshold=np.pi/90.0)
+
+        # TX streams without a break across the runs, and every capture
+        # starts on a whole tone period, so the tone's phase is the same
+        # in every run. Each run retunes, so what differs between the runs
+        # is the phase the LOs lock at, as with a new flowgraph per run.
+
+        for centre_freq in sweep:
             log.debug("%.2f Hz" % centre_freq)
 
             runs = []
+            worst = 0.0
 
             # Run 3 iterations at each centre frequency
             for x in xrange(3):
-                vsnk = self.coreTest(8.0, 3.0e4, centre_freq)[0]
+                vsnk = self.coreTest(8.0, 3.0e4, centre_freq, retune=True)[0]
                 #sigproc.dump(vsnk)
 
                 runs.append(vsnk)
@@ -222,6 +366,9 @@ class qa_crimson_loopback(gr_unittest.TestCase):
                 phase_diff = sigproc.phase_diff([row[channel] for row in runs])
                 log.debug(phase_diff)
 
+                worst = max(worst, phase_diff[0] + phase_diff[1])
+                self._record(centre_freq, 8.0, 3.0e4, channel, "phase_diff", phase_diff[0] + phase_diff[1])
+
                 try:
                     self.assertLessEqual(phase_diff[0] + phase_diff[1], np.pi/90.0, # Check less than 2 deg total
                         "Channel {} out of phase at {:.0f}  MHz Centre Frequency".format(channel, centre_freq))
@@ -229,17 +376,37 @@ class qa_crimson_loopback(gr_unittest.TestCase):
                     self.failures.append(str(e))
                     pass
 
+            sweep.report(centre_freq, worst)
+
     def test_004_t(self):
         """Start of Burst"""
 
-        cmd = "./build/python/qa_crimson_burst_dummy.sh"
-        p = Popen(cmd, stderr = PIPE)
-        stderr = p.communicate()[1]
-        log.debug(stderr)
+        self._stop_fixtures()
+
+        sample_rates = np.arange(20e6, 260e6, 40e6)
+
+        # Keep the results, and check them for regressions, if
+        # CRIMSON_BENCH_DIR names a directory for them.
+        path = None
+        if os.environ.get("CRIMSON_BENCH_DIR"):
+            path = os.path.join(os.environ["CRIMSON_BENCH_DIR"], "test_004_t.json")
+
+        bench = ThroughputBench()
+        results = bench.run(bench_matrix([len(self.channels)], ["sc16"], sample_rates), path)
+
+        for result in results:
+            log.debug("%.0f S/s: %.0f S/s, %d overflows, %d underflows" % (result["sample_rate"],
+                result["achieved_rate"], result["overflows"], result["underflows"]))
+
+        # Compare the max rates with the earlier runs on this host.
+        history = bench_history_from_env()
+        if history is not None:
+            for regression in history.check("test_004_t", throughput_metrics(results), fingerprint(bench.device)):
+                self.failures.append("{} regressed from {:.0f} to {:.0f} ({:+.1%})".format(*regression))
 
         # Should only fail on the last iteration of the loop
         try:
-            self.assertEqual(stderr.count("rx error code: 15"), 1,
+            self.assertEqual([result["clean"] for result in results], [True] * (len(sample_rates) - 1) + [False],
                 "Crimson does not have the expected amount of empties/overs.")
         except AssertionError, e:
             self.failures.append(str(e))
@@ -268,41 +435,90 @@ class qa_crimson_loopback(gr_unittest.TestCase):
         """Gain (LB + HB)"""
         # Checks using the areas of the waves and the peaks to verify (x2)
 
-        for centre_freq in np.arange(10e6, 4e9, 20e6):
+        # The metric is the smallest area step relative to the mean area,
+        # negative when the areas do not increase.
+        sweep = self._sweep(10e6, 4e9, 20e6, threshold=0.0)
+
+        # Spread the frequencies over every crimson, with all amplitudes
+        # of a frequency measured on the same one.
+        scheduler = SweepScheduler(crimson_devices(), lambda device, point:
+            sigproc.absolute_area(self.coreTest(point.rx_gain, point.tx_amp, point.centre_freq, device)[0]))
+
+        tx_amps = np.arange(5e3, 30e3, 5.0e3)
+
+        # Carry on from the last run if it died part way, unless the
+        # sweep has changed since.
+        journal = sweep_journal_from_env("test_006_t", {
+            "devices": scheduler.devices,
+            "freqs": [10e6, 4e9, 20e6],
+            "adaptive": self._ADAPTIVE,
+            "rx_gain": [10.0, 30.0],
+            "tx_amp": tx_amps,
+            "channels": list(self.channels),
+        })
+
+        # An adaptive sweep picks its next points from the results so far.
+        batch_size = len(scheduler.devices) if self._ADAPTIVE else len(sweep.grid)
+
+        while True:
+            freqs = sweep.next_batch(batch_size)
+            if not freqs:
+                break
+
+            points = [
+                SweepPoint(centre_freq,
+                    # High band requires stronger reception when centre_freq is greater 120 Mhz.
+                    30.0 if centre_freq > 120e6 else 10.0,
+                    tx_amp)
+                for centre_freq in freqs
+                # For each centre frequency, sweep the TX Gain.
+                for tx_amp in tx_amps]
 
-            log.debug("%.2f Hz" % centre_freq)
+            results = scheduler.run(points, group=lambda point: point.centre_freq, journal=journal)
 
-            areas = []
+            if journal is not None and any(result.error is not None for result in results):
+                journal.close()
 
-            # For each centre frequency, sweep the TX Gain.
-            for tx_amp in np.arange(5e3, 30e3, 5.0e3):
+            by_freq = OrderedDict()
+            for result in results:
+                by_freq.setdefault(result.point.centre_freq, []).append(result)
 
-                vsnk = self.coreTest(# High band requires stronger reception when centre_freq is greater 120 Mhz.
-                    30.0 if centre_freq > 120e6 else 10.0,
-                    tx_amp,
-                    centre_freq)[0]
+            for centre_freq, results in by_freq.items():
 
-                #sigproc.dump(vsnk)
+                log.debug("%.2f Hz on %s" % (centre_freq, results[0].device))
 
-                area = sigproc.absolute_area(vsnk)
-                areas.append(area)
+                for result in results:
+                    if result.error is not None:
+                        raise result.error
 
-            # Transpose to defragment channel data.
-            areas = np.array(areas).T.tolist()
+                areas = [result.value for result in results]
 
-            # Log
-            log.debug("Absolute Areas")
-            for ch, area in enumerate(areas):
-                log.debug("ch[%d]: %r" % (ch, np.around(area, decimals = 4)))
+                for result in results:
+                    for channel, area in enumerate(result.value):
+                        self._record(centre_freq, result.point.rx_gain, result.point.tx_amp,
+                            channel, "absolute_area", area)
 
-            # Verify areas are increasing (just check if list if sorted).
-            for area in areas:
-                try:
-                    self.assertEqual(area, sorted(area),
-                        "{:.0f} MHz central freqeuncy".format(centre_freq/1e6))
-                except AssertionError, e:
-                    self.failures.append(str(e))
-                    pass
+                # Transpose to defragment channel data.
+                areas = np.array(areas).T.tolist()
+
+                # Log
+                log.debug("Absolute Areas")
+                for ch, area in enumerate(areas):
+                    log.debug("ch[%d]: %r" % (ch, np.around(area, decimals = 4)))
+
+                sweep.report(centre_freq, min(np.min(np.diff(area)) / (np.mean(area) or 1.0) for area in areas))
+
+                # Verify areas are increasing (just check if list if sorted).
+                for area in areas:
+                    try:
+                        self.assertEqual(area, sorted(area),
+                            "{:.0f} MHz central freqeuncy".format(centre_freq/1e6))
+                    except AssertionError, e:
+                        self.failures.append(str(e))
+                        pass
+
+        if journal is not None:
+            journal.finish()
 
     def test_007_t(self):
         """Channel Repeatability"""
@@ -331,10 +547,16 @@ class qa_crimson_loopback(gr_unittest.TestCase):
     def test_008_t(self):
         """Channel Consistency"""
 
-        for centre_freq in np.arange(15e6, 4e9, 100e6):
+        # The metric is the worst channel's deviation from channel 0 beyond
+        # the relative tolerance.
+        sweep = self._sweep(15e6, 4e9, 100e6, threshold=0.05)
+
+        for centre_freq in sweep:
 
             log.debug("%.2f Hz" % centre_freq)
 
+            worst = 0.0
+
             #3 iterations at each centre frequency
             for x in xrange(3):
                 vsnk = self.coreTest(8.0, 3.0e4, centre_freq)[0]
@@ -344,6 +566,11 @@ class qa_crimson_loopback(gr_unittest.TestCase):
 
                 #Check that the channels are all similar to each other
                 for channel in xrange(1, len(vsnk)):
+                    deviation = np.max(np.abs(np.subtract(vsnk[0], vsnk[channel]))
+                        - 0.05 * np.abs(vsnk[channel]))
+                    worst = max(worst, deviation)
+                    self._record(centre_freq, 8.0, 3.0e4, channel, "deviation", deviation)
+
                     try:
                         self.assertTrue(np.allclose(vsnk[0], vsnk[channel], 0.05, 0.05),
                             "{:.0f} MHz Central Frequency".format(centre_freq/1e6))
@@ -351,42 +578,76 @@ class qa_crimson_loopback(gr_unittest.TestCase):
                         self.failures.append(str(e))
                         pass
 
+            sweep.report(centre_freq, worst)
+
     def test_009_t(self):
         """Flow Control"""
 
         # NOTE: This test cannot be mocked.
 
-        cmd = "./python/crimson_test_underflow"
-        p = Popen(cmd, stdout=PIPE, stderr=PIPE)
+        self._stop_fixtures()
+
+        check = check_underflow(self.channels, 20e6)
 
-        def endProcess():
-            p.kill()
+        if check.latency is not None:
+            log.debug("Underflow reported %.6f s after the last sample" % check.latency)
 
-            try:
-                self.assertTrue(False, "Underflow Check Timed Out")
-            except AssertionError, e:
-                self.failures.append(str(e))
-                pass
+        # Should underflow only once the TX stream is starved.
+        try:
+            self.assertEqual(check.before, 0,
+                "TX underflowed while being fed")
+            self.assertGreater(check.after, 0,
+                "TX underflows could not be requested async")
+        except AssertionError, e:
+            self.failures.append(str(e))
+            pass
+
+    def test_010_t(self):
+        """Retune Sweep"""
+
+        # NOTE: This test cannot be mocked.
 
-        # Use a timer for timeout functionality
-        # 20 second timeout
-        timer = Timer(20, endProcess)
+        self._stop_fixtures()
+
+        # The whole phase coherency grid in one streaming session.
+        # Channels C & D are disabled above 40 MHz.
+        engine = SweepEngine(range(2), 20e6, 8.0, 3.0e4)
 
         try:
-            timer.start()
-
-            stdout = p.communicate()[0]
-            log.debug(stdout)
-
-            # Should fail only on the last iteration of the loop
-            try:
-                self.assertEqual(stdout.count("Got event code underflow message."), 1,
-                    "TX underflows could not be requested async")
-            except AssertionError, e:
-                self.failures.append(str(e))
-                pass
+            segments = engine.run(np.arange(15e6, 4e9, 25e6))
         finally:
-            timer.cancel()
+            engine.stop()
+
+        for segment in segments:
+            log.debug("%.2f Hz" % segment.rx_freq)
+
+            for channel in xrange(len(segment.data)):
+                try:
+                    self.assertTrue(np.any(segment.data[channel]),
+                        "Channel {} received nothing at {:.0f} MHz Centre Frequency".format(channel, segment.rx_freq/1e6))
+                except AssertionError, e:
+                    self.failures.append(str(e))
+                    pass
+
+    def test_011_t(self):
+        """Loopback Latency"""
+
+        # NOTE: This test cannot be mocked.
+
+        self._stop_fixtures()
+
+        result = LatencyBench(markers=10).run_point(20e6)
+
+        log.debug("Median %s s, p99 %s s, %d of 10 missed" % (result["median"], result["p99"],
+            result["missed"]))
+
+        # Without any marker back the latencies measure nothing at all.
+        try:
+            self.assertGreater(len(result["latencies"]), 0,
+                "No markers came back through the loopback")
+        except AssertionError, e:
+            self.failures.append(str(e))
+            pass
 
 if __name__ == '__main__':
 
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr_unittest
+
+from crimson_multi import channel_map, _crimson_multi
+
+class qa_crimson_multi(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Ensure logical channels map to (unit, stream index) pairs device
+           by device, also when the units have different channel lists.
+        2. Ensure one channel list is used for every unit, and that the
+           wrong number of channel lists is refused.
+        3. Ensure per channel settings, as one value, a sequence or a dict,
+           are split into the values of each unit.
+        4. Ensure settings with the wrong number of values, or missing a
+           channel, are refused.
+    """
+
+    def setUp(self):
+        self.multi = _crimson_multi()
+
+    def tearDown(self):
+        pass
+
+    def test_000_t(self):
+        self.assertEqual(channel_map([[0, 1], [0, 1]]), [(0, 0), (0, 1), (1, 0), (1, 1)])
+
+        # Uneven: stream indices, not channel numbers.
+        self.assertEqual(channel_map([[0, 1, 2], [3]]), [(0, 0), (0, 1), (0, 2), (1, 0)])
+        self.assertEqual(channel_map([[], [2]]), [(1, 0)])
+
+    def test_001_t(self):
+        self.multi._setup(["addr=a", "addr=b"], [0, 1])
+        self.assertEqual(self.multi.channels, [[0, 1], [0, 1]])
+        self.assertEqual(len(self.multi.channel_map), 4)
+
+        self.multi._setup(["addr=a", "addr=b"], [range(3), (2,)])
+        self.assertEqual(self.multi.channels, [[0, 1, 2], [2]])
+        self.assertEqual(self.multi.channel_map, [(0, 0), (0, 1), (0, 2), (1, 0)])
+
+        self.assertRaises(ValueError, self.multi._setup, ["addr=a", "addr=b"], [[0, 1]])
+        self.assertRaises(ValueError, self.multi._setup, ["addr=a"], [[0], [1]])
+
+    def test_002_t(self):
+        self.multi._setup(["addr=a", "addr=b"], [[0, 1, 2], [0]])
+
+        self.assertEqual(self.multi._per_unit(8.0, "gain"), [[8.0, 8.0, 8.0], [8.0]])
+        self.assertEqual(self.multi._per_unit([1, 2, 3, 4], "gain"), [[1, 2, 3], [4]])
+        self.assertEqual(self.multi._per_unit({0: 1, 1: 2, 2: 3, 3: 4}, "gain"), [[1, 2, 3], [4]])
+
+    def test_003_t(self):
+        self.multi._setup(["addr=a", "addr=b"], [[0, 1], [0, 1]])
+
+        for value in [[1, 2, 3], [1, 2, 3, 4, 5], {0: 1, 1: 2, 2: 3}]:
+            with self.assertRaises(ValueError) as context:
+                self.multi._per_unit(value, "LO offset")
+            self.assertTrue("LO offset" in str(context.exception))
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_crimson_multi)
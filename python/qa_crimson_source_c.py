@@ -24,6 +24,8 @@ from gnuradio import gr_unittest
 from gnuradio import uhd
 from gnuradio import blocks
 from crimson_source_c import crimson_source_c
+from crimson_capture import CrimsonCapture
+from harness import wait_for_samples
 
 import time
 import sys
@@ -95,9 +97,9 @@ class qa_crimson_source_c(gr_unittest.TestCase):
         sc.stream_now = True
         csrc.issue_stream_cmd(sc)
 
-        # Run the test.
+        # Run the test until the capture is in.
         tb.start()
-        time.sleep(self.test_time)
+        wait_for_samples(vsnk, sc.num_samps, self.test_time)
         tb.stop()
         tb.wait()
 
@@ -111,5 +113,16 @@ class qa_crimson_source_c(gr_unittest.TestCase):
         vsnk = self.coreTest()
         sigproc.dump(vsnk)
 
+    def test_001_t(self):
+        # Same capture as coreTest without a flowgraph.
+        channels = range(4)
+        num_samps = 32
+
+        crimson = CrimsonCapture(channels, 20e6, 15e6, 1.0)
+        samples, time_spec = crimson.capture(num_samps)
+
+        self.assertEqual(samples.shape, (len(channels), num_samps))
+        self.assertIsNotNone(time_spec)
+
 if __name__ == '__main__':
     gr_unittest.run(qa_crimson_source_c)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr_unittest
+
+from harness import wait_for_samples, drain
+
+import threading
+import time
+
+class GrowingSink(object):
+    """
+    Stands in for a vector sink that reads a sample every call.
+    """
+
+    def __init__(self, limit, first=0):
+        self.count = first
+        self.limit = first + limit
+
+    def nitems_read(self, which_input):
+        if self.count < self.limit:
+            self.count += 1
+        return self.count
+
+    def data(self):
+        raise AssertionError("The samples should not be copied to wait for them")
+
+class qa_harness(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Ensure the wait ends as soon as every sink is full.
+        2. Ensure the wait gives up at the timeout, or shortly after the
+           capture is known to be over.
+        3. Ensure the samples of earlier captures do not count.
+        4. Ensure a drain lasts until the late samples are in.
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_000_t(self):
+        start = time.time()
+        self.assertTrue(wait_for_samples([GrowingSink(10), GrowingSink(10)], 10, 5.0))
+        self.assertLess(time.time() - start, 1.0)
+
+        start = time.time()
+        self.assertFalse(wait_for_samples([GrowingSink(5)], 10, 0.1))
+        self.assertGreaterEqual(time.time() - start, 0.1)
+
+    def test_001_t(self):
+        done = threading.Event()
+        done.set()
+
+        start = time.time()
+        self.assertFalse(wait_for_samples([GrowingSink(5)], 10, 5.0, done, grace=0.05))
+        self.assertLess(time.time() - start, 1.0)
+
+    def test_002_t(self):
+        # Sinks of a running flowgraph, counting on from earlier captures.
+        sinks = [GrowingSink(10, 1000), GrowingSink(10, 500)]
+        self.assertTrue(wait_for_samples(sinks, 10, 5.0, start=[1000, 500]))
+
+        sinks = [GrowingSink(5, 1000)]
+        self.assertFalse(wait_for_samples(sinks, 10, 0.1, start=[1000]))
+
+    def test_003_t(self):
+        # 100 late samples, one per poll.
+        sink = GrowingSink(100)
+        self.assertTrue(drain([sink], quiet=0.05, timeout=5.0))
+        self.assertEqual(sink.count, 100)
+
+        self.assertFalse(drain([GrowingSink(10 ** 6)], timeout=0.1))
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_harness)
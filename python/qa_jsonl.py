@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr_unittest
+
+from jsonl import load_jsonl
+
+import os
+import shutil
+import tempfile
+
+class qa_jsonl(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Ensure a missing file loads as no entries.
+        2. Ensure every complete line loads, and a last line cut short by
+           a crash is dropped and truncated away.
+    """
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, "entries.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_000_t(self):
+        self.assertEqual(load_jsonl(self.path), [])
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_001_t(self):
+        with open(self.path, "w") as out:
+            out.write('{"a": 1}\n{"a": 2}\n{"a": 3, "b": [1,')
+
+        self.assertEqual(load_jsonl(self.path), [{"a": 1}, {"a": 2}])
+
+        with open(self.path) as jsonl:
+            self.assertEqual(jsonl.read(), '{"a": 1}\n{"a": 2}\n')
+
+        # A line that does not parse ends the intact part too.
+        with open(self.path, "a") as out:
+            out.write('garbage\n{"a": 4}\n')
+
+        self.assertEqual(load_jsonl(self.path), [{"a": 1}, {"a": 2}])
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_jsonl)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr
+from gnuradio import gr_unittest
+from gnuradio import blocks
+
+from latency_bench import pn_marker, chirp_marker, find_markers, latency_stats
+from latency_bench import marker_source_s, marker_detector_c
+
+import numpy as np
+
+class qa_latency_bench(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Bury PN and chirp markers in noise at known offsets.
+        2. Ensure each is found at its offset, and only once.
+        3. Ensure markers sent by marker_source_s are found by
+           marker_detector_c at the offsets they were sent at.
+    """
+
+    def setUp(self):
+        self.random = np.random.RandomState(0)
+
+    def tearDown(self):
+        pass
+
+    def test_000_t(self):
+        offsets = [100, 1000, 1300]
+
+        for marker in [pn_marker(), chirp_marker()]:
+            noise = 0.1 * (self.random.randn(4000) + 1j * self.random.randn(4000))
+            samples = noise.astype(np.complex64)
+
+            for offset in offsets:
+                samples[offset:offset + len(marker)] += 5.0 * np.exp(0.3j) * marker
+
+            self.assertEqual(find_markers(samples, marker), offsets)
+            self.assertEqual(find_markers(noise, marker), [])
+
+    def test_001_t(self):
+        stats = latency_stats([0.001, 0.002, 0.003])
+        self.assertAlmostEqual(stats["median"], 0.002)
+        self.assertAlmostEqual(stats["max"], 0.003)
+
+        self.assertEqual(latency_stats([])["median"], None)
+
+    def test_002_t(self):
+        """
+        +--------+    +-----+    +------+    +----------+
+        | marker |--->| s2c |--->| head |--->| detector |
+        +--------+    +-----+    +------+    +----------+
+        """
+        tb = gr.top_block()
+
+        marker = pn_marker(63)
+
+        msrc = marker_source_s(1000.0 * marker)
+        s2c = blocks.interleaved_short_to_complex(True)
+        head = blocks.head(gr.sizeof_gr_complex, 1000)
+        detector = marker_detector_c(marker)
+
+        tb.connect(msrc, s2c, head, detector)
+
+        msrc.fire()
+        msrc.fire()
+        tb.run()
+
+        found = []
+        while not detector.found.empty():
+            found.append(detector.found.get()[1])
+
+        self.assertEqual(found, [0, 63])
+        self.assertEqual(msrc.sent.qsize(), 2)
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_latency_bench)
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr_unittest
+
+from mock_runner import MockRunner, mock_capture
+
+class qa_mock_runner(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Compute a sweep of mock captures on a pool.
+        2. Ensure they equal the captures made one by one, in order.
+    """
+
+    def setUp(self):
+        self.runner = MockRunner(4)
+        self.captures = [(2 if freq > 40e6 else 4, 5.0, 64, 20e6, freq)
+            for freq in [15e6, 40e6, 65e6, 15e6, 90e6]]
+
+    def tearDown(self):
+        self.runner.close()
+
+    def test_000_t(self):
+        expected = [mock_capture(args) for args in self.captures]
+
+        self.assertEqual(self.runner.map(self.captures), expected)
+
+        self.runner.prefetch(reversed(self.captures))
+        self.assertEqual([self.runner.capture(args) for args in self.captures], expected)
+        self.assertEqual(len(self.runner.capture(self.captures[-1])), 2)
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_mock_runner)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr
+from gnuradio import gr_unittest
+from gnuradio import blocks
+
+import pv_swig as pv
+
+import numpy as np
+
+class qa_pfb_channelizer_cc(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Feed every channel a tone at the centre of one sub-band.
+        2. Ensure the tone comes out of that sub-band only, at unit gain.
+        3. Ensure a subset of sub-bands matches the same sub-bands of the
+           full filterbank.
+        4. Ensure channel and band counts below 1 are refused.
+    """
+
+    def setUp(self):
+        self.num_bands = 8
+        self.num_samps = 8000
+
+    def tearDown(self):
+        pass
+
+    def coreTest(self, tones, bands=[], nthreads=0):
+        """
+        +---------+    +-------------+    +---------+
+        | vsrc[0] |--->|in0      out0|--->| vsnk[0] |
+        +---------+    |          ...|    +---------+
+        +---------+    |             |    +---------+
+        | vsrc[1] |--->|in1      outn|--->| vsnk[n] |
+        +---------+    | channelizer |    +---------+
+                       +-------------+
+        """
+        tb = gr.top_block()
+
+        t = np.arange(self.num_samps)
+        vsrc = [blocks.vector_source_c(np.exp(2j * np.pi * tone * t / self.num_bands)) for tone in tones]
+
+        chan = pv.pfb_channelizer_cc(len(tones), self.num_bands, bands, nthreads)
+        vsnk = [blocks.vector_sink_c() for port in xrange(len(tones) * len(chan.bands()))]
+
+        for channel in xrange(len(tones)):
+            tb.connect(vsrc[channel], (chan, channel))
+
+        for port in xrange(len(vsnk)):
+            tb.connect((chan, port), vsnk[port])
+
+        tb.run()
+
+        # Skip the filter transient.
+        settle = len(chan.taps()) // self.num_bands
+        outputs = [np.array(vsnk[port].data()) for port in xrange(len(vsnk))]
+
+        for output in outputs:
+            self.assertEqual(len(output), self.num_samps // self.num_bands)
+
+        return chan, [output[settle:] for output in outputs]
+
+    def test_000_t(self):
+        tones = [2, 5]
+        chan, outputs = self.coreTest(tones)
+
+        self.assertEqual(list(chan.bands()), range(self.num_bands))
+
+        for channel, tone in enumerate(tones):
+            for band in xrange(self.num_bands):
+                level = np.abs(outputs[channel * self.num_bands + band])
+
+                if band == tone:
+                    self.assertTrue(np.allclose(level, 1.0, atol=0.01))
+                else:
+                    self.assertTrue(np.all(level < 0.01))
+
+    def test_001_t(self):
+        tones = [2, 5]
+        bands = [2, 5]
+
+        # The subset is formed by dot products, the full set by an FFT.
+        chan, full = self.coreTest(tones, nthreads=1)
+        chan, subset = self.coreTest(tones, bands, nthreads=3)
+
+        self.assertEqual(len(subset), len(tones) * len(bands))
+
+        for channel in xrange(len(tones)):
+            for index, band in enumerate(bands):
+                self.assertTrue(np.allclose(subset[channel * len(bands) + index],
+                    full[channel * self.num_bands + band], atol=1e-5))
+
+    def test_002_t(self):
+        # SWIG raises the std::invalid_argument of make() as RuntimeError.
+        for num_channels, num_bands in [(1, 0), (1, -1), (0, 8), (-1, 8)]:
+            self.assertRaises(RuntimeError, pv.pfb_channelizer_cc, num_channels, num_bands, [], 1, [])
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_pfb_channelizer_cc)
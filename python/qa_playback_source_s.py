@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr
+from gnuradio import gr_unittest
+from gnuradio import blocks
+
+from playback_source_s import playback_source_s
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+class qa_playback_source_s(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Play an interleaved two channel file once, channel 1 offset.
+        2. Ensure each channel gets its samples as interleaved shorts.
+        3. Ensure full scale cf32 samples clip rather than wrap.
+    """
+
+    def setUp(self):
+        self.channels = range(2)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def coreTest(self, path, datatype, offsets, scale=1000):
+        """
+        +----------+    +---------+
+        |      out0|--->| vsnk[0] |
+        |          |    +---------+
+        |          |    +---------+
+        |      out1|--->| vsnk[1] |
+        | playback |    +---------+
+        +----------+
+        """
+        tb = gr.top_block()
+
+        playback = playback_source_s(path, len(self.channels), datatype,
+            scale=scale, repeat=False, offsets=offsets)
+
+        vsnk = [blocks.vector_sink_s(2) for channel in self.channels]
+
+        for channel in self.channels:
+            tb.connect((playback, channel), vsnk[channel])
+
+        tb.run()
+
+        return [np.array(vsnk[channel].data()).reshape(-1, 2) for channel in self.channels]
+
+    def test_000_t(self):
+        path = os.path.join(self.directory, "playback.sigmf-data")
+
+        # 100 samples x 2 channels x I/Q.
+        data = np.arange(400, dtype=np.int16).reshape(100, 2, 2)
+        data.tofile(path)
+
+        played = self.coreTest(path, "ci16_le", [0, 10])
+
+        self.assertEqual(played[0].tolist(), data[0:90, 0].tolist())
+        self.assertEqual(played[1].tolist(), data[10:100, 1].tolist())
+
+    def test_001_t(self):
+        path = os.path.join(self.directory, "playback.sigmf-data")
+
+        data = (np.arange(200) / 200.0 + 0.5j).astype(np.complex64).reshape(100, 2)
+        data.tofile(path)
+
+        played = self.coreTest(path, "cf32_le", [0, 0])
+
+        for channel in self.channels:
+            self.assertEqual(played[channel][:, 0].tolist(), np.rint(data[:, channel].real * 1000).tolist())
+            self.assertEqual(played[channel][:, 1].tolist(), [500] * 100)
+
+    def test_002_t(self):
+        path = os.path.join(self.directory, "playback.sigmf-data")
+
+        data = np.array([[1.0 - 1.0j, -1.5 + 0.5j]] * 10, dtype=np.complex64)
+        data.tofile(path)
+
+        played = self.coreTest(path, "cf32_le", [0, 0], scale=2**15)
+
+        self.assertEqual(played[0].tolist(), [[32767, -32768]] * 10)
+        self.assertEqual(played[1].tolist(), [[-32768, 16384]] * 10)
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_playback_source_s)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr
+from gnuradio import gr_unittest
+from gnuradio import blocks
+
+import pv_swig as pv
+
+import numpy as np
+
+class qa_poly_decim_cc(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Feed every channel a different tone, in or out of band.
+        2. Ensure in band tones pass at unit gain and the rest is rejected.
+        3. Ensure a decimation below 1 is refused.
+    """
+
+    def setUp(self):
+        self.decimation = 10
+        self.num_samps = 20000
+
+    def tearDown(self):
+        pass
+
+    def coreTest(self, freqs, taps=[]):
+        """
+        +---------+    +--------+    +---------+
+        | vsrc[0] |--->|in0 out0|--->| vsnk[0] |
+        +---------+    |        |    +---------+
+        +---------+    |        |    +---------+
+        | vsrc[1] |--->|in1 out1|--->| vsnk[1] |
+        +---------+    | decim  |    +---------+
+                       +--------+
+        """
+        tb = gr.top_block()
+
+        t = np.arange(self.num_samps)
+        vsrc = [blocks.vector_source_c(np.exp(2j * np.pi * freq * t)) for freq in freqs]
+        vsnk = [blocks.vector_sink_c() for freq in freqs]
+
+        decim = pv.poly_decim_cc(len(freqs), self.decimation, taps)
+
+        for channel in xrange(len(freqs)):
+            tb.connect(vsrc[channel], (decim, channel), vsnk[channel])
+
+        tb.run()
+
+        return decim, [np.array(vsnk[channel].data()) for channel in xrange(len(freqs))]
+
+    def test_000_t(self):
+        # In band, out of band (aliases into the band) and DC.
+        decim, outputs = self.coreTest([0.2 / self.decimation, 0.7 / self.decimation, 0.0])
+
+        self.assertEqual(len(decim.taps()), 16 * self.decimation)
+
+        for output in outputs:
+            self.assertEqual(len(output), self.num_samps // self.decimation)
+
+        # Skip the filter transient.
+        settled = [np.abs(output[len(decim.taps()) // self.decimation:]) for output in outputs]
+
+        self.assertTrue(np.allclose(settled[0], 1.0, atol=0.01))
+        self.assertTrue(np.all(settled[1] < 0.01))
+        self.assertTrue(np.allclose(settled[2], 1.0, atol=0.001))
+
+    def test_001_t(self):
+        # Taps given by the caller: a plain average.
+        decim, outputs = self.coreTest([0.0], [1.0 / self.decimation] * self.decimation)
+
+        self.assertTrue(np.allclose(outputs[0][1:], 1.0))
+
+    def test_002_t(self):
+        # SWIG raises the std::invalid_argument of make() as RuntimeError.
+        for decimation in [0, -1]:
+            self.assertRaises(RuntimeError, pv.poly_decim_cc, 1, decimation, [])
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_poly_decim_cc)
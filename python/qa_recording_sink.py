@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr
+from gnuradio import gr_unittest
+from gnuradio import blocks
+
+from recording_sink import recording_sink, fallocate
+
+import os
+import json
+import shutil
+import tempfile
+
+import numpy as np
+
+class qa_recording_sink(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Record more samples than fit in one file.
+        2. Ensure the files hold every sample, interleaved by channel.
+        3. Ensure each file has its SigMF metadata.
+        4. Ensure files are preallocated, and a sink that never started
+           stops cleanly.
+    """
+
+    def setUp(self):
+        self.channels = range(2)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_000_t(self):
+        """
+        +---------+    +------+
+        | vsrc[0] |--->|in0   |
+        +---------+    |      |
+        +---------+    |      |
+        | vsrc[1] |--->|in1   |
+        +---------+    | rec  |
+                       +------+
+        """
+        tb = gr.top_block()
+
+        num_samps = 10000
+        data = [np.arange(num_samps) + 1j * channel for channel in self.channels]
+
+        vsrc = [blocks.vector_source_c(data[channel]) for channel in self.channels]
+
+        # 4 KiB blocks, 16 KiB files.
+        rec = recording_sink(len(self.channels), os.path.join(self.directory, "capture"),
+            20e6, 15e6, 8.0, max_bytes=16384, block_bytes=4096, num_blocks=1024)
+
+        for channel in self.channels:
+            tb.connect(vsrc[channel], (rec, channel))
+
+        tb.run()
+
+        self.assertEqual(rec.dropped, 0)
+        self.assertTrue(len(rec.files) > 1)
+
+        recorded = np.concatenate([
+            np.fromfile(path, dtype=np.complex64).reshape(-1, len(self.channels))
+            for path in rec.files])
+
+        for channel in self.channels:
+            self.assertComplexTuplesAlmostEqual(recorded[:, channel], data[channel])
+
+        for path in rec.files:
+            with open(path.replace(".sigmf-data", ".sigmf-meta")) as meta:
+                meta = json.load(meta)
+
+            self.assertEqual(meta["global"]["core:datatype"], "cf32_le")
+            self.assertEqual(meta["global"]["core:num_channels"], len(self.channels))
+            self.assertEqual(meta["captures"][0]["core:frequency"], 15e6)
+
+    def test_001_t(self):
+        path = os.path.join(self.directory, "preallocated")
+
+        with open(path, "wb") as f:
+            if fallocate(f.fileno(), 1 << 20):
+                self.assertTrue(os.fstat(f.fileno()).st_blocks * 512 >= 1 << 20)
+
+        rec = recording_sink(len(self.channels), os.path.join(self.directory, "capture"),
+            20e6, 15e6, 8.0)
+        self.assertTrue(rec.stop())
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_recording_sink)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr_unittest
+
+from results_store import ResultsStore
+
+import os
+import shutil
+import sqlite3
+import tempfile
+
+class qa_results_store(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Record a sweep of results in batches.
+        2. Ensure rows reach the database a batch at a time.
+        3. Ensure frequency range queries return the typed rows in order.
+    """
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, "results.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def count(self):
+        db = sqlite3.connect(self.path)
+        try:
+            return db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        finally:
+            db.close()
+
+    def test_000_t(self):
+        store = ResultsStore(self.path, batch_size=4, run="run1")
+
+        for freq in [115e6, 15e6, 65e6]:
+            store.record("test_003_t", freq, 8.0, 3.0e4, 0, "phase_diff", freq / 1e9)
+            self.assertEqual(self.count(), 0)
+
+        store.record("test_008_t", 40e6, 8.0, 3.0e4, 1, "deviation", -0.01)
+        self.assertEqual(self.count(), 4)
+
+        rows = store.query(10e6, 100e6, metric="phase_diff")
+        self.assertEqual([row.freq for row in rows], [15e6, 65e6])
+        self.assertEqual(rows[0].run, "run1")
+        self.assertEqual(rows[0].channel, 0)
+        self.assertAlmostEqual(rows[0].value, 0.015)
+
+        self.assertEqual(len(store.query(freq_min=60e6)), 2)
+        self.assertEqual(store.query(test="test_008_t")[0].metric, "deviation")
+
+        store.close()
+
+        # Readable by a later run, in WAL mode.
+        store = ResultsStore(self.path, run="run2")
+        self.assertEqual(len(store.query(run="run1")), 4)
+        self.assertEqual(store._db.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        store.close()
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_results_store)
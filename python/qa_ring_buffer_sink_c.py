@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr
+from gnuradio import gr_unittest
+from gnuradio import blocks
+
+from ring_buffer_sink_c import ring_buffer_sink_c
+
+import numpy as np
+
+class qa_ring_buffer_sink_c(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Stream more samples than the ring holds.
+        2. Ensure only the newest samples are kept, per channel.
+    """
+
+    def setUp(self):
+        self.channels = range(2)
+
+    def tearDown(self):
+        pass
+
+    def coreTest(self, num_samps, seconds, sample_rate=1000.0, max_bytes=None):
+        """
+        +---------+    +------+
+        | vsrc[0] |--->|in0   |
+        +---------+    |      |
+        +---------+    |      |
+        | vsrc[1] |--->|in1   |
+        +---------+    | ring |
+                       +------+
+        """
+        tb = gr.top_block()
+
+        data = [np.arange(num_samps) + 1j * channel for channel in self.channels]
+
+        vsrc = [blocks.vector_source_c(data[channel]) for channel in self.channels]
+        ring = ring_buffer_sink_c(len(self.channels), sample_rate, seconds, max_bytes)
+
+        for channel in self.channels:
+            tb.connect(vsrc[channel], (ring, channel))
+
+        tb.run()
+
+        return ring, data
+
+    def test_000_t(self):
+        ring, data = self.coreTest(10000, 1.0)
+
+        self.assertEqual(ring.capacity, 1000)
+        self.assertEqual(ring.written, 10000)
+
+        snapshot, rx_time = ring.snapshot()
+        for channel in self.channels:
+            self.assertComplexTuplesAlmostEqual(snapshot[channel], data[channel][-1000:])
+
+        self.assertIsNone(rx_time)
+
+    def test_001_t(self):
+        # The byte budget wins over the duration.
+        ring, data = self.coreTest(10000, 1.0, max_bytes=1600)
+
+        self.assertEqual(ring.capacity, 100)
+
+        snapshot = ring.snapshot(0.05)[0]
+        for channel in self.channels:
+            self.assertComplexTuplesAlmostEqual(snapshot[channel], data[channel][-50:])
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_ring_buffer_sink_c)
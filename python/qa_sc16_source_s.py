@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr_unittest
+
+from sc16_source_s import sc16_source_s, to_sc16
+
+import threading
+import time
+
+import numpy as np
+
+class gated_source_s(sc16_source_s):
+    """Sends ones while open."""
+
+    def __init__(self):
+        sc16_source_s.__init__(self, "gated_source_s", 2, self._produce, self._idle)
+        self.open = False
+
+    def _idle(self):
+        return not self.open
+
+    def _produce(self, output_items):
+        for out in output_items:
+            out[:] = 1
+        return len(output_items[0])
+
+class qa_sc16_source_s(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Ensure samples convert to sc16 rounded and clipped, one (I, Q)
+           pair per sample, whatever the shape.
+        2. Ensure an idle source returns nothing after a short wait, and
+           produces once woken.
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_000_t(self):
+        sc16 = to_sc16([1.4 - 2.6j, 40000 - 40000j])
+        self.assertEqual(sc16.dtype, np.int16)
+        self.assertEqual(sc16.tolist(), [[1, -3], [32767, -32768]])
+
+        self.assertEqual(to_sc16(np.zeros((4, 10))).shape, (4, 10, 2))
+
+    def test_001_t(self):
+        source = gated_source_s()
+        output_items = [np.zeros((8, 2), dtype=np.int16) for channel in xrange(2)]
+
+        start = time.time()
+        self.assertEqual(source.work(None, output_items), 0)
+        self.assertTrue(time.time() - start >= 0.005)
+        self.assertFalse(output_items[0].any())
+
+        def open_gate():
+            with source._ready:
+                source.open = True
+            source._wake()
+
+        threading.Timer(0.002, open_gate).start()
+
+        self.assertEqual(source.work(None, output_items), 8)
+        self.assertTrue(all((out == 1).all() for out in output_items))
+
+        self.assertTrue(source.stop())
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_sc16_source_s)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr_unittest
+
+from settings_cache import SettingsCache
+
+class RecordingUsrp(object):
+    """
+    Stands in for a usrp object and records every setter call.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def set_samp_rate(self, sample_rate):
+        self.calls.append(("samp_rate", sample_rate))
+
+    def set_clock_source(self, source):
+        self.calls.append(("clock_source", source))
+
+    def set_center_freq(self, center_freq, channel):
+        self.calls.append(("center_freq", center_freq, channel))
+
+    def set_gain(self, gain, channel):
+        self.calls.append(("gain", gain, channel))
+
+class qa_settings_cache(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Ensure unchanged settings are not written twice.
+        2. Ensure changed settings are written on their channel only.
+        3. Ensure a reconnect writes everything again.
+        4. Ensure per channel settings reach their channel.
+        5. Ensure forgetting one setting writes only that one again.
+    """
+
+    def setUp(self):
+        self.channels = range(4)
+
+    def tearDown(self):
+        pass
+
+    def test_000_t(self):
+        usrp = RecordingUsrp()
+        cache = SettingsCache(usrp)
+
+        cache.configure(self.channels, 20e6, 15e6, 8.0)
+        self.assertEqual(len(usrp.calls), 2 + 2 * len(self.channels))
+
+        # Nothing changed.
+        cache.configure(self.channels, 20e6, 15e6, 8.0)
+        self.assertEqual(len(usrp.calls), 2 + 2 * len(self.channels))
+        self.assertEqual(cache.skips, 2 + 2 * len(self.channels))
+
+    def test_001_t(self):
+        usrp = RecordingUsrp()
+        cache = SettingsCache(usrp)
+
+        cache.configure(self.channels, 20e6, 15e6, 8.0)
+        del usrp.calls[:]
+
+        cache.configure(self.channels, 20e6, 40e6, 8.0)
+        self.assertEqual(usrp.calls,
+            [("center_freq", 40e6, channel) for channel in self.channels])
+
+        del usrp.calls[:]
+        cache.set_gain(10.0, 1)
+        self.assertEqual(usrp.calls, [("gain", 10.0, 1)])
+
+    def test_002_t(self):
+        cache = SettingsCache(RecordingUsrp())
+        cache.configure(self.channels, 20e6, 15e6, 8.0)
+
+        # A new usrp object is a new connection.
+        usrp = RecordingUsrp()
+        cache.attach(usrp)
+        cache.configure(self.channels, 20e6, 15e6, 8.0)
+        self.assertEqual(len(usrp.calls), 2 + 2 * len(self.channels))
+
+    def test_003_t(self):
+        usrp = RecordingUsrp()
+        cache = SettingsCache(usrp)
+
+        center_freqs = [15e6, 100e6, 15e6, 433e6]
+        gains = {0: 8.0, 1: 10.0, 2: 8.0, 3: 12.0}
+
+        cache.configure(self.channels, 20e6, center_freqs, gains)
+        self.assertEqual(usrp.calls[2:], [call
+            for index in xrange(len(self.channels))
+            for call in [("center_freq", center_freqs[index], index), ("gain", gains[index], index)]])
+
+        # Only changing an LO offset still retunes.
+        del usrp.calls[:]
+        cache.configure(self.channels, 20e6, center_freqs, gains, lo_offset=[0.0, 5e6, 0.0, 0.0])
+        self.assertEqual(len(usrp.calls), 1)
+
+        key, request, index = usrp.calls[0]
+        self.assertEqual(index, 1)
+        self.assertEqual(request.target_freq, 100e6)
+        self.assertEqual(request.rf_freq, 105e6)
+
+        self.assertRaises(ValueError, cache.configure, self.channels, 20e6, 15e6, {0: 8.0})
+        self.assertRaises(ValueError, cache.configure, self.channels, 20e6, [15e6], 8.0)
+
+    def test_004_t(self):
+        usrp = RecordingUsrp()
+        cache = SettingsCache(usrp)
+
+        cache.configure(self.channels, 20e6, 15e6, 8.0)
+        del usrp.calls[:]
+
+        cache.invalidate("center_freq")
+        cache.configure(self.channels, 20e6, 15e6, 8.0)
+        self.assertEqual(usrp.calls,
+            [("center_freq", 15e6, channel) for channel in self.channels])
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_settings_cache)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr
+from gnuradio import gr_unittest
+from gnuradio import blocks
+
+from starve_source_s import starve_source_s
+
+import time
+
+class qa_starve_source_s(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Ensure zeros are sent until the source is starved.
+        2. Ensure nothing is sent while starved, and that feeding it
+           starts it again.
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_000_t(self):
+        """
+        +--------+    +----------+    +------+
+        | starve |--->| throttle |--->| vsnk |
+        +--------+    +----------+    +------+
+        """
+        tb = gr.top_block()
+
+        ssrc = starve_source_s(1)
+        throttle = blocks.throttle(4, 1e5)
+        vsnk = blocks.vector_sink_s(2)
+
+        tb.connect(ssrc, throttle, vsnk)
+        tb.start()
+
+        time.sleep(0.1)
+        ssrc.starve()
+
+        # Let what is buffered in the throttle drain.
+        time.sleep(0.3)
+
+        count = len(vsnk.data())
+        last_sample = ssrc.last_sample
+
+        self.assertTrue(count > 0)
+        self.assertEqual(set(vsnk.data()), set([0]))
+
+        time.sleep(0.1)
+        self.assertEqual(len(vsnk.data()), count)
+        self.assertEqual(ssrc.last_sample, last_sample)
+
+        ssrc.feed()
+        time.sleep(0.1)
+        self.assertTrue(len(vsnk.data()) > count)
+
+        tb.stop()
+        tb.wait()
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_starve_source_s)
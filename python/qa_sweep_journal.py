@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr_unittest
+
+from sweep_journal import SweepJournal
+from sweep_scheduler import SweepScheduler, SweepPoint
+
+import os
+import shutil
+import tempfile
+
+class qa_sweep_journal(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Run a sweep that fails part way with a journal.
+        2. Ensure the rerun only measures the points still missing and
+           returns the same results as a clean run.
+        3. Ensure an entry cut short by a crash is dropped.
+        4. Ensure a journal of a sweep with another config is discarded.
+    """
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, "sweep.jsonl")
+        self.points = [SweepPoint(centre_freq, 10.0, tx_amp)
+            for centre_freq in [15e6, 35e6, 55e6]
+            for tx_amp in [5e3, 10e3]]
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_000_t(self):
+        measured = []
+
+        def measure(device, point):
+            if point.centre_freq == 55e6 and len(measured) < 6:
+                raise RuntimeError("Device glitch")
+            measured.append(point)
+            return [point.centre_freq, point.tx_amp]
+
+        scheduler = SweepScheduler(["crimson"], measure)
+
+        journal = SweepJournal(self.path)
+        results = scheduler.run(self.points, group=lambda point: point.centre_freq, journal=journal)
+        journal.close()
+
+        self.assertEqual(len(measured), 4)
+        self.assertTrue(all(result.error is not None for result in results[4:]))
+
+        # Pretend the runs so far filled measured, so 55 MHz now works.
+        measured.extend([None, None])
+
+        journal = SweepJournal(self.path)
+        self.assertEqual(len(journal), 4)
+
+        results = scheduler.run(self.points, group=lambda point: point.centre_freq, journal=journal)
+        journal.finish()
+
+        self.assertEqual(len(measured), 8)
+        self.assertEqual([result.value for result in results],
+            [[point.centre_freq, point.tx_amp] for point in self.points])
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_001_t(self):
+        journal = SweepJournal(self.path)
+        SweepScheduler(["crimson"], lambda device, point: 1.0).run(self.points[:2], journal=journal)
+        journal.close()
+
+        with open(self.path, "a") as out:
+            out.write('{"point": [55000000.0, 10.0, 5')
+
+        journal = SweepJournal(self.path)
+        self.assertEqual(len(journal), 2)
+        self.assertEqual(journal.get(self.points[1]).value, 1.0)
+        self.assertIsNone(journal.get(self.points[2]))
+
+        # The next entry starts on a line of its own.
+        SweepScheduler(["crimson"], lambda device, point: 2.0).run(self.points[:3], journal=journal)
+        journal.close()
+
+        self.assertEqual(len(SweepJournal(self.path)), 3)
+
+    def test_002_t(self):
+        config = {"devices": ["crimson"], "freqs": [15e6, 55e6, 20e6], "rx_gain": [10.0]}
+
+        journal = SweepJournal(self.path, config)
+        SweepScheduler(["crimson"], lambda device, point: 1.0).run(self.points[:2], journal=journal)
+        journal.close()
+
+        journal = SweepJournal(self.path, dict(reversed(config.items())))
+        self.assertEqual(len(journal), 2)
+        journal.close()
+
+        journal = SweepJournal(self.path, dict(config, rx_gain=[30.0]))
+        self.assertEqual(len(journal), 0)
+        journal.close()
+
+        # Discarded for good, not only skipped: only the new header is left.
+        with open(self.path) as lines:
+            self.assertEqual(len(lines.readlines()), 1)
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_sweep_journal)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr_unittest
+
+from sweep_scheduler import SweepScheduler, SweepPoint, crimson_devices
+
+import os
+import time
+
+class qa_sweep_scheduler(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Measure a sweep on several stand-in devices.
+        2. Ensure the results come back in point order, with their device,
+           and that the devices worked at the same time.
+        3. Ensure a group stays on one device and failures are reported.
+    """
+
+    def setUp(self):
+        self.devices = ["addr=192.168.10.2", "addr=192.168.11.2", "addr=192.168.12.2"]
+        self.points = [SweepPoint(centre_freq, 10.0, tx_amp)
+            for centre_freq in [15e6, 35e6, 55e6, 75e6]
+            for tx_amp in [5e3, 10e3, 15e3]]
+        self.delay = 0.02
+
+    def tearDown(self):
+        pass
+
+    def measure(self, device, point):
+        time.sleep(self.delay)
+        return point.centre_freq * point.tx_amp
+
+    def test_000_t(self):
+        scheduler = SweepScheduler(self.devices, self.measure)
+
+        start = time.time()
+        results = scheduler.run(self.points)
+        elapsed = time.time() - start
+
+        self.assertEqual([result.point for result in results], self.points)
+        self.assertEqual([result.value for result in results],
+            [point.centre_freq * point.tx_amp for point in self.points])
+
+        for result in results:
+            self.assertTrue(result.device in self.devices)
+            self.assertIsNone(result.error)
+
+        self.assertLess(elapsed, len(self.points) * self.delay * 2.0 / len(self.devices))
+
+    def test_001_t(self):
+        def measure(device, point):
+            if point.centre_freq == 55e6:
+                raise RuntimeError("No capture")
+            return device
+
+        results = SweepScheduler(self.devices, measure).run(self.points,
+            group=lambda point: point.centre_freq)
+
+        for centre_freq in [15e6, 35e6, 55e6, 75e6]:
+            group = [result for result in results if result.point.centre_freq == centre_freq]
+            self.assertEqual(len(set(result.device for result in group)), 1)
+
+        for result in results:
+            if result.point.centre_freq == 55e6:
+                self.assertIsNone(result.value)
+                self.assertTrue(isinstance(result.error, RuntimeError))
+            else:
+                self.assertEqual(result.value, result.device)
+
+    def test_002_t(self):
+        saved = os.environ.pop("CRIMSON_DEVICES", None)
+
+        try:
+            self.assertEqual(crimson_devices(), ["crimson"])
+
+            os.environ["CRIMSON_DEVICES"] = "; ".join(self.devices)
+            self.assertEqual(crimson_devices(), self.devices)
+        finally:
+            os.environ.pop("CRIMSON_DEVICES", None)
+            if saved is not None:
+                os.environ["CRIMSON_DEVICES"] = saved
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_sweep_scheduler)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr_unittest
+
+from throughput_bench import bench_matrix, max_rate_table, cpu_load, thread_cpu_times, write_json
+
+import json
+import os
+import shutil
+import tempfile
+
+def result(num_channels, otw_format, sample_rate, clean):
+    return {"num_channels": num_channels, "otw_format": otw_format,
+        "sample_rate": sample_rate, "clean": clean}
+
+class qa_throughput_bench(gr_unittest.TestCase):
+    """
+    Automatic Testing Procedure:
+        1. Ensure the matrix holds every configuration.
+        2. Ensure the max rate table holds the highest clean rate of each.
+        3. Ensure the JSON report reads back whole.
+    """
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_000_t(self):
+        points = bench_matrix([1, 4], ["sc16", "sc8"], [20e6, 60e6])
+
+        self.assertEqual(len(points), 8)
+        self.assertEqual(points[1], (1, "sc16", 60e6))
+        self.assertEqual(points[-1], (4, "sc8", 60e6))
+
+    def test_001_t(self):
+        results = [
+            result(1, "sc16", 20e6, True),
+            result(1, "sc16", 60e6, True),
+            result(1, "sc16", 100e6, False),
+            result(4, "sc16", 20e6, False)]
+
+        self.assertEqual(max_rate_table(results), [
+            {"num_channels": 1, "otw_format": "sc16", "max_rate": 60e6},
+            {"num_channels": 4, "otw_format": "sc16", "max_rate": None}])
+
+    def test_002_t(self):
+        self.assertEqual(cpu_load({"a/1": 1.0}, {"a/1": 3.0, "b/2": 0.5, "c/3": 0.0}, 4.0),
+            {"a/1": 0.5, "b/2": 0.125})
+
+        # Whatever the platform, this thread is there if any are.
+        times = thread_cpu_times()
+        if times:
+            self.assertTrue(any(thread.endswith("/{}".format(os.getpid())) for thread in times))
+
+        path = os.path.join(self.root, "bench.json")
+        write_json(path, [result(2, "sc16", 20e6, True)], "mboard_id=crimson")
+
+        with open(path) as f:
+            report = json.load(f)
+
+        self.assertEqual(report["device"], "mboard_id=crimson")
+        self.assertEqual(report["max_rates"][0]["max_rate"], 20e6)
+        self.assertTrue(report["host"]["cpus"] >= 1)
+        self.assertEqual(os.listdir(self.root), ["bench.json"])
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_throughput_bench)
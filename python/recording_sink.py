@@ -0,0 +1,345 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr
+
+import ctypes
+import ctypes.util
+import io
+import os
+import json
+import mmap
+import time
+import datetime
+import threading
+import Queue
+
+import numpy as np
+import pmt
+
+def _libc_fallocate():
+    # Python 2 has no os.posix_fallocate, so call the C library's.
+    name = ctypes.util.find_library("c")
+    if name is None:
+        return None
+
+    libc = ctypes.CDLL(name, use_errno=True)
+
+    for symbol in ["posix_fallocate64", "posix_fallocate"]:
+        function = getattr(libc, symbol, None)
+        if function is not None:
+            function.argtypes = [ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+            function.restype = ctypes.c_int
+            return function
+
+    return None
+
+_posix_fallocate = _libc_fallocate()
+
+def fallocate(fd, length):
+    """
+    Reserves length bytes on disk for the file fd. Returns False where the
+    platform or file system cannot.
+    """
+
+    if _posix_fallocate is None:
+        return False
+
+    # Returns the error number rather than setting errno.
+    return _posix_fallocate(fd, 0, length) == 0
+
+# SigMF datatypes and the numpy layout of one sample of one channel.
+DATATYPES = {
+    "cf32_le": (np.complex64, ()),
+    "ci16_le": (np.int16, (2,)),
+}
+
+class recording_sink(gr.sync_block):
+    """
+    Records every channel of a Crimson stream to disk with SigMF metadata.
+
+    +------+
+    |      |    +----------------+      +--------+
+    |   ch0|--->|in0             |      |        |    name_0000.sigmf-data
+    |   ...|    |  recording_sink|=====>| writer |--> name_0000.sigmf-meta
+    |   chn|--->|inn             |      | thread |    name_0001.sigmf-data
+    | csrc |    +----------------+      +--------+    ...
+    +------+
+
+    Samples are interleaved by channel into large page aligned blocks taken
+    from a fixed pool. Full blocks are handed to a writer thread, which is
+    the only place that touches the disk. Files are preallocated where the
+    platform allows and rotated when they reach max_bytes or max_seconds.
+
+    The block never waits for the disk. If the writer falls so far behind
+    that the pool runs dry, incoming samples are dropped and the drop is
+    recorded in the metadata as an annotation and a new capture segment.
+
+    Use datatype "cf32_le" after crimson_source_c and "ci16_le" for streams
+    of interleaved shorts.
+    """
+
+    def __init__(self, num_channels, path, sample_rate, center_freq, gain,
+            datatype="cf32_le", max_bytes=1 << 30, max_seconds=None,
+            block_bytes=4 << 20, num_blocks=64):
+
+        dtype, shape = DATATYPES[datatype]
+
+        gr.sync_block.__init__(self,
+            name="recording_sink",
+            in_sig=[(dtype, shape[0]) if shape else dtype] * num_channels,
+            out_sig=None)
+
+        self._num_channels = num_channels
+        self._path = path
+        self._sample_rate = float(sample_rate)
+        self._center_freq = center_freq
+        self._gain = gain
+        self._datatype = datatype
+        self._max_bytes = max_bytes
+        self._max_seconds = max_seconds
+
+        # Whole pages per block so every write but the last of a file is
+        # page aligned.
+        item_bytes = np.dtype(dtype).itemsize * int(np.prod(shape)) * num_channels
+        page = mmap.PAGESIZE
+        block_bytes = max(page, block_bytes // page * page)
+        self._block_items = block_bytes // item_bytes
+
+        self._free = Queue.Queue()
+        self._full = Queue.Queue()
+
+        for index in xrange(num_blocks):
+            self._free.put(np.empty((self._block_items, num_channels) + shape, dtype=dtype))
+
+        self._block = None
+        self._fill = 0
+
+        # [kept, seen, count] of the samples being dropped, if any.
+        self._gap = None
+
+        # Samples seen on the stream and samples kept in the recording.
+        self._seen = 0
+        self._kept = 0
+        self.dropped = 0
+
+        # (absolute offset, seconds) of the last rx_time tag.
+        self._time_tag = None
+
+        self._writer = None
+        self._resumed = False
+        self._file = None
+        self._file_index = 0
+        self._files = []
+
+    @property
+    def files(self):
+        """Paths of the data files written so far"""
+        return list(self._files)
+
+    def start(self):
+        self._writer = threading.Thread(target=self._write_loop, name="recording_sink")
+        self._writer.daemon = True
+        self._writer.start()
+        return True
+
+    def stop(self):
+        # Never started, so nothing to write.
+        if self._writer is None:
+            return True
+
+        if self._block is not None and self._fill > 0:
+            self._queue_block()
+
+        self._queue_gap()
+
+        self._full.put(None)
+        self._writer.join()
+        return True
+
+    def work(self, input_items, output_items):
+        count = len(input_items[0])
+
+        tags = self.get_tags_in_window(0, 0, count, pmt.intern("rx_time"))
+        if tags:
+            tag = tags[-1]
+            secs = pmt.to_uint64(pmt.tuple_ref(tag.value, 0)) + pmt.to_double(pmt.tuple_ref(tag.value, 1))
+            self._time_tag = (tag.offset, secs)
+
+        done = 0
+        while done < count:
+            if self._block is None:
+                try:
+                    self._block = self._free.get_nowait()
+                except Queue.Empty:
+                    # Disk is behind. Drop rather than stall the radio.
+                    if self._gap is None:
+                        self._gap = [self._kept, self._seen + done, 0]
+
+                    self._gap[2] += count - done
+                    self.dropped += count - done
+                    break
+
+                self._queue_gap()
+                self._fill = 0
+                self._block_start = (self._kept, self._seen + done, time.time())
+
+            chunk = min(count - done, self._block_items - self._fill)
+
+            for channel, samples in enumerate(input_items):
+                self._block[self._fill:self._fill + chunk, channel] = samples[done:done + chunk]
+
+            self._fill += chunk
+            self._kept += chunk
+            done += chunk
+
+            if self._fill == self._block_items:
+                self._queue_block()
+
+        self._seen += count
+        return count
+
+    def _queue_gap(self):
+        if self._gap is not None:
+            self._full.put(("gap",) + tuple(self._gap))
+            self._gap = None
+
+    def _queue_block(self):
+        self._full.put(("data", self._block, self._fill, self._block_start))
+        self._block = None
+
+    def _rx_time(self, offset):
+        if self._time_tag is None:
+            return None
+
+        tag_offset, secs = self._time_tag
+        return secs + (offset - tag_offset) / self._sample_rate
+
+    def _write_loop(self):
+        while True:
+            item = self._full.get()
+
+            if item is None:
+                break
+
+            if item[0] == "gap":
+                self._record_gap(*item[1:])
+                continue
+
+            block, fill, (kept, seen, host_time) = item[1:]
+
+            try:
+                if self._file is None or self._needs_rotation(block[:fill].nbytes):
+                    self._rotate(kept, seen, host_time)
+                elif self._resumed:
+                    # First block after a gap starts a new capture segment.
+                    self._add_capture(kept - self._file_kept, seen, host_time)
+
+                self._resumed = False
+
+                self._file.write(block[:fill].data)
+                self._file_items += fill
+            finally:
+                self._free.put(block)
+
+        self._close()
+
+    def _needs_rotation(self, nbytes):
+        if self._file_items == 0:
+            return False
+
+        if self._file.tell() + nbytes > self._max_bytes:
+            return True
+
+        if self._max_seconds is not None:
+            return self._file_items >= self._max_seconds * self._sample_rate
+
+        return False
+
+    def _rotate(self, kept, seen, host_time):
+        self._close()
+
+        base = "%s_%04d" % (self._path, self._file_index)
+        self._file_index += 1
+
+        self._file = io.open(base + ".sigmf-data", "wb", buffering=0)
+        self._files.append(base + ".sigmf-data")
+
+        # Reserve the space up front so the file does not fragment.
+        fallocate(self._file.fileno(), self._max_bytes)
+
+        self._file_base = base
+        self._file_items = 0
+        self._file_kept = kept
+        self._meta = {
+            "global": {
+                "core:datatype": self._datatype,
+                "core:sample_rate": self._sample_rate,
+                "core:num_channels": self._num_channels,
+                "core:version": "0.0.2",
+                "core:recorder": "gr-pv recording_sink",
+            },
+            "captures": [],
+            "annotations": [],
+        }
+        self._add_capture(0, seen, host_time)
+        self._write_meta()
+
+    def _add_capture(self, sample_start, seen, host_time):
+        capture = {
+            "core:sample_start": sample_start,
+            "core:global_index": seen,
+            "core:frequency": self._center_freq,
+            "core:datetime": datetime.datetime.utcfromtimestamp(host_time).isoformat() + "Z",
+            "pv:gain": self._gain,
+        }
+
+        rx_time = self._rx_time(seen)
+        if rx_time is not None:
+            capture["pv:rx_time"] = rx_time
+
+        self._meta["captures"].append(capture)
+
+    def _record_gap(self, kept, seen, count):
+        self._resumed = True
+
+        if self._file is None:
+            return
+
+        self._meta["annotations"].append({
+            "core:sample_start": kept - self._file_kept,
+            "core:comment": "%d samples dropped" % count,
+            "pv:global_index": seen,
+        })
+
+    def _write_meta(self):
+        with open(self._file_base + ".sigmf-meta", "w") as meta:
+            json.dump(self._meta, meta, indent=4, sort_keys=True)
+
+    def _close(self):
+        if self._file is None:
+            return
+
+        # Give back the preallocated space that was not used.
+        self._file.truncate(self._file.tell())
+        self._file.close()
+        self._file = None
+        self._write_meta()
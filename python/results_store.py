@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from collections import namedtuple
+
+import os
+import sqlite3
+import threading
+import time
+
+# One typed result of a QA run. channel is None for results of a whole
+# capture.
+ResultRow = namedtuple("ResultRow",
+    ["run", "test", "freq", "gain", "amp", "channel", "metric", "value", "timestamp"])
+
+class ResultsStore(object):
+    """
+    Typed results of QA runs in an SQLite database, for analysis without
+    parsing test_results.log.
+
+    Every result is a row of the results table holding the run it came
+    from, the test, the centre frequency, gain and amplitude, the channel,
+    the metric name and its value, and when it was recorded. Rows are
+    buffered and written batch_size at a time in one transaction, or on
+    flush(). The database runs in WAL mode, so it can be read while a
+    test writes to it, and is indexed on frequency for range queries.
+
+    run names this run of the tests, the start time by default.
+
+    Usage:
+        store = ResultsStore("results.db")
+        store.record("test_003_t", 15e6, 8.0, 3.0e4, 0, "phase_diff", 0.01)
+        rows = store.query(10e6, 100e6, metric="phase_diff")
+    """
+
+    def __init__(self, path, batch_size=1000, run=None):
+        self.path = path
+        self.batch_size = batch_size
+        self.run = run or time.strftime("%Y-%m-%dT%H:%M:%S")
+
+        self._lock = threading.Lock()
+        self._pending = []
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+
+        with self._db:
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    run TEXT, test TEXT, freq REAL, gain REAL, amp REAL,
+                    channel INTEGER, metric TEXT, value REAL, timestamp REAL)""")
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_freq ON results (freq)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_metric ON results (test, metric, freq)")
+
+    def record(self, test, freq, gain, amp, channel, metric, value):
+        row = ResultRow(self.run, test, float(freq), float(gain), float(amp),
+            None if channel is None else int(channel), metric, float(value), time.time())
+
+        with self._lock:
+            self._pending.append(row)
+            full = len(self._pending) >= self.batch_size
+
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered rows."""
+
+        with self._lock:
+            rows, self._pending = self._pending, []
+
+            if rows:
+                with self._db:
+                    self._db.executemany(
+                        "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def query(self, freq_min=None, freq_max=None, test=None, metric=None, channel=None, run=None):
+        """
+        The rows with freq_min <= freq <= freq_max matching every other
+        argument given, by frequency then time.
+        """
+
+        self.flush()
+
+        where, args = [], []
+
+        for column, op, value in [("freq", ">=", freq_min), ("freq", "<=", freq_max),
+                ("test", "=", test), ("metric", "=", metric),
+                ("channel", "=", channel), ("run", "=", run)]:
+            if value is not None:
+                where.append("{} {} ?".format(column, op))
+                args.append(value)
+
+        sql = "SELECT * FROM results"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY freq, timestamp"
+
+        with self._lock:
+            return [ResultRow(*row) for row in self._db.execute(sql, args)]
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+def results_store_from_env():
+    """
+    The store in the CRIMSON_RESULTS_DB file, or None if results are not
+    kept.
+    """
+
+    path = os.environ.get("CRIMSON_RESULTS_DB")
+    if not path:
+        return None
+
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    return ResultsStore(path)
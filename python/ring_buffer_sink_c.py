@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr
+
+import numpy as np
+import pmt
+
+class ring_buffer_sink_c(gr.sync_block):
+    """
+    Keeps the most recent samples of every channel in a fixed amount of
+    memory. Unlike blocks.vector_sink_c it never grows, so a
+    crimson_source_c can stream into it indefinitely.
+
+    +------+
+    |      |    +-------------------+
+    |   ch0|--->|in0                |
+    |   ...|    |   ring_buffer_sink|---> snapshot()
+    |   chn|--->|inn                |
+    | csrc |    +-------------------+
+    +------+
+
+    The ring holds seconds of samples per channel, or fewer if max_bytes
+    (across all channels) is smaller. snapshot() can be called from any
+    thread while the flowgraph runs and takes no lock. Every write is
+    bracketed by a sequence counter, and after copying the ring the reader
+    drops the oldest samples the writer may have overwritten meanwhile, so
+    the result is always consistent.
+    """
+
+    def __init__(self, num_channels, sample_rate, seconds=1.0, max_bytes=None):
+        gr.sync_block.__init__(self,
+            name="ring_buffer_sink_c",
+            in_sig=[np.complex64] * num_channels,
+            out_sig=None)
+
+        capacity = int(seconds * sample_rate)
+
+        if max_bytes is not None:
+            itemsize = np.dtype(np.complex64).itemsize
+            capacity = min(capacity, max_bytes // (itemsize * num_channels))
+
+        if capacity <= 0:
+            raise ValueError("Ring buffer must hold at least one sample")
+
+        self._sample_rate = float(sample_rate)
+        self._ring = np.zeros((num_channels, capacity), dtype=np.complex64)
+
+        # Samples written since the start. Odd _seq means a write is in
+        # progress, of at most _max_chunk samples.
+        self._written = 0
+        self._seq = 0
+        self._max_chunk = 0
+
+        # (absolute offset, seconds) of the last rx_time tag.
+        self._time_tag = None
+
+    @property
+    def capacity(self):
+        """Samples held per channel"""
+        return self._ring.shape[1]
+
+    @property
+    def written(self):
+        """Samples received per channel since the start"""
+        return self._written
+
+    def work(self, input_items, output_items):
+        count = len(input_items[0])
+        capacity = self.capacity
+
+        # Only the newest capacity samples of a large call survive.
+        skip = max(count - capacity, 0)
+        start = (self._written + skip) % capacity
+        first = min(count - skip, capacity - start)
+
+        self._max_chunk = max(self._max_chunk, count)
+        self._seq += 1
+
+        for channel, samples in enumerate(input_items):
+            self._ring[channel, start:start + first] = samples[skip:skip + first]
+            self._ring[channel, :count - skip - first] = samples[skip + first:]
+
+        self._written += count
+        self._seq += 1
+
+        tags = self.get_tags_in_window(0, 0, count, pmt.intern("rx_time"))
+        if tags:
+            tag = tags[-1]
+            secs = pmt.to_uint64(pmt.tuple_ref(tag.value, 0)) + pmt.to_double(pmt.tuple_ref(tag.value, 1))
+            self._time_tag = (tag.offset, secs)
+
+        return count
+
+    def snapshot(self, seconds=None, out=None):
+        """
+        Copies the newest samples of every channel, up to seconds worth or
+        the whole ring, into out (allocated if None). Returns a
+        (channels x samples) view of out and the rx_time of its first
+        sample, or None if the stream was never tagged.
+        """
+
+        capacity = self.capacity
+        requested = capacity
+
+        if seconds is not None:
+            requested = min(requested, int(seconds * self._sample_rate))
+
+        if out is None:
+            out = np.empty((self._ring.shape[0], requested), dtype=np.complex64)
+
+        seq = self._seq
+        written = self._written
+        count = min(requested, written, out.shape[1])
+        start = written - count
+
+        begin = start % capacity
+        first = min(count, capacity - begin)
+
+        out[:, :first] = self._ring[:, begin:begin + first]
+        out[:, first:count] = self._ring[:, :count - first]
+
+        # Drop whatever the writer may have overwritten while copying.
+        if self._seq != seq or seq & 1:
+            end = self._written
+            if self._seq & 1:
+                end += self._max_chunk
+
+            stale = min(max(end - capacity - start, 0), count)
+            start += stale
+            out = out[:, stale:count]
+        else:
+            out = out[:, :count]
+
+        rx_time = None
+        if self._time_tag is not None:
+            offset, secs = self._time_tag
+            rx_time = secs + (start - offset) / self._sample_rate
+
+        return out, rx_time
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr
+
+import threading
+
+import numpy as np
+
+def to_sc16(waveform):
+    """
+    Converts complex samples in short units to sc16, an int16 array with
+    a last axis of (I, Q), rounding and clipping to the int16 range.
+    """
+
+    waveform = np.asarray(waveform, dtype=np.complex64)
+
+    sc16 = np.empty(waveform.shape + (2,), dtype=np.int16)
+    sc16[..., 0] = np.clip(np.rint(waveform.real), -32768, 32767)
+    sc16[..., 1] = np.clip(np.rint(waveform.imag), -32768, 32767)
+    return sc16
+
+class sc16_source_s(gr.sync_block):
+    """
+    Base of the Python sources that feed a crimson_sink_s sc16 samples,
+    one (np.int16, 2) output per channel.
+
+    Subclasses pass produce(output_items), which fills the outputs and
+    returns how many items it wrote, and optionally idle(), true while
+    there is nothing to send. While idle, work() waits on _ready for up
+    to 10 ms instead of spinning and returns 0 if still idle. Whatever
+    ends the idle state calls _wake(), holding _ready or not. idle() is
+    called holding _ready, which also guards the state of subclasses.
+    """
+
+    def __init__(self, name, num_channels, produce, idle=None):
+        gr.sync_block.__init__(self,
+            name=name,
+            in_sig=None,
+            out_sig=[(np.int16, 2)] * num_channels)
+
+        self._num_channels = num_channels
+        self._ready = threading.Condition()
+
+        self._producer = produce
+        self._idle_check = idle if idle is not None else lambda: False
+
+    def _wake(self):
+        with self._ready:
+            self._ready.notify()
+
+    def stop(self):
+        self._wake()
+        return True
+
+    def work(self, input_items, output_items):
+        with self._ready:
+            if self._idle_check():
+                # Wait a little so an idle source does not spin.
+                self._ready.wait(0.01)
+                if self._idle_check():
+                    return 0
+
+        return self._producer(output_items)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import uhd
+
+import threading
+
+def per_channel(value, channels, name="value"):
+    """
+    Expands a setting into one value per stream index. The setting is
+    either one value for every channel, a sequence with a value per
+    channel in stream order, or a dict keyed on channel number.
+    """
+
+    if isinstance(value, dict):
+        for channel in channels:
+            if channel not in value:
+                raise ValueError("No {} for channel {}".format(name, channel))
+
+        return [value[channel] for channel in channels]
+
+    if hasattr(value, "__iter__"):
+        value = list(value)
+
+        if len(value) != len(channels):
+            raise ValueError("One {} per channel needed".format(name))
+
+        return value
+
+    return [value] * len(channels)
+
+class SettingsCache(object):
+    """
+    Remembers the last value written to a Crimson for each setting and
+    channel and only issues a device write when the value changes.
+
+    The cache is bound to one usrp object. Attaching a different object
+    means a new connection to the device, so everything is forgotten and
+    the next write of every setting goes through.
+
+    Settings can be applied from several threads at once, as
+    crimson_bring_up does.
+
+    Usage:
+        cache = SettingsCache()
+        csrc = crimson_source_c(channels, sample_rate, centre_freq, gain, cache)
+        ...
+        cache.configure(channels, sample_rate, new_freq, gain) # Only the frequencies are written.
+    """
+
+    def __init__(self, usrp=None):
+        self._usrp = None
+        self._values = {}
+        self._lock = threading.Lock()
+
+        # Writes issued to the device and writes skipped by the cache.
+        self.writes = 0
+        self.skips = 0
+
+        if usrp is not None:
+            self.attach(usrp)
+
+    @property
+    def usrp(self):
+        """Bound usrp object"""
+        return self._usrp
+
+    def attach(self, usrp):
+        """
+        Binds the cache to a usrp object. A different object than the one
+        already bound is a reconnect and invalidates the cache.
+        """
+
+        if usrp is not self._usrp:
+            self.invalidate()
+            self._usrp = usrp
+
+    def invalidate(self, key=None):
+        """
+        Forgets the applied values of one setting on every channel, or of
+        all settings, so their next write goes through to the device.
+        """
+
+        with self._lock:
+            if key is None:
+                self._values = {}
+            else:
+                for applied in [applied for applied in self._values if applied[0] == key]:
+                    del self._values[applied]
+
+    def get(self, key, channel=None):
+        """
+        Returns the last applied value of a setting, or None.
+        """
+
+        return self._values.get((key, channel))
+
+    def apply(self, key, value, setter, channel=None):
+        """
+        Calls setter() if value differs from the last value applied for key
+        on channel. Returns True if the device was written.
+        """
+
+        entry = (key, channel)
+
+        with self._lock:
+            if entry in self._values and self._values[entry] == value:
+                self.skips += 1
+                return False
+
+        setter()
+
+        # Only remember the value once the write succeeded.
+        with self._lock:
+            self._values[entry] = value
+            self.writes += 1
+        return True
+
+    def set_samp_rate(self, sample_rate):
+        return self.apply("samp_rate", sample_rate,
+            lambda: self._usrp.set_samp_rate(sample_rate))
+
+    def set_clock_source(self, source):
+        return self.apply("clock_source", source,
+            lambda: self._usrp.set_clock_source(source))
+
+    def set_center_freq(self, center_freq, channel, lo_offset=0.0):
+        """
+        Tunes a channel. A non-zero lo_offset puts the LO that far from
+        center_freq and the DSP makes up the difference, which keeps the
+        LO leakage out of the middle of the band.
+        """
+
+        if not lo_offset:
+            return self.apply("center_freq", center_freq,
+                lambda: self._usrp.set_center_freq(center_freq, channel), channel)
+
+        return self.apply("center_freq", (center_freq, lo_offset),
+            lambda: self._usrp.set_center_freq(uhd.tune_request(center_freq, lo_offset), channel),
+            channel)
+
+    def set_gain(self, gain, channel):
+        return self.apply("gain", gain,
+            lambda: self._usrp.set_gain(gain, channel), channel)
+
+    def configure(self, channels, sample_rate, center_freq, gain,
+            clock_source="internal", lo_offset=0.0):
+        """
+        Applies the settings the Crimson factories make to the bound usrp
+        object. Only settings that changed since the last call are written.
+        gr-uhd addresses channels by their index in the stream, so that is
+        what the per channel settings are keyed on.
+
+        center_freq, gain and lo_offset are each one value for all
+        channels, a sequence in stream order or a dict keyed on channel
+        number, see per_channel().
+        """
+
+        center_freqs = per_channel(center_freq, channels, "center frequency")
+        gains = per_channel(gain, channels, "gain")
+        lo_offsets = per_channel(lo_offset, channels, "LO offset")
+
+        self.set_samp_rate(sample_rate)
+        self.set_clock_source(clock_source)
+
+        for index in xrange(len(channels)):
+            self.set_center_freq(center_freqs[index], index, lo_offsets[index])
+            self.set_gain(gains[index], index)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from sc16_source_s import sc16_source_s
+
+import time
+
+class starve_source_s(sc16_source_s):
+    """
+    Feeds a crimson_sink_s zeros until starve() is called, then nothing,
+    so the TX stream runs dry mid-burst and the crimson underflows.
+
+    +--------+    +------+
+    |    out0|--->|ch0   |
+    | starve |... |...   |
+    |    outn|--->|chn   |
+    +--------+    | csnk |
+                  +------+
+
+    last_sample is the host time the last samples left work(), from
+    which the time to detect the underflow is measured. feed() starts
+    the samples again.
+    """
+
+    def __init__(self, num_channels):
+        sc16_source_s.__init__(self, "starve_source_s", num_channels, self._produce, self._idle)
+
+        self.last_sample = None
+
+        self._starved = False
+
+    def starve(self):
+        """Stops producing samples once the current work call returns."""
+        with self._ready:
+            self._starved = True
+
+    def feed(self):
+        with self._ready:
+            self._starved = False
+            self._ready.notify()
+
+    def _idle(self):
+        return self._starved
+
+    def _produce(self, output_items):
+        for out in output_items:
+            out[:] = 0
+
+        self.last_sample = time.time()
+        return len(output_items[0])
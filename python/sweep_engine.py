@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr
+from gnuradio import blocks
+from gnuradio import analog
+from gnuradio import uhd
+
+from crimson_source_c import crimson_source_c
+from crimson_sink_s import crimson_sink_s
+from settings_cache import SettingsCache
+from harness import wait_for_samples
+
+from collections import namedtuple
+
+import time
+import numpy as np
+
+# One sweep step. data is a (channels x num_samps) complex64 array.
+SweepSegment = namedtuple("SweepSegment", ["rx_freq", "rx_time", "data"])
+
+class SweepEngine(object):
+    """
+    Runs frequency sweeps over one flowgraph that keeps streaming.
+
+    |<------------ TX CHAIN ---------->| |<----- RX CHAIN ---->|
+                                +------+ +------+
+    +--------+    +--------+    |      | |      |    +---------+
+    | sig[n] |--->| c2s[n] |--->|chn   | |   chn|--->| vsnk[n] |
+    +--------+    +--------+    | csnk | | csrc |    +---------+
+                                +------+ +------+
+
+    The TX chain transmits continuously. Each sweep step retunes TX and RX
+    with timed commands at the start of its dwell and captures num_samps
+    with a timed NUM_SAMPS_AND_DONE stream command once the LOs settled.
+    The bursts land back to back in the vector sinks and are split into
+    one SweepSegment per step.
+
+    gr-uhd tags rx_freq on the next work call after a retune rather than at
+    the command time, so segments are labelled with rx_freq and rx_time
+    from the schedule, which is exact.
+    """
+
+    def __init__(self, channels, sample_rate, rx_gain, tx_amp,
+            wave_freq=1e6, num_samps=64, dwell=0.05, settle=0.02, lead=0.5):
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.rx_gain = rx_gain
+        self.num_samps = num_samps
+
+        # In seconds. Each step lasts dwell, the capture starts settle into
+        # it and commands for a step are issued lead ahead of it.
+        self.dwell = dwell
+        self.settle = settle
+        self.lead = lead
+
+        if settle + float(num_samps) / sample_rate > dwell:
+            raise ValueError("Capture does not fit in the dwell time")
+
+        self._rx_cache = SettingsCache()
+        self._tx_cache = SettingsCache()
+        self._running = False
+
+        self.tb = gr.top_block()
+
+        # Blocks and Connections (TX CHAIN).
+        self.sigs = [
+            analog.sig_source_c(sample_rate, analog.GR_SIN_WAVE, wave_freq, tx_amp, 0.0)
+            for channel in channels]
+
+        c2ss = [
+            blocks.complex_to_interleaved_short(True)
+            for channel in channels]
+
+        # Tuned on the first step.
+        self.csnk = crimson_sink_s(channels, sample_rate, 0.0, 0.0, self._tx_cache)
+
+        for index, channel in enumerate(channels):
+            self.tb.connect(self.sigs[index], c2ss[index])
+            self.tb.connect(c2ss[index], (self.csnk, index))
+
+        # Blocks and Connections (RX CHAIN).
+        self.csrc = crimson_source_c(channels, sample_rate, 0.0, rx_gain, self._rx_cache)
+
+        self.vsnk = [blocks.vector_sink_c() for channel in channels]
+
+        for index, channel in enumerate(channels):
+            self.tb.connect((self.csrc, index), self.vsnk[index])
+
+        # Reset TX and RX times to be roughly in sync.
+        self.csnk.set_time_now(uhd.time_spec_t(0.0))
+        self.csrc.set_time_now(uhd.time_spec_t(0.0))
+
+    def start(self):
+        """
+        Starts streaming. Called by run() when needed.
+        """
+
+        if not self._running:
+            self.tb.start()
+            self._running = True
+
+    def stop(self):
+        """
+        Stops streaming and tears the flowgraph down.
+        """
+
+        if self._running:
+            self.tb.stop()
+            self.tb.wait()
+            self._running = False
+
+    def now(self):
+        """Device time in seconds"""
+        return self.csrc.get_time_now().get_real_secs()
+
+    def _wait_until(self, when):
+        while True:
+            remaining = when - self.now()
+            if remaining <= 0.0:
+                return
+            time.sleep(min(remaining, 0.1))
+
+    def _retune(self, usrp, cache, when, centre_freq, gain):
+        usrp.set_command_time(uhd.time_spec_t(when))
+        try:
+            cache.configure(self.channels, self.sample_rate, centre_freq, gain)
+        finally:
+            usrp.clear_command_time()
+
+    def run(self, freqs, tx_gain=0.0):
+        """
+        Sweeps over freqs and returns one SweepSegment per frequency.
+        """
+
+        freqs = list(freqs)
+
+        for vsnk in self.vsnk:
+            vsnk.reset()
+
+        self.start()
+
+        # The sinks count on from earlier sweeps.
+        start = [vsnk.nitems_read(0) for vsnk in self.vsnk]
+
+        t0 = self.now() + self.lead
+
+        for step, centre_freq in enumerate(freqs):
+            when = t0 + step * self.dwell
+
+            # Pace the commands so the device command queues stay short.
+            self._wait_until(when - self.lead)
+
+            self._retune(self.csnk, self._tx_cache, when, centre_freq, tx_gain)
+            self._retune(self.csrc, self._rx_cache, when, centre_freq, self.rx_gain)
+
+            sc = uhd.stream_cmd_t(uhd.stream_cmd_t.STREAM_MODE_NUM_SAMPS_AND_DONE)
+            sc.num_samps = self.num_samps
+            sc.stream_now = False
+            sc.time_spec = uhd.time_spec_t(when + self.settle)
+            self.csrc.issue_stream_cmd(sc)
+
+        # Done once every burst is in, or a lead past the last one.
+        wait_for_samples(self.vsnk, len(freqs) * self.num_samps,
+            t0 + len(freqs) * self.dwell + self.lead - self.now(), start=start)
+
+        return self._split(freqs, t0)
+
+    def _split(self, freqs, t0):
+        expected = len(freqs) * self.num_samps
+
+        data = np.empty((len(self.channels), expected), dtype=np.complex64)
+
+        for index, vsnk in enumerate(self.vsnk):
+            samples = vsnk.data()
+
+            if len(samples) != expected:
+                raise RuntimeError("Channel {} captured {} of {} samples".format(
+                    self.channels[index], len(samples), expected))
+
+            data[index] = samples
+
+        segments = []
+        for step, centre_freq in enumerate(freqs):
+            first = step * self.num_samps
+            segments.append(SweepSegment(
+                rx_freq=centre_freq,
+                rx_time=t0 + step * self.dwell + self.settle,
+                data=data[:, first:first + self.num_samps]))
+
+        return segments
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from sweep_scheduler import SweepResult
+from jsonl import load_jsonl
+
+import hashlib
+import json
+import os
+import threading
+
+def _to_json(value):
+    # numpy scalars and arrays.
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError("{!r} is not JSON serializable".format(value))
+
+class SweepJournal(object):
+    """
+    Append only record of the completed points of a sweep, so a sweep
+    that died part way can carry on where it stopped.
+
+    Every completed point is one JSON line holding the point, the device
+    that measured it and the value measured, written through to disk
+    before the next point starts. Values must be JSON serializable, numpy
+    values included. On opening, the points already in the file are
+    loaded, and a last line cut short by a crash is dropped. Pass the
+    journal to SweepScheduler.run() to skip them.
+
+    The first line holds a hash of config, the settings the points are
+    measured with, e.g. the device args, frequencies and gains of the
+    sweep. A journal left by a sweep with another config is discarded,
+    so changing the sweep never resumes it with stale results.
+
+    Call finish() once the sweep is done with, so the next run starts
+    afresh.
+    """
+
+    def __init__(self, path, config=None):
+        self.path = path
+        self.config = self.config_hash(config)
+
+        self._lock = threading.Lock()
+        self._done = {}
+
+        entries = load_jsonl(path)
+        fresh = not entries or entries[0].get("config") != self.config
+
+        if fresh:
+            self._file = open(path, "w")
+            self._write(json.dumps({"config": self.config}))
+        else:
+            self._file = open(path, "a")
+
+            for entry in entries[1:]:
+                self._done[self._key(entry["point"])] = entry
+
+    @staticmethod
+    def config_hash(config):
+        """Hash of a sweep configuration"""
+        text = json.dumps(config, sort_keys=True, separators=(",", ":"), default=_to_json)
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _key(point):
+        return json.dumps([float(field) for field in point])
+
+    def __len__(self):
+        return len(self._done)
+
+    def __contains__(self, point):
+        return self._key(point) in self._done
+
+    def get(self, point):
+        """
+        Returns the SweepResult recorded for point, or None.
+        """
+
+        entry = self._done.get(self._key(point))
+        if entry is None:
+            return None
+
+        return SweepResult(point, entry["device"], entry["value"], None)
+
+    def record(self, result):
+        """
+        Appends a successful SweepResult. Failures are not recorded, so
+        they are measured again on the next run.
+        """
+
+        if result.error is not None:
+            return
+
+        entry = {
+            "point": [float(field) for field in result.point],
+            "device": result.device,
+            "value": result.value,
+        }
+        line = json.dumps(entry, default=_to_json)
+
+        with self._lock:
+            self._write(line)
+            self._done[self._key(result.point)] = json.loads(line)
+
+    def _write(self, line):
+        self._file.write(line + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+    def finish(self):
+        """Closes and removes the journal."""
+        self.close()
+        os.remove(self.path)
+
+def sweep_journal_from_env(name, config=None):
+    """
+    The journal called name in the CRIMSON_JOURNAL_DIR directory for a
+    sweep with config, or None if journaling is off.
+    """
+
+    directory = os.environ.get("CRIMSON_JOURNAL_DIR")
+    if not directory:
+        return None
+
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    return SweepJournal(os.path.join(directory, name + ".jsonl"), config)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from collections import namedtuple, OrderedDict
+
+import os
+import threading
+import Queue
+
+# One measurement of a sweep, as in the loopback gain test.
+SweepPoint = namedtuple("SweepPoint", ["centre_freq", "rx_gain", "tx_amp"])
+
+# What measuring a point gave, on which device. error holds the exception
+# if the measurement failed, and value is None then.
+SweepResult = namedtuple("SweepResult", ["point", "device", "value", "error"])
+
+def crimson_devices(default="crimson"):
+    """
+    Device args of every crimson available to the tests, from the
+    CRIMSON_DEVICES environment variable. Entries are separated by
+    semicolons as the args themselves contain commas, e.g.
+    CRIMSON_DEVICES="addr=192.168.10.2;addr=192.168.11.2".
+    """
+
+    devices = [device.strip() for device in os.environ.get("CRIMSON_DEVICES", "").split(";")]
+    return [device for device in devices if device] or [default]
+
+class SweepScheduler(object):
+    """
+    Measures sweep points on several crimsons at once.
+
+    One worker thread runs per device and calls measure(device, point),
+    which owns the device for as long as the worker does. Workers take the
+    next pending task as they finish, so a slow unit does not hold the
+    others up. The results are merged back into the order of the points.
+
+    Points that must be compared with each other, such as the amplitude
+    steps of one frequency, should share a device. Pass group(point) to
+    keep every point of a group on one device, run in order.
+
+    Pass a SweepJournal to record every point as it completes and to
+    skip the points a previous run completed. A group is only skipped
+    once all of its points are in the journal.
+
+    Usage:
+        scheduler = SweepScheduler(crimson_devices(), measure)
+        for result in scheduler.run(points, group=lambda point: point.centre_freq):
+            ...
+    """
+
+    def __init__(self, devices, measure):
+        self.devices = list(devices)
+        self.measure = measure
+
+        if not self.devices:
+            raise ValueError("At least one device needed")
+
+    def run(self, points, group=None, journal=None):
+        """
+        Measures every point and returns a SweepResult per point, in the
+        order of points.
+        """
+
+        points = list(points)
+
+        # Tasks are lists of point indices, one per group.
+        groups = OrderedDict()
+        for index, point in enumerate(points):
+            key = index if group is None else group(point)
+            groups.setdefault(key, []).append(index)
+
+        results = [None] * len(points)
+        tasks = Queue.Queue()
+
+        for indices in groups.values():
+            if journal is not None and all(points[index] in journal for index in indices):
+                for index in indices:
+                    results[index] = journal.get(points[index])
+            else:
+                tasks.put(indices)
+
+        def worker(device):
+            while True:
+                try:
+                    indices = tasks.get_nowait()
+                except Queue.Empty:
+                    return
+
+                for index in indices:
+                    try:
+                        value, error = self.measure(device, points[index]), None
+                    except Exception, e:
+                        value, error = None, e
+
+                    results[index] = SweepResult(points[index], device, value, error)
+
+                    if journal is not None:
+                        journal.record(results[index])
+
+        threads = [threading.Thread(target=worker, args=(device,)) for device in self.devices]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return results
@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018 Per Vices Corporation.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+"""
+Sustained throughput benchmark of the crimson, swept over channel counts,
+wire formats and sample rates. Run it as a script to write the results,
+and the highest rate each configuration sustains, to a JSON file:
+
+    python throughput_bench.py --channels 1 2 4 --formats sc16 sc8 \
+        --rates 20e6 260e6 40e6 --output bench.json
+"""
+
+from gnuradio import gr
+from gnuradio import blocks
+from gnuradio import analog
+from gnuradio import uhd
+
+from crimson_source_c import crimson_source_c
+from crimson_sink_s import crimson_sink_s
+from crimson_events import crimson_event_monitor
+from capture_cache import firmware_id
+
+from collections import namedtuple
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import tempfile
+import time
+
+import numpy as np
+
+# One configuration of the benchmark matrix.
+BenchPoint = namedtuple("BenchPoint", ["num_channels", "otw_format", "sample_rate"])
+
+def bench_matrix(channel_counts, otw_formats, sample_rates):
+    """
+    Every combination of channel count, wire format and sample rate,
+    with the rate changing fastest.
+    """
+
+    return [BenchPoint(num_channels, otw_format, float(sample_rate))
+        for num_channels in channel_counts
+        for otw_format in otw_formats
+        for sample_rate in sample_rates]
+
+def thread_cpu_times():
+    """
+    CPU seconds used by every thread of this process so far, keyed on
+    "name/tid", where GNU Radio names block threads after their block.
+    Empty where /proc is not available.
+    """
+
+    root = "/proc/self/task"
+    if not os.path.isdir(root):
+        return {}
+
+    ticks = float(os.sysconf("SC_CLK_TCK"))
+    times = {}
+
+    for tid in os.listdir(root):
+        try:
+            with open(os.path.join(root, tid, "comm")) as f:
+                name = f.read().strip()
+            with open(os.path.join(root, tid, "stat")) as f:
+                stat = f.read()
+        except IOError:
+            # The thread ended in between.
+            continue
+
+        # Fields after the parenthesised name; utime and stime are 14 and 15.
+        fields = stat[stat.rindex(")") + 2:].split()
+        times["{}/{}".format(name, tid)] = (int(fields[11]) + int(fields[12])) / ticks
+
+    return times
+
+def cpu_load(before, after, elapsed):
+    """
+    Share of one core each thread used between two thread_cpu_times()
+    snapshots taken elapsed seconds apart.
+    """
+
+    return dict((thread, round((seconds - before.get(thread, 0.0)) / elapsed, 4))
+        for thread, seconds in after.items()
+        if seconds > before.get(thread, 0.0))
+
+def max_rate_table(results):
+    """
+    The highest sample rate every (channel count, wire format) ran at
+    without overflows or underflows, or None if none did.
+    """
+
+    table = {}
+
+    for result in results:
+        key = (result["num_channels"], result["otw_format"])
+        best = table.get(key)
+
+        if result["clean"] and (best is None or result["sample_rate"] > best):
+            best = result["sample_rate"]
+
+        table[key] = best
+
+    return [{"num_channels": num_channels, "otw_format": otw_format, "max_rate": max_rate}
+        for (num_channels, otw_format), max_rate in sorted(table.items())]
+
+def throughput_metrics(results):
+    """
+    The max rate table as BenchHistory metrics, 0 where no rate ran clean.
+    """
+
+    return dict(("max_rate/{}ch/{}".format(row["num_channels"], row["otw_format"]), row["max_rate"] or 0.0)
+        for row in max_rate_table(results))
+
+def host_info():
+    """What the results depend on besides the crimson."""
+    return {
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "cpus": multiprocessing.cpu_count(),
+        "gnuradio": gr.version(),
+        "python": platform.python_version(),
+    }
+
+def dump_json(path, report):
+    """
+    Writes report to path, replacing it whole so a reader never sees half
+    a file.
+    """
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+
+    with os.fdopen(fd, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    os.rename(tmp, path)
+
+def write_json(path, results, device=None):
+    """
+    Writes the results, the max rate table and the host configuration to
+    path.
+    """
+
+    dump_json(path, {
+        "host": host_info(),
+        "device": device,
+        "results": results,
+        "max_rates": max_rate_table(results),
+    })
+
+class ThroughputBench(object):
+    """
+    Streams on every channel of a configuration, RX and TX at once, for
+    duration seconds and measures what got through. RX streams from a
+    timed start lead seconds after the flowgraph starts, and only that
+    streaming window is measured, so start up is not counted.
+
+    +--------+    +--------+    +------+ +------+    +---------+
+    | sig[0] |--->| c2s[0] |--->|ch0   | |   ch0|--->| nsnk[0] |
+    | ...    |    | ...    |    |...   | |...   |    | ...     |
+    | sig[n] |--->| c2s[n] |--->|chn   | |   chn|--->| nsnk[n] |
+    +--------+    +--------+    | csnk | | csrc |    +---------+
+                                +------+ +------+
+
+    Samples are counted by the null sinks, so the rate measured is the
+    one of the link and not of a Python block. The event monitor gets
+    the async messages of csnk and only every monitor_decimation-th
+    sample of csrc, enough for its rx_time tags to show overflows.
+
+    Every result is a dict of JSON values holding the configuration, the
+    achieved RX rate of the slowest channel, the overflow, underflow and
+    late packet counts, the seconds from the start of streaming to the
+    first drop (the drop latency, None without drops), and the CPU load
+    of every thread. A run is clean when nothing was dropped and the
+    achieved rate is within tolerance of the one asked for.
+    """
+
+    def __init__(self, duration=10.0, center_freq=15e6, rx_gain=8.0, tx_amp=3.0e4,
+            tolerance=0.01, args="crimson", lead=0.5, monitor_decimation=1000):
+        self.duration = duration
+        self.center_freq = center_freq
+        self.rx_gain = rx_gain
+        self.tx_amp = tx_amp
+        self.tolerance = tolerance
+        self.args = args
+        self.lead = lead
+        self.monitor_decimation = monitor_decimation
+        self.device = None
+
+    def run_point(self, point):
+        channels = range(point.num_channels)
+
+        tb = gr.top_block()
+
+        csnk = crimson_sink_s(channels, point.sample_rate, self.center_freq, 0.0,
+            args=self.args, otw_format=point.otw_format)
+        csrc = crimson_source_c(channels, point.sample_rate, self.center_freq, self.rx_gain,
+            args=self.args, otw_format=point.otw_format)
+
+        if self.device is None:
+            self.device = firmware_id(csrc)
+
+        for channel in channels:
+            sig = analog.sig_source_c(point.sample_rate, analog.GR_SIN_WAVE, 1e6, self.tx_amp, 0.0)
+            c2s = blocks.complex_to_interleaved_short(True)
+            tb.connect(sig, c2s, (csnk, channel))
+
+        nsnk = [blocks.null_sink(gr.sizeof_gr_complex) for channel in channels]
+
+        for channel in channels:
+            tb.connect((csrc, channel), nsnk[channel])
+
+        monitor = crimson_event_monitor(point.num_channels, point.sample_rate,
+            self.monitor_decimation)
+        monitor.watch(tb, csrc, csnk)
+
+        first_drop = []
+        monitor.add_callback(lambda event: first_drop.append(time.time())
+            if event.kind in ("overflow", "underflow") and not first_drop else None)
+
+        # Reset TX and RX times to be roughly in sync.
+        csnk.set_time_now(uhd.time_spec_t(0.0))
+        csrc.set_time_now(uhd.time_spec_t(0.0))
+
+        tb.start()
+
+        when = csrc.get_time_now().get_real_secs() + self.lead
+
+        sc = uhd.stream_cmd_t(uhd.stream_cmd_t.STREAM_MODE_START_CONTINUOUS)
+        sc.stream_now = False
+        sc.time_spec = uhd.time_spec_t(when)
+        csrc.issue_stream_cmd(sc)
+
+        time.sleep(max(when - csrc.get_time_now().get_real_secs(), 0.0))
+
+        # Count from the start of streaming only.
+        monitor.reset()
+        del first_drop[:]
+
+        first = [nsnk[channel].nitems_read(0) for channel in channels]
+        before = thread_cpu_times()
+        start = time.time()
+
+        time.sleep(self.duration)
+
+        last = [nsnk[channel].nitems_read(0) for channel in channels]
+        after = thread_cpu_times()
+        elapsed = time.time() - start
+
+        csrc.issue_stream_cmd(uhd.stream_cmd_t(uhd.stream_cmd_t.STREAM_MODE_STOP_CONTINUOUS))
+
+        tb.stop()
+        tb.wait()
+
+        achieved = min(end - begin for begin, end in zip(first, last)) / elapsed
+
+        result = dict(point._asdict())
+        result.update({
+            "duration": round(elapsed, 3),
+            "achieved_rate": achieved,
+            "overflows": monitor.count("overflow"),
+            "underflows": monitor.count("underflow"),
+            "late": monitor.count("late"),
+            "drop_latency": round(first_drop[0] - start, 6) if first_drop else None,
+            "cpu": cpu_load(before, after, elapsed),
+        })
+
+        result["clean"] = (result["overflows"] == 0 and result["underflows"] == 0
+            and achieved >= point.sample_rate * (1.0 - self.tolerance))
+
+        return result
+
+    def run(self, points, path=None):
+        """
+        Runs every point in turn, writing the results so far to path after
+        each one if given, and returns them.
+        """
+
+        results = []
+
+        for point in points:
+            results.append(self.run_point(point))
+
+            if path is not None:
+                write_json(path, results, self.device)
+
+        return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Crimson throughput benchmark")
+    parser.add_argument("--channels", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--formats", nargs="+", default=["sc16"])
+    parser.add_argument("--rates", type=float, nargs=3, default=[20e6, 260e6, 40e6],
+        metavar=("START", "STOP", "STEP"))
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--args", default="crimson")
+    parser.add_argument("--output", default="throughput_bench.json")
+    options = parser.parse_args()
+
+    bench = ThroughputBench(options.duration, args=options.args)
+    results = bench.run(bench_matrix(options.channels, options.formats,
+        np.arange(*options.rates)), options.output)
+
+    for row in max_rate_table(results):
+        print("{num_channels} ch {otw_format}: {max_rate}".format(**row))
@@ -8,6 +8,14 @@
 %include "pv_swig_doc.i"
 
 %{
+#include "pv/pfb_channelizer_cc.h"
+#include "pv/poly_decim_cc.h"
 %}
 
+%include "pv/pfb_channelizer_cc.h"
+GR_SWIG_BLOCK_MAGIC2(pv, pfb_channelizer_cc);
+
+%include "pv/poly_decim_cc.h"
+GR_SWIG_BLOCK_MAGIC2(pv, poly_decim_cc);
+
 